@@ -0,0 +1,63 @@
+"""
+Provider SSE encoding benchmark.
+
+Compares one `create_text_delta` frame per upstream token with batched
+`SSEStreamEncoder` frames, reporting tokens/sec and the number of writes
+handed to the server.
+
+    python benchmarks/bench_encoder.py --tokens 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from openresponses.provider import OpenResponsesProvider, SSEStreamEncoder
+
+
+async def tokens(count: int):
+    for i in range(count):
+        yield ("response.reasoning.delta" if i < count // 2 else "response.text.delta", "tok ")
+    yield ("response.done", {})
+
+
+async def per_token(count: int) -> int:
+    writes = 0
+    async for event_type, payload in tokens(count):
+        if event_type == "response.reasoning.delta":
+            frame = OpenResponsesProvider.create_reasoning_delta(payload)
+        elif event_type == "response.text.delta":
+            frame = OpenResponsesProvider.create_text_delta(payload)
+        else:
+            frame = OpenResponsesProvider.create_done_event()
+        frame.encode()
+        writes += 1
+    return writes
+
+
+async def batched(count: int, max_bytes: int) -> int:
+    writes = 0
+    async for _ in SSEStreamEncoder(max_bytes=max_bytes).stream(tokens(count)):
+        writes += 1
+    return writes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=200_000)
+    parser.add_argument("--max-bytes", type=int, default=4096)
+    args = parser.parse_args()
+
+    cases = (
+        ("per-token frames", lambda: per_token(args.tokens)),
+        ("SSEStreamEncoder", lambda: batched(args.tokens, args.max_bytes)),
+    )
+    for label, factory in cases:
+        start = time.perf_counter()
+        writes = asyncio.run(factory())
+        elapsed = time.perf_counter() - start
+        print(f"{label:<18} {args.tokens / elapsed:>12,.0f} tokens/s  {writes:>8,} writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Import-time benchmark.
+
+Runs fresh interpreters with ``python -X importtime`` and reports, best of
+``--runs``:
+
+- ``import openresponses`` (cumulative): should stay near zero, since the
+  package resolves names lazily.
+- ``import openresponses.client`` (cumulative, including httpx and Pydantic).
+- time spent in openresponses' own modules for that import (self time only),
+  which is what this package controls.
+
+Exits with status 1 if a budget is exceeded.
+
+    python benchmarks/bench_import.py --package-budget-ms 10 --own-budget-ms 60
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict
+
+# Budgets in milliseconds. Generous enough for slow CI machines; a lazy-loading
+# regression (e.g. an eager import in __init__) blows through them at once.
+PACKAGE_BUDGET_MS = 10.0
+OWN_BUDGET_MS = 60.0
+
+
+def importtime(module: str) -> Dict[str, float]:
+    """Self and cumulative import times (ms) of every module loaded by importing `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        times[name] = float(cumulative_us) / 1000
+        times[f"{name}:self"] = float(self_us) / 1000
+    return times
+
+
+def measure(runs: int = 5) -> Dict[str, float]:
+    package = min(importtime("openresponses")["openresponses"] for _ in range(runs))
+    client_runs = [importtime("openresponses.client") for _ in range(runs)]
+    client = min(times["openresponses.client"] for times in client_runs)
+    own = min(
+        sum(value for name, value in times.items() if name.startswith("openresponses") and name.endswith(":self"))
+        for times in client_runs
+    )
+    return {"import_package_ms": package, "import_client_ms": client, "import_client_own_ms": own}
+
+
+def over_budget(results: Dict[str, float], package_budget: float, own_budget: float) -> Dict[str, float]:
+    """The results exceeding their budget, mapped to that budget."""
+    budgets = {"import_package_ms": package_budget, "import_client_own_ms": own_budget}
+    return {name: budget for name, budget in budgets.items() if results[name] > budget}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--package-budget-ms", type=float, default=PACKAGE_BUDGET_MS)
+    parser.add_argument("--own-budget-ms", type=float, default=OWN_BUDGET_MS)
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    for name, value in results.items():
+        print(f"{name:<24} {value:8.1f} ms")
+    failed = over_budget(results, args.package_budget_ms, args.own_budget_ms)
+    for name, budget in failed.items():
+        print(f"{name} exceeds its budget of {budget:.1f} ms")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
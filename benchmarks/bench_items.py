@@ -0,0 +1,60 @@
+"""
+ResponseItem validation benchmark.
+
+Validates long `output` lists with a plain `Union` (each member tried in turn)
+and with the discriminated `ResponseItem` union, from Python dicts and from
+JSON bytes.
+
+    python benchmarks/bench_items.py --items 500
+"""
+
+import argparse
+import json
+import time
+from typing import List, Union
+
+from pydantic import TypeAdapter
+
+from openresponses import MessageItem, ReasoningItem, ResponseItemListAdapter, ToolCallItem
+
+
+def build_items(count: int) -> list:
+    # Tool calls last in the union, so the plain Union pays the most for them.
+    pattern = [
+        {"type": "tool_call", "id": "call_1", "name": "search", "arguments": {"query": "open responses"}},
+        {"type": "reasoning", "content": "Checking the previous result."},
+        {"type": "message", "role": "assistant", "content": [{"type": "input_text", "text": "Partial answer."}]},
+    ]
+    return [pattern[i % len(pattern)] for i in range(count)]
+
+
+def best_of(repeat: int, loops: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--loops", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    raw = json.dumps(items).encode()
+    plain = TypeAdapter(List[Union[MessageItem, ReasoningItem, ToolCallItem]])
+
+    print(f"{args.items} items, {len(raw) / 1e3:.0f} KB")
+    for label, adapter in (("plain Union", plain), ("discriminated", ResponseItemListAdapter)):
+        py = best_of(args.repeat, args.loops, lambda: adapter.validate_python(items))
+        js = best_of(args.repeat, args.loops, lambda: adapter.validate_json(raw))
+        print(f"  {label:<14} python {py * 1e6:>9,.0f} us   json {js * 1e6:>9,.0f} us")
+
+
+if __name__ == "__main__":
+    main()
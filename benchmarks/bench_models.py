@@ -0,0 +1,80 @@
+"""
+Validated vs trusted decoding benchmark.
+
+Streams: end-to-end `OpenResponsesClient` streaming over an in-memory transport,
+building validated typed events vs unvalidated ones (``trusted=True``).
+Responses: `OpenResponsesOutput(**resp.json())` vs `model_validate_json(bytes)`.
+
+    python benchmarks/bench_models.py --events 100000 --items 300
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from openresponses import OpenResponsesOutput
+from openresponses.client import OpenResponsesClient
+
+
+def build_stream(events: int) -> bytes:
+    frame = "event: response.text.delta\ndata: {\"delta\": \"token \"}\n\n"
+    return (frame * events + "event: response.done\ndata: {}\n\n").encode()
+
+
+def build_output(items: int) -> bytes:
+    pattern = [
+        {"type": "reasoning", "content": "Let me think about this step. " * 4},
+        {"type": "message", "role": "assistant", "content": [{"type": "input_text", "text": "Partial answer."}]},
+        {"type": "tool_call", "id": "call_1", "name": "search", "arguments": {"query": "open responses"}},
+    ]
+    output = [pattern[i % len(pattern)] for i in range(items)]
+    return json.dumps({"id": "resp_1", "created": 0, "model": "bench", "output": output}).encode()
+
+
+def stream_client(payload: bytes, trusted: bool) -> OpenResponsesClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=payload, headers={"content-type": "text/event-stream"})
+
+    transport = httpx.Client(transport=httpx.MockTransport(handler))
+    return OpenResponsesClient("http://bench", http_client=transport, trusted=trusted)
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_stream(args.events)
+    print(f"stream: {args.events + 1} events")
+    for label, trusted in (("validated", False), ("trusted", True)):
+        client = stream_client(payload, trusted)
+        elapsed = best_of(args.repeat, lambda: sum(1 for _ in client.create("bench", "hi", stream=True)))
+        print(f"  {label:<10} {(args.events + 1) / elapsed:>12,.0f} events/s")
+
+    body = build_output(args.items)
+    response = httpx.Response(200, content=body)
+    print(f"response: {args.items} items, {len(body) / 1e3:.0f} KB")
+    cases = (
+        ("**resp.json()", lambda: OpenResponsesOutput(**response.json())),
+        ("model_validate_json", lambda: OpenResponsesOutput.model_validate_json(response.content)),
+    )
+    for label, fn in cases:
+        elapsed = best_of(args.repeat, lambda: [fn() for _ in range(100)]) / 100
+        print(f"  {label:<20} {elapsed * 1e6:>10,.0f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+SSE decoding microbenchmark.
+
+Compares the incremental byte-level `SSEDecoder` (fed from `iter_bytes()`) with
+the previous `iter_lines()` + `split(": ")` parser on a large, delta-heavy
+stream. Both run on an in-memory `httpx.Response`, so no network is involved.
+
+    python benchmarks/bench_sse.py --events 200000 --delta-size 8 --chunk-size 1400
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from openresponses.sse import SSEDecoder, iter_sse
+
+
+def build_stream(events: int, delta_size: int) -> bytes:
+    frames = []
+    for i in range(events):
+        kind = "response.reasoning.delta" if i % 3 else "response.text.delta"
+        frames.append(f"event: {kind}\ndata: {json.dumps({'delta': 'x' * delta_size})}\n\n")
+    frames.append("event: response.done\ndata: {}\n\n")
+    return "".join(frames).encode()
+
+
+def chunked(payload: bytes, size: int):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+def streaming_response(chunks) -> httpx.Response:
+    return httpx.Response(200, content=iter(chunks), headers={"content-type": "text/event-stream"})
+
+
+def parse_lines(chunks) -> int:
+    # The parser `_stream_request` used before the SSE decoder.
+    count = 0
+    for line in streaming_response(chunks).iter_lines():
+        if line.startswith("event:"):
+            event_type = line.split(": ", 1)[1]
+        elif line.startswith("data:"):
+            data = json.loads(line.split(": ", 1)[1])
+            count += bool(event_type and data is not None)
+    return count
+
+
+def parse_sse(chunks) -> int:
+    count = 0
+    for event in iter_sse(streaming_response(chunks).iter_bytes()):
+        event.json()
+        count += 1
+    return count
+
+
+def decode_only(chunks) -> int:
+    decoder = SSEDecoder()
+    count = 0
+    for chunk in chunks:
+        count += len(decoder.feed(chunk))
+    return count
+
+
+def run(fn, chunks, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--delta-size", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=1400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_stream(args.events, args.delta_size)
+    chunks = chunked(payload, args.chunk_size)
+    total = args.events + 1
+    assert parse_sse(chunks) == parse_lines(chunks) == total
+
+    print(f"{total} events, {len(payload) / 1e6:.1f} MB, {len(chunks)} chunks of {args.chunk_size} B")
+    cases = (
+        ("iter_lines (old)", parse_lines),
+        ("iter_bytes + SSEDecoder", parse_sse),
+        ("SSEDecoder, no JSON", decode_only),
+    )
+    for name, fn in cases:
+        elapsed = run(fn, chunks, args.repeat)
+        print(f"{name:<24} {total / elapsed:>12,.0f} events/s  {len(payload) / elapsed / 1e6:>8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Mock Open Responses server for benchmarks.
+
+A minimal HTTP/1.1 keep-alive server on raw asyncio serving ``POST /v1/responses``
+with synthetic output, so client numbers are not bounded by a web framework.
+Streams are configurable per server and per request (``X-Mock-*`` headers):
+
+    --deltas      number of delta events           (X-Mock-Deltas)
+    --delta-size  characters per delta              (X-Mock-Delta-Size)
+    --reasoning   fraction of deltas that are reasoning (X-Mock-Reasoning)
+    --latency     seconds before the first byte     (X-Mock-Latency)
+    --interval    seconds between deltas            (X-Mock-Interval)
+
+    python benchmarks/mock_server.py --port 8099 --deltas 1000
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, Tuple
+
+DEFAULTS = {"deltas": 256, "delta_size": 4, "reasoning": 0.5, "latency": 0.0, "interval": 0.0}
+_HEADERS = {
+    b"x-mock-deltas": ("deltas", int),
+    b"x-mock-delta-size": ("delta_size", int),
+    b"x-mock-reasoning": ("reasoning", float),
+    b"x-mock-latency": ("latency", float),
+    b"x-mock-interval": ("interval", float),
+}
+
+
+def _frames(deltas: int, delta_size: int, reasoning: float) -> Tuple[bytes, ...]:
+    split = int(deltas * reasoning)
+    delta = json.dumps({"delta": "x" * delta_size})
+    thought = f"event: response.reasoning.delta\ndata: {delta}\n\n".encode()
+    text = f"event: response.text.delta\ndata: {delta}\n\n".encode()
+    done = b'event: response.done\ndata: {"id":"resp_mock","created":0,"model":"mock"}\n\n'
+    return (thought,) * split + (text,) * (deltas - split) + (done,)
+
+
+def _output(deltas: int, delta_size: int, reasoning: float) -> bytes:
+    split = int(deltas * reasoning)
+    output = []
+    if split:
+        output.append({"type": "reasoning", "content": "x" * (delta_size * split)})
+    output.append({"type": "message", "role": "assistant", "content": "x" * (delta_size * (deltas - split))})
+    return json.dumps({"id": "resp_mock", "created": 0, "model": "mock", "output": output}).encode()
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class MockServer:
+    """Serves synthetic responses; `config` holds the defaults for every request."""
+
+    def __init__(self, **config):
+        self.config = {**DEFAULTS, **config}
+        self._cache: Dict[Tuple, Tuple[bytes, ...]] = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.split(b"\r\n")
+                config = dict(self.config)
+                length = 0
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    name = name.strip().lower()
+                    if name == b"content-length":
+                        length = int(value)
+                    elif name in _HEADERS:
+                        key, cast = _HEADERS[name]
+                        config[key] = cast(value.strip())
+                body = await reader.readexactly(length) if length else b""
+                if not lines[0].startswith(b"POST /v1/responses"):
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                    continue
+                stream = b'"stream":true' in body.replace(b" ", b"")
+                if config["latency"]:
+                    await asyncio.sleep(config["latency"])
+                if stream:
+                    await self._stream(writer, config)
+                else:
+                    payload = _output(config["deltas"], config["delta_size"], config["reasoning"])
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                        % (len(payload), payload)
+                    )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, config: Dict) -> None:
+        key = (config["deltas"], config["delta_size"], config["reasoning"])
+        frames = self._cache.get(key)
+        if frames is None:
+            frames = self._cache[key] = _frames(*key)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        interval = config["interval"]
+        if interval:
+            for frame in frames:
+                writer.write(_chunk(frame))
+                await writer.drain()
+                await asyncio.sleep(interval)
+        else:
+            # Write in ~64 KiB chunks, the way a busy provider's frames arrive.
+            batch, size = [], 0
+            for frame in frames:
+                batch.append(frame)
+                size += len(frame)
+                if size >= 65536:
+                    writer.write(_chunk(b"".join(batch)))
+                    await writer.drain()
+                    batch, size = [], 0
+            if batch:
+                writer.write(_chunk(b"".join(batch)))
+        writer.write(b"0\r\n\r\n")
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8099) -> None:
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--deltas", type=int, default=DEFAULTS["deltas"])
+    parser.add_argument("--delta-size", type=int, default=DEFAULTS["delta_size"])
+    parser.add_argument("--reasoning", type=float, default=DEFAULTS["reasoning"])
+    parser.add_argument("--latency", type=float, default=DEFAULTS["latency"])
+    parser.add_argument("--interval", type=float, default=DEFAULTS["interval"])
+    args = parser.parse_args()
+    server = MockServer(
+        deltas=args.deltas, delta_size=args.delta_size, reasoning=args.reasoning,
+        latency=args.latency, interval=args.interval,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmark suite.
+
+Starts `mock_server.py` in a subprocess and measures client stream throughput,
+request rate, memory per open stream, provider encoding throughput,
+reasoning-tag splitting throughput and import time. Results are written as JSON so runs can be compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+
+The exit status is 1 if an import-time budget (see `bench_import.py`) is
+exceeded or, with ``--compare``, if any result regressed by more than
+``--threshold`` (default 10%).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from openresponses.client import AsyncOpenResponsesClient, OpenResponsesClient
+from openresponses.provider import ReasoningSplitter, SSEStreamEncoder
+
+from bench_import import OWN_BUDGET_MS, PACKAGE_BUDGET_MS, measure as measure_imports, over_budget
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+RESULTS: Dict[str, Any] = {}
+
+
+def record(name: str, value: float, unit: str, higher_is_better: bool = True) -> None:
+    RESULTS[name] = {"value": round(value, 3), "unit": unit, "higher_is_better": higher_is_better}
+    print(f"  {name:<36} {value:>14,.1f} {unit}")
+
+
+def best(repeat: int, fn: Callable[[], float]) -> float:
+    """Best of `repeat` runs of a timing function returning seconds."""
+    return min(fn() for _ in range(repeat))
+
+
+def mock_headers(**config) -> Dict[str, str]:
+    return {f"X-Mock-{key.replace('_', '-').title()}": str(value) for key, value in config.items()}
+
+
+def bench_sync_stream(base_url: str, deltas: int, repeat: int) -> None:
+    with OpenResponsesClient(base_url) as client:
+        client.headers.update(mock_headers(deltas=deltas))
+
+        def run() -> float:
+            start = time.perf_counter()
+            count = sum(1 for _ in client.create(model="mock", input="hi", stream=True))
+            assert count == deltas + 1, count
+            return time.perf_counter() - start
+
+        record("client_stream_events_per_sec", (deltas + 1) / best(repeat, run), "events/s")
+
+
+async def bench_async_stream(base_url: str, deltas: int, repeat: int) -> None:
+    async with AsyncOpenResponsesClient(base_url) as client:
+        client.headers.update(mock_headers(deltas=deltas))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = 0
+            async for _ in await client.create(model="mock", input="hi", stream=True):
+                count += 1
+            timings.append(time.perf_counter() - start)
+        record("async_client_stream_events_per_sec", (deltas + 1) / min(timings), "events/s")
+
+
+def bench_sync_requests(base_url: str, requests: int, repeat: int) -> None:
+    with OpenResponsesClient(base_url) as client:
+        client.headers.update(mock_headers(deltas=16))
+
+        def run() -> float:
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.create(model="mock", input="hi")
+            return time.perf_counter() - start
+
+        record("client_requests_per_sec", requests / best(repeat, run), "req/s")
+
+
+async def bench_async_requests(base_url: str, requests: int, concurrency: int, repeat: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with AsyncOpenResponsesClient(base_url, limits=limits) as client:
+        client.headers.update(mock_headers(deltas=16))
+        batch = [{"model": "mock", "input": "hi"} for _ in range(requests)]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            errors = 0
+            async for result in client.create_many(batch, concurrency=concurrency):
+                errors += result.error is not None
+            timings.append(time.perf_counter() - start)
+            assert not errors, f"{errors} failed requests"
+        record("async_client_requests_per_sec", requests / min(timings), "req/s")
+
+
+async def bench_stream_memory(base_url: str, streams: int) -> None:
+    # Hold `streams` streams open mid-flight and measure what they retain.
+    limits = httpx.Limits(max_connections=streams, max_keepalive_connections=streams)
+    async with AsyncOpenResponsesClient(base_url, limits=limits) as client:
+        client.headers.update(mock_headers(deltas=64, interval=0.05))
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        open_streams = [await client.create(model="mock", input="hi", stream=True) for _ in range(streams)]
+        await asyncio.gather(*(stream.__anext__() for stream in open_streams))
+        during = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        await asyncio.gather(*(stream.aclose() for stream in open_streams))
+        record("memory_per_stream_kib", (during - before) / streams / 1024, "KiB", higher_is_better=False)
+
+
+async def bench_encoder(tokens: int, repeat: int) -> None:
+    async def source():
+        for i in range(tokens):
+            yield ("response.reasoning.delta" if i < tokens // 2 else "response.text.delta", "tok ")
+        yield ("response.done", {})
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        async for _ in SSEStreamEncoder().stream(source()):
+            pass
+        timings.append(time.perf_counter() - start)
+    record("encoder_tokens_per_sec", tokens / min(timings), "tokens/s")
+
+
+def bench_reasoning_splitter(megabytes: int, repeat: int) -> None:
+    # A multi-MB trace of <think> blocks and answers, cut into token-sized
+    # chunks so that many tags straddle chunk boundaries.
+    rng = random.Random(0)
+    block = "<think>" + "let me consider < this step " * 40 + "</think>" + "so the answer is <b>42</b>. " * 10
+    trace = block * (megabytes * 1024 * 1024 // len(block))
+    chunks, pos = [], 0
+    while pos < len(trace):
+        size = rng.randint(1, 12)
+        chunks.append(trace[pos:pos + size])
+        pos += size
+
+    def run() -> float:
+        splitter = ReasoningSplitter()
+        feed = splitter.feed
+        start = time.perf_counter()
+        for chunk in chunks:
+            feed(chunk)
+        splitter.finish()
+        return time.perf_counter() - start
+
+    record("reasoning_splitter_mb_per_sec", len(trace) / 1024 / 1024 / best(repeat, run), "MB/s")
+
+
+def bench_imports(runs: int) -> Dict[str, float]:
+    results = measure_imports(runs)
+    for name, value in results.items():
+        record(name, value, "ms", higher_is_better=False)
+    return over_budget(results, PACKAGE_BUDGET_MS, OWN_BUDGET_MS)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, "mock_server.py"), "--port", str(port)])
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("mock server did not start")
+
+
+def compare(results: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+    """Print changes against a baseline file; return the names that regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = current["value"] / previous["value"] - 1
+        worse = -change if current["higher_is_better"] else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        print(f"  {name:<36} {change:+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression ratio")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast smoke run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = 10 if args.quick else 1
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_mock_server(port)
+    try:
+        print(f"Benchmarks against mock server on :{port}")
+        bench_sync_stream(base_url, deltas=50_000 // scale, repeat=args.repeat)
+        asyncio.run(bench_async_stream(base_url, deltas=50_000 // scale, repeat=args.repeat))
+        bench_sync_requests(base_url, requests=2_000 // scale, repeat=args.repeat)
+        asyncio.run(bench_async_requests(base_url, requests=5_000 // scale, concurrency=32, repeat=args.repeat))
+        asyncio.run(bench_stream_memory(base_url, streams=200 // scale))
+        asyncio.run(bench_encoder(tokens=200_000 // scale, repeat=args.repeat))
+        bench_reasoning_splitter(megabytes=2 if args.quick else 16, repeat=args.repeat)
+    finally:
+        server.terminate()
+        server.wait()
+    failed_budgets = bench_imports(runs=args.repeat)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+            "quick": args.quick,
+        },
+        "results": RESULTS,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    for name, budget in failed_budgets.items():
+        print(f"{name} exceeds its budget of {budget:.1f} ms")
+    regressions = compare(RESULTS, args.compare, args.threshold) if args.compare else []
+    if failed_budgets or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
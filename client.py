@@ -1,4 +1,5 @@
 import asyncio
+from openresponses import ReasoningDelta, TextDelta
 from openresponses.client import AsyncOpenResponsesClient
 
 # Assuming one of the examples is running on port 8001 (OpenRouter), 8002 (OpenAI), etc.
@@ -29,10 +30,10 @@ async def main():
             stream=True
         )
         async for event in stream:
-            if event.event == "response.reasoning.delta":
-                 print(f"🧠 {event.data['delta']}", end="", flush=True)
-            elif event.event == "response.text.delta":
-                 print(f"🤖 {event.data['delta']}", end="", flush=True)
+            if isinstance(event, ReasoningDelta):
+                 print(f"🧠 {event.delta}", end="", flush=True)
+            elif isinstance(event, TextDelta):
+                 print(f"🤖 {event.delta}", end="", flush=True)
         print("\n✅ Done")
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,23 @@
+import os
+from dotenv import load_dotenv
+from openresponses.server import OpenAIChatBackend, create_app
+
+load_dotenv()
+
+# One process, several backends, selected by model prefix:
+#   "ollama/llama3"                -> Ollama, model "llama3"
+#   "lmstudio/local-model"         -> LM Studio, model "local-model"
+#   "openai/gpt-4o"                -> OpenAI, model "gpt-4o"
+#   anything else, e.g. "deepseek/deepseek-r1" -> OpenRouter
+backends = {
+    "ollama/": OpenAIChatBackend("http://localhost:11434/v1", "ollama", default_model="llama3"),
+    "lmstudio/": OpenAIChatBackend("http://localhost:1234/v1", "lm-studio", default_model="local-model"),
+    "openai/": OpenAIChatBackend(api_key=os.getenv("OPENAI_API_KEY"), default_model="gpt-4o"),
+    "": OpenAIChatBackend("https://openrouter.ai/api/v1", os.getenv("OPENROUTER_API_KEY")),
+}
+
+app = create_app(backends, title="Open Responses Multi-Provider")
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
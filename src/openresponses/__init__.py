@@ -1,21 +1,90 @@
-from .models import (
-    InputText,
-    MessageItem,
-    ReasoningItem,
-    ToolCallItem,
-    ResponseItem,
-    OpenResponsesRequest,
-    OpenResponsesOutput,
-    StreamEvent
-)
-
-__all__ = [
-    "InputText",
-    "MessageItem",
-    "ReasoningItem",
-    "ToolCallItem",
-    "ResponseItem",
-    "OpenResponsesRequest",
-    "OpenResponsesOutput",
-    "StreamEvent",
-]
+"""
+Open Responses for Python.
+
+Names are resolved lazily on first access, so ``import openresponses`` stays
+cheap and Pydantic/httpx are only loaded by code that actually uses them.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Public name -> submodule that defines it.
+_EXPORTS = {
+    "InputText": "models",
+    "MessageItem": "models",
+    "ReasoningItem": "models",
+    "ToolCallItem": "models",
+    "ToolResultItem": "models",
+    "ResponseItem": "models",
+    "ResponseItemAdapter": "models",
+    "ResponseItemListAdapter": "models",
+    "OpenResponsesRequest": "models",
+    "OpenResponsesOutput": "models",
+    "StreamEvent": "models",
+    "ReasoningDelta": "models",
+    "TextDelta": "models",
+    "ToolCallDelta": "models",
+    "ToolResult": "models",
+    "Done": "models",
+    "Error": "models",
+    "STREAM_EVENT_TYPES": "models",
+    "ResponseAccumulator": "accumulator",
+    "ToolRegistry": "tools",
+    "ToolLoopBackend": "tools",
+    "ConversationStore": "conversation",
+    "TruncateOldest": "conversation",
+    "SummarizeOldest": "conversation",
+    "OpenResponsesClient": "client",
+    "AsyncOpenResponsesClient": "client",
+    "EventStream": "client",
+    "AsyncEventStream": "client",
+}
+
+_SUBMODULES = frozenset({
+    "accumulator", "balancer", "cache", "client", "codec", "conversation", "metrics", "models", "provider",
+    "ratelimit", "replay", "retry", "serve", "server", "singleflight", "sse", "tools",
+})
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(f".{module}", __name__), name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
+
+
+if TYPE_CHECKING:
+    from .accumulator import ResponseAccumulator
+    from .client import AsyncEventStream, AsyncOpenResponsesClient, EventStream, OpenResponsesClient
+    from .conversation import ConversationStore, SummarizeOldest, TruncateOldest
+    from .tools import ToolLoopBackend, ToolRegistry
+    from .models import (
+        InputText,
+        MessageItem,
+        ReasoningItem,
+        ToolCallItem,
+        ToolResultItem,
+        ResponseItem,
+        ResponseItemAdapter,
+        ResponseItemListAdapter,
+        OpenResponsesRequest,
+        OpenResponsesOutput,
+        StreamEvent,
+        ReasoningDelta,
+        TextDelta,
+        ToolCallDelta,
+        ToolResult,
+        Done,
+        Error,
+        STREAM_EVENT_TYPES,
+    )
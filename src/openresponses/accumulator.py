@@ -0,0 +1,221 @@
+"""
+Stream accumulation.
+
+Rebuilds an `OpenResponsesOutput` from the `StreamEvent`s produced by a streaming
+`create` call. Deltas are buffered as chunk lists and joined once, so long
+reasoning traces cost linear time instead of quadratic string concatenation.
+"""
+
+import json
+import time
+import uuid
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+from .models import (
+    MessageItem,
+    OpenResponsesOutput,
+    ReasoningItem,
+    ResponseItem,
+    StreamEvent,
+    ToolCallItem,
+    ToolResultItem,
+)
+
+_REASONING = "response.reasoning.delta"
+_TEXT = "response.text.delta"
+_TOOL_CALL = "response.tool_call.delta"
+_TOOL_RESULT = "response.tool_result"
+_DONE = "response.done"
+_ERROR = "error"
+_DELTAS = (_REASONING, _TEXT)
+
+
+class _Segment:
+    """A contiguous run of reasoning or text deltas, kept as chunks until joined."""
+
+    __slots__ = ("kind", "chunks")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.chunks: List[str] = []
+
+    def text(self) -> str:
+        chunks = self.chunks
+        if len(chunks) > 1:
+            # Collapse in place so repeated snapshots don't re-join old chunks.
+            chunks[:] = ["".join(chunks)]
+        return chunks[0] if chunks else ""
+
+    def to_item(self) -> ResponseItem:
+        if self.kind == _REASONING:
+            return ReasoningItem(content=self.text())
+        return MessageItem(role="assistant", content=self.text())
+
+
+class _ToolCall(_Segment):
+    __slots__ = ("id", "name")
+
+    def __init__(self, call_id: Optional[str], name: Optional[str]):
+        super().__init__(_TOOL_CALL)
+        self.id = call_id
+        self.name = name
+
+    def to_item(self) -> ResponseItem:
+        raw = self.text()
+        try:
+            arguments = json.loads(raw) if raw else {}
+        except ValueError:
+            arguments = None
+        if not isinstance(arguments, dict):
+            # Keep unparseable argument streams rather than dropping them.
+            arguments = {"_raw": raw}
+        return ToolCallItem(id=self.id or "", name=self.name or "", arguments=arguments)
+
+
+class _ToolResult:
+    __slots__ = ("kind", "call_id", "output")
+
+    def __init__(self, call_id: str, output: str):
+        self.kind = _TOOL_RESULT
+        self.call_id = call_id
+        self.output = output
+
+    def to_item(self) -> ResponseItem:
+        return ToolResultItem(call_id=self.call_id, output=self.output)
+
+
+class ResponseAccumulator:
+    """
+    Accumulates stream events into an `OpenResponsesOutput`.
+
+    Feed events with `add()`, or wrap a stream with `track()`/`atrack()` to
+    pass events through while accumulating. `snapshot()` returns the running
+    state at any time; `result()` returns the final output. Consecutive deltas
+    of the same kind form one item, so reasoning, text and tool calls keep
+    their stream order.
+
+    Example:
+        ```python
+        stream = await client.create(model="deepseek/deepseek-r1", input="Hi", stream=True)
+        output = await ResponseAccumulator(model="deepseek/deepseek-r1").aconsume(stream)
+        ```
+    """
+
+    def __init__(self, model: str = "", response_id: Optional[str] = None, created: Optional[int] = None):
+        self.model = model
+        self.id = response_id or f"resp_{uuid.uuid4().hex}"
+        self.created = created if created is not None else int(time.time())
+        self.done = False
+        self.error: Optional[str] = None
+        self._segments: List[Union[_Segment, _ToolResult]] = []
+        self._current: Optional[_Segment] = None
+        self._tool_calls: Dict[str, _ToolCall] = {}
+        self._handlers = {
+            _REASONING: self._on_delta,
+            _TEXT: self._on_delta,
+            _TOOL_CALL: self._on_tool_call,
+            _TOOL_RESULT: self._on_tool_result,
+            _DONE: self._on_done,
+            _ERROR: self._on_error,
+        }
+
+    def add(self, event: StreamEvent) -> None:
+        """Consume a single event. Unknown event types are ignored."""
+        handler = self._handlers.get(event.event)
+        if handler is not None:
+            handler(event.event, event.data)
+
+    def add_provider_event(self, event_type: str, payload: Any) -> None:
+        """
+        Consume a provider-side ``(event_type, payload)`` pair, as yielded by
+        `openresponses.server.Backend.stream`, where deltas are plain strings.
+        """
+        if event_type in _DELTAS:
+            self._append_delta(event_type, payload)
+            return
+        handler = self._handlers.get(event_type)
+        if handler is not None:
+            handler(event_type, payload)
+
+    def track(self, events: Iterable[StreamEvent]) -> Iterator[StreamEvent]:
+        """Yield events unchanged while accumulating them."""
+        add = self.add
+        for event in events:
+            add(event)
+            yield event
+
+    async def atrack(self, events: AsyncIterable[StreamEvent]) -> AsyncIterator[StreamEvent]:
+        """Async version of `track()`."""
+        add = self.add
+        async for event in events:
+            add(event)
+            yield event
+
+    def consume(self, events: Iterable[StreamEvent]) -> OpenResponsesOutput:
+        """Drain a stream and return the assembled output."""
+        add = self.add
+        for event in events:
+            add(event)
+        return self.result()
+
+    async def aconsume(self, events: AsyncIterable[StreamEvent]) -> OpenResponsesOutput:
+        """Drain an async stream and return the assembled output."""
+        add = self.add
+        async for event in events:
+            add(event)
+        return self.result()
+
+    def snapshot(self) -> OpenResponsesOutput:
+        """The output assembled so far; costs time proportional to its size."""
+        return OpenResponsesOutput(
+            id=self.id,
+            created=self.created,
+            model=self.model,
+            output=[segment.to_item() for segment in self._segments],
+        )
+
+    def result(self) -> OpenResponsesOutput:
+        """The final output. Identical to `snapshot()` once `response.done` was seen."""
+        return self.snapshot()
+
+    def _on_delta(self, event_type: str, data: Dict[str, Any]) -> None:
+        self._append_delta(event_type, data.get("delta"))
+
+    def _append_delta(self, kind: str, delta: Optional[str]) -> None:
+        if not delta:
+            return
+        current = self._current
+        if current is None or current.kind != kind:
+            current = self._current = _Segment(kind)
+            self._segments.append(current)
+        current.chunks.append(delta)
+
+    def _on_tool_call(self, event_type: str, data: Dict[str, Any]) -> None:
+        call_id = data.get("id")
+        call = self._current if call_id is None else self._tool_calls.get(call_id)
+        if not isinstance(call, _ToolCall):
+            call = _ToolCall(call_id, data.get("name"))
+            if call_id is not None:
+                self._tool_calls[call_id] = call
+            self._segments.append(call)
+        elif data.get("name") and not call.name:
+            call.name = data["name"]
+        self._current = call
+        arguments = data.get("arguments")
+        if arguments:
+            call.chunks.append(arguments)
+
+    def _on_tool_result(self, event_type: str, data: Dict[str, Any]) -> None:
+        self._segments.append(_ToolResult(str(data.get("call_id") or ""), str(data.get("output") or "")))
+        self._current = None
+
+    def _on_done(self, event_type: str, data: Dict[str, Any]) -> None:
+        self.done = True
+        self._current = None
+        self.id = data.get("id") or self.id
+        self.model = data.get("model") or self.model
+        self.created = data.get("created") or self.created
+
+    def _on_error(self, event_type: str, data: Dict[str, Any]) -> None:
+        self.error = str(data.get("error", ""))
+        self._current = None
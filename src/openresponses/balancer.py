@@ -0,0 +1,163 @@
+"""
+Client-side load balancing across Open Responses providers.
+
+`EndpointPool` spreads requests over several provider URLs serving the same
+models. It tracks outstanding requests and latency per endpoint, ejects
+endpoints that keep failing (passive health checking) and lets a single probe
+request through once an ejection expires.
+"""
+
+import random
+import threading
+import time
+from typing import List, Optional, Sequence
+
+# Statuses that say "this node cannot serve you right now"; non-streaming
+# requests fail over to another endpoint on these and on transport errors.
+FAILOVER_STATUSES = frozenset({429, 502, 503, 504})
+
+STRATEGIES = ("round_robin", "least_outstanding", "ewma")
+
+
+class Endpoint:
+    """One provider in an `EndpointPool`."""
+
+    __slots__ = ("base_url", "url", "outstanding", "latency", "failures", "ejections", "ejected_until", "probing")
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.url = f"{self.base_url}/v1/responses"
+        self.outstanding = 0
+        # EWMA of response latency in seconds; 0 until the first sample.
+        self.latency = 0.0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejections == 0
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint({self.base_url!r}, outstanding={self.outstanding}, "
+            f"latency={self.latency:.3f}, healthy={self.healthy})"
+        )
+
+
+class EndpointPool:
+    """
+    A set of equivalent provider endpoints.
+
+    Args:
+        base_urls: Provider root URLs.
+        strategy: ``"round_robin"``, ``"least_outstanding"`` (fewest in-flight
+            requests) or ``"ewma"`` (lowest latency EWMA weighted by in-flight
+            requests).
+        failure_threshold: Consecutive failures before an endpoint is ejected.
+        ejection_time: First ejection in seconds; doubles on each failed probe.
+        max_ejection_time: Cap on the ejection time.
+        decay: EWMA weight of the newest latency sample.
+
+    If every endpoint is ejected, the one due back first is used anyway rather
+    than failing outright. Safe to share between threads and clients.
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        ejection_time: float = 10.0,
+        max_ejection_time: float = 300.0,
+        decay: float = 0.3,
+    ):
+        if not base_urls:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+        self.endpoints = [Endpoint(url) for url in base_urls]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.decay = decay
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """
+        Pick an endpoint for one request and count it as outstanding. Endpoints
+        in `exclude` (already tried by this request) are avoided when possible.
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = self._available(now, exclude) or self._available(now, ()) or [
+                min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)
+            ]
+            endpoint = self._select(candidates)
+            if endpoint.ejections and endpoint.ejected_until <= now:
+                endpoint.probing = True
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: Optional[float] = None, failed: bool = False) -> None:
+        """
+        Finish a request. `latency` is the response time of a successful call;
+        `failed` marks an endpoint-level failure (transport error or 5xx).
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            probe, endpoint.probing = endpoint.probing, False
+            if failed:
+                endpoint.failures += 1
+                if probe or (not endpoint.ejections and endpoint.failures >= self.failure_threshold):
+                    endpoint.ejections += 1
+                    backoff = self.ejection_time * 2 ** (endpoint.ejections - 1)
+                    endpoint.ejected_until = time.monotonic() + min(backoff, self.max_ejection_time)
+                return
+            endpoint.failures = 0
+            if probe:
+                endpoint.ejections = 0
+            if latency is not None:
+                previous = endpoint.latency
+                endpoint.latency = latency if not previous else previous + self.decay * (latency - previous)
+
+    def abandon(self, endpoint: Endpoint) -> None:
+        """
+        Finish a request that ended without a verdict (cancelled or
+        interrupted before a response). The endpoint's health is left as it
+        was; an interrupted probe only lets the next probe through.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+
+    def can_failover(self, tried: Sequence[Endpoint]) -> bool:
+        """Whether an endpoint not in `tried` is currently usable."""
+        with self._lock:
+            return bool(self._available(time.monotonic(), tried))
+
+    def _available(self, now: float, exclude: Sequence[Endpoint]) -> List[Endpoint]:
+        return [
+            endpoint
+            for endpoint in self.endpoints
+            if endpoint not in exclude
+            and (not endpoint.ejections or (endpoint.ejected_until <= now and not endpoint.probing))
+        ]
+
+    def _select(self, candidates: List[Endpoint]) -> Endpoint:
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == "round_robin":
+            self._next += 1
+            return candidates[self._next % len(candidates)]
+        if self.strategy == "least_outstanding":
+            fewest = min(endpoint.outstanding for endpoint in candidates)
+            return random.choice([endpoint for endpoint in candidates if endpoint.outstanding == fewest])
+        # "ewma": unmeasured endpoints score 0 and are tried first.
+        return min(candidates, key=lambda endpoint: endpoint.latency * (endpoint.outstanding + 1))
@@ -0,0 +1,241 @@
+"""
+Response caching for providers.
+
+Identical requests are keyed by a canonical hash and answered from a
+`ResponseCache` instead of the upstream model. `MemoryCache` is an in-process
+LRU with TTL; `SQLiteCache` persists entries on disk and can be shared by
+several worker processes on one host.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .models import OpenResponsesOutput, OpenResponsesRequest
+
+
+def request_cache_key(request: OpenResponsesRequest) -> str:
+    """
+    Canonical hash of a request. `stream` is ignored so streamed and
+    non-streamed requests share entries; keys are sorted so equivalent
+    tool-call arguments hash the same.
+    """
+    payload = request.model_dump(mode="json", exclude={"stream"})
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for a cache."""
+
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class ResponseCache(ABC):
+    """
+    Storage interface for cached responses.
+
+    The provider server calls the async methods `aget`, `aset` and `astats`.
+    By default they run the synchronous ones inline, which suits fast
+    in-memory stores; stores that do blocking I/O override them to run it
+    off the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[OpenResponsesOutput]:
+        """Return the cached output, or None on a miss. Updates `stats`."""
+
+    @abstractmethod
+    def set(self, key: str, output: OpenResponsesOutput) -> None:
+        """Store an output, evicting older entries if needed."""
+
+    async def aget(self, key: str) -> Optional[OpenResponsesOutput]:
+        """`get` for callers on the event loop."""
+        return self.get(key)
+
+    async def aset(self, key: str, output: OpenResponsesOutput) -> None:
+        """`set` for callers on the event loop."""
+        self.set(key, output)
+
+    async def astats(self) -> Dict[str, float]:
+        """The counters reported at ``GET /v1/cache/stats``."""
+        return self.stats.as_dict()
+
+    def close(self) -> None:
+        """Release resources held by the cache."""
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU cache with a per-entry TTL.
+
+    Args:
+        max_entries: Least recently used entries are evicted beyond this size.
+        ttl: Seconds an entry stays valid; None keeps entries until evicted.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 300.0):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, OpenResponsesOutput]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[OpenResponsesOutput]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires, output = entry
+        if expires and expires <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return output
+
+    def set(self, key: str, output: OpenResponsesOutput) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._entries[key] = (expires, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+class SQLiteCache(ResponseCache):
+    """
+    SQLite-backed cache. Safe to share between processes on one host (WAL mode).
+
+    `aget`, `aset` and `astats` run in a worker thread, so a busy database
+    never stalls the event loop. `stats` counts this process's lookups;
+    `astats` reports the counters of every process sharing `path`.
+
+    Args:
+        path: Database file.
+        max_entries: Least recently used entries are evicted beyond this size.
+        ttl: Seconds an entry stays valid; None keeps entries until evicted.
+    """
+
+    def __init__(self, path: str = "openresponses-cache.db", max_entries: int = 100_000, ttl: Optional[float] = 3600.0):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[OpenResponsesOutput]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(misses=1)
+                return None
+            value, expires = row
+            if expires and expires <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count(expirations=1, misses=1)
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._count(hits=1)
+        return OpenResponsesOutput.model_validate_json(value)
+
+    def set(self, key: str, output: OpenResponsesOutput) -> None:
+        now = time.time()
+        expires = now + self.ttl if self.ttl else 0.0
+        value = output.model_dump_json().encode()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, expires, now),
+            )
+            self._writes += 1
+            # Size checks are amortized over writes instead of counting rows every time.
+            if self._writes % 64 == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        expired = self._conn.execute("DELETE FROM responses WHERE expires > 0 AND expires <= ?", (now,)).rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = max(count - self.max_entries, 0)
+        if excess:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+        self._count(expirations=max(expired, 0), evictions=excess)
+
+    def _count(self, **deltas: int) -> None:
+        # Call with the lock held. Counted here and in the shared table.
+        for name, delta in deltas.items():
+            setattr(self.stats, name, getattr(self.stats, name) + delta)
+        self._conn.executemany(
+            "INSERT INTO stats (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            [(name, delta) for name, delta in deltas.items() if delta],
+        )
+
+    def shared_stats(self) -> CacheStats:
+        """Counters of every process sharing the database."""
+        stats = CacheStats()
+        with self._lock:
+            rows = self._conn.execute("SELECT name, value FROM stats").fetchall()
+        for name, value in rows:
+            if name in CacheStats.__slots__:
+                setattr(stats, name, value)
+        return stats
+
+    async def aget(self, key: str) -> Optional[OpenResponsesOutput]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, output: OpenResponsesOutput) -> None:
+        await asyncio.to_thread(self.set, key, output)
+
+    async def astats(self) -> Dict[str, float]:
+        return (await asyncio.to_thread(self.shared_stats)).as_dict()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
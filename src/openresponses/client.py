@@ -1,103 +1,768 @@
-import json
-from typing import AsyncGenerator, Generator, List, Optional, Union
+import asyncio
+import itertools
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import httpx
-from .models import OpenResponsesRequest, OpenResponsesOutput, StreamEvent, MessageItem
+from pydantic import ValidationError
+from .balancer import FAILOVER_STATUSES, Endpoint, EndpointPool
+from .codec import WireCodec
+from .metrics import Observer, RequestMetrics, atrace, trace
+from .models import OpenResponsesRequest, OpenResponsesOutput, StreamEvent, ResponseItem, STREAM_EVENT_TYPES
+from .ratelimit import THROTTLE_STATUSES, AdaptiveConcurrencyLimiter, RateLimiter
+from .retry import HedgePolicy, RetryPolicy
+from .sse import aiter_sse, iter_sse
+
+# Connection pool defaults shared by both clients. Keep-alive connections are
+# reused across `create` calls, so TCP/TLS setup is paid once per connection
+# instead of once per request.
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+# Only retries failures the server never acted on (connect errors, 429, 503).
+DEFAULT_RETRY = RetryPolicy()
+
+TimeoutTypes = Union[float, httpx.Timeout, None]
+EventFactory = Callable[[str, Dict[str, Any]], StreamEvent]
+
+
+def _pool_options(timeout: TimeoutTypes, limits: httpx.Limits, http2: bool) -> dict:
+    """
+    Keyword arguments for a pooled httpx client.
+    """
+    return {
+        "timeout": timeout if isinstance(timeout, httpx.Timeout) else httpx.Timeout(timeout),
+        "limits": limits,
+        "http2": http2,
+    }
+
+
+def _event_factories(trusted: bool) -> Tuple[Dict[str, EventFactory], EventFactory]:
+    """
+    Event-name -> constructor table for the stream parsers, resolved once per client.
+    """
+    attr = "from_sse_trusted" if trusted else "from_sse"
+    factories = {name: getattr(cls, attr) for name, cls in STREAM_EVENT_TYPES.items()}
+    return factories, getattr(StreamEvent, attr)
+
+
+def _make_event(factories: Dict[str, EventFactory], default: EventFactory, name: str, data: Dict[str, Any]) -> StreamEvent:
+    """
+    Build the typed event for `name`. A known event whose payload does not fit
+    its model (e.g. a structured ``error``) is passed on as a plain
+    `StreamEvent` rather than ending the stream.
+    """
+    try:
+        return factories.get(name, default)(name, data)
+    except ValidationError:
+        return default(name, data)
+
+
+def _endpoint_pool(
+    base_url: Optional[str], endpoints: Union[Sequence[str], EndpointPool, None]
+) -> Tuple[Optional[str], Optional[EndpointPool]]:
+    if (base_url is None) == (endpoints is None):
+        raise ValueError("Pass exactly one of base_url or endpoints")
+    if endpoints is None:
+        return base_url.rstrip("/"), None
+    return None, endpoints if isinstance(endpoints, EndpointPool) else EndpointPool(endpoints)
+
+
+def _report(pool: EndpointPool, endpoint: Endpoint, tried: List[Endpoint], latency: float, status: Optional[int]) -> bool:
+    """
+    Report a finished attempt to the pool (`status` is None for a transport
+    error). Returns True when the request should fail over to another endpoint.
+    """
+    failed = status is None or status >= 500
+    pool.release(endpoint, None if failed else latency, failed)
+    if status is None or status in FAILOVER_STATUSES:
+        tried.append(endpoint)
+        return pool.can_failover(tried)
+    return False
+
+
+BatchRequest = Union[OpenResponsesRequest, Dict[str, Any]]
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one request in a `create_many` batch; exactly one of `output`/`error` is set."""
+    index: int
+    request: BatchRequest
+    output: Optional[OpenResponsesOutput] = None
+    error: Optional[BaseException] = None
+
+
+def _batch_request(raw: BatchRequest) -> OpenResponsesRequest:
+    request = raw if isinstance(raw, OpenResponsesRequest) else OpenResponsesRequest.model_validate(raw)
+    if request.stream:
+        raise ValueError("create_many only supports non-streaming requests")
+    return request
+
+
+class EventStream:
+    """
+    The events of a streamed response.
+
+    Iterate it like a generator. The HTTP response stays open until the
+    stream is exhausted or closed, so when you may stop early, use it as a
+    context manager: leaving the block closes the connection, which also
+    tells the provider to stop generating.
+
+    Example:
+        ```python
+        with client.create(model="deepseek/deepseek-r1", input="Hi", stream=True) as stream:
+            for event in stream:
+                if isinstance(event, TextDelta):
+                    break
+        ```
+    """
+
+    __slots__ = ("_events",)
+
+    def __init__(self, events: Generator[StreamEvent, None, None]):
+        self._events = events
+
+    def __iter__(self) -> Generator[StreamEvent, None, None]:
+        # The generator itself, so iterating costs no extra call per event.
+        return self._events
+
+    def __next__(self) -> StreamEvent:
+        return next(self._events)
+
+    def close(self) -> None:
+        """Stop the stream and release its connection. Idempotent."""
+        self._events.close()
+
+    def __enter__(self) -> "EventStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._events.close()
+
+
+class AsyncEventStream:
+    """
+    The events of a streamed response, for `AsyncOpenResponsesClient`.
+
+    As `EventStream`, with ``async with`` and `aclose()`. Breaking out of an
+    ``async for`` does not close an async iterator by itself, so use the
+    context manager (or call `aclose()`) to release the connection at once.
+
+    Example:
+        ```python
+        async with await client.create(model="deepseek/deepseek-r1", input="Hi", stream=True) as stream:
+            async for event in stream:
+                if isinstance(event, TextDelta):
+                    break
+        ```
+    """
+
+    __slots__ = ("_events",)
+
+    def __init__(self, events: AsyncGenerator[StreamEvent, None]):
+        self._events = events
+
+    def __aiter__(self) -> AsyncGenerator[StreamEvent, None]:
+        return self._events
+
+    async def __anext__(self) -> StreamEvent:
+        return await self._events.__anext__()
+
+    async def aclose(self) -> None:
+        """Stop the stream and release its connection. Idempotent."""
+        await self._events.aclose()
+
+    async def __aenter__(self) -> "AsyncEventStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._events.aclose()
+
 
 class OpenResponsesClient:
     """
     Async/Sync Client for Open Responses API.
+
+    The client owns a long-lived `httpx.Client` connection pool. Use it as a
+    context manager or call `close()` when done to release connections.
+
+    Args:
+        base_url: Provider root URL, e.g. ``http://localhost:8001``.
+        endpoints: Instead of `base_url`, several equivalent provider URLs or
+            an `EndpointPool`. Requests are balanced across them, failing
+            endpoints are ejected, and non-streaming requests fail over to
+            another endpoint on connection errors and 429/502/503/504.
+        api_key: Optional bearer token.
+        timeout: Seconds or an `httpx.Timeout` with per-phase
+            connect/read/write/pool timeouts.
+        limits: Pool size and keep-alive expiry (`httpx.Limits`).
+        http2: Enable HTTP/2 (requires the ``http2`` extra).
+        http_client: Bring your own `httpx.Client`; it is not closed by `close()`.
+        trusted: Build stream events without validation. Only use with
+            providers you trust.
+        retry: `RetryPolicy` for failed attempts; None disables retries.
+            Streams are only retried before their first event is yielded.
+        observer: Optional `openresponses.metrics.Observer` receiving latency
+            and throughput measurements for every request.
+        wire_format: ``"json"`` (default) or ``"msgpack"`` (requires the
+            ``msgpack`` extra and a provider that accepts it).
+        compression: ``"gzip"`` or ``"zstd"`` to compress large request
+            bodies. Compressed responses are always accepted and decoded.
     """
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
-        self.base_url = base_url.rstrip("/")
-        self.headers = {"Content-Type": "application/json"}
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        endpoints: Union[Sequence[str], EndpointPool, None] = None,
+        timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = False,
+        http_client: Optional[httpx.Client] = None,
+        trusted: bool = False,
+        retry: Optional[RetryPolicy] = DEFAULT_RETRY,
+        observer: Optional[Observer] = None,
+        wire_format: str = "json",
+        compression: Optional[str] = None,
+    ):
+        self.base_url, self.endpoints = _endpoint_pool(base_url, endpoints)
+        self._url = f"{self.base_url}/v1/responses" if self.endpoints is None else ""
+        self._codec = WireCodec(wire_format, compression)
+        self.headers = dict(self._codec.headers)
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
+        self._owns_client = http_client is None
+        self._client = http_client or httpx.Client(**_pool_options(timeout, limits, http2))
+        self._event_factories, self._default_event_factory = _event_factories(trusted)
+        self.retry = retry
+        self.observer = observer
+
+    def __enter__(self) -> "OpenResponsesClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying connection pool.
+        """
+        if self._owns_client:
+            self._client.close()
 
     def create(
         self,
         model: str,
-        input: Union[str, List[MessageItem]],
+        input: Union[str, List[ResponseItem]],
         stream: bool = False,
-        max_tool_calls: Optional[int] = None
-    ) -> Union[OpenResponsesOutput, Generator[StreamEvent, None, None]]:
+        max_tool_calls: Optional[int] = None,
+        previous_response_id: Optional[str] = None,
+    ) -> Union[OpenResponsesOutput, EventStream]:
         """
         Synchronous request to create a response.
+
+        To continue a conversation on a server with a conversation store, pass
+        the previous response's id and only the new input.
         """
         request = OpenResponsesRequest(
             model=model,
             input=input,
             stream=stream,
-            max_tool_calls=max_tool_calls
+            max_tool_calls=max_tool_calls,
+            previous_response_id=previous_response_id,
         )
-        
-        url = f"{self.base_url}/v1/responses"
-        
+
         if stream:
-            return self._stream_request(url, request)
+            return self._stream_request(request)
         else:
-            with httpx.Client() as client:
-                resp = client.post(url, json=request.model_dump(), headers=self.headers, timeout=60.0)
-                resp.raise_for_status()
-                return OpenResponsesOutput(**resp.json())
-
-    def _stream_request(self, url: str, request: OpenResponsesRequest) -> Generator[StreamEvent, None, None]:
-        with httpx.Client() as client:
-            with client.stream("POST", url, json=request.model_dump(), headers=self.headers, timeout=60.0) as resp:
-                resp.raise_for_status()
-                for line in resp.iter_lines():
-                    if line.startswith("event:"):
-                        event_type = line.split(": ", 1)[1]
-                    elif line.startswith("data:"):
-                        data_str = line.split(": ", 1)[1]
-                        data = json.loads(data_str)
-                        yield StreamEvent(event=event_type, data=data)
+            return self._send(request)
+
+    def create_many(
+        self,
+        requests: Iterable[BatchRequest],
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> Iterator["BatchResult"]:
+        """
+        Run many non-streaming requests on a thread pool sharing this client's
+        connection pool.
+
+        Results are yielded as they complete (or in input order with
+        ``ordered=True``); failures are reported per item in `BatchResult.error`
+        and never stop the batch. Keep `concurrency` within the pool's
+        ``max_connections``.
+        """
+        items = enumerate(requests)
+        window = max(concurrency * 2, 1)
+
+        def run(index: int, raw: BatchRequest) -> BatchResult:
+            try:
+                request = _batch_request(raw)
+                return BatchResult(index, request, self._send(request))
+            except Exception as e:
+                return BatchResult(index, raw, error=e)
+
+        pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="openresponses")
+        pending: Deque[Future] = deque()
+        try:
+            for index, raw in itertools.islice(items, window):
+                pending.append(pool.submit(run, index, raw))
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in finished]
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    for index, raw in itertools.islice(items, 1):
+                        pending.append(pool.submit(run, index, raw))
+                    yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _send(self, request: OpenResponsesRequest) -> OpenResponsesOutput:
+        if self.observer is None:
+            return self._send_once(request)
+        metrics = self.observer.start("client", request.model, False)
+        try:
+            output = self._send_once(request)
+        except BaseException as e:
+            metrics.finish(e)
+            raise
+        metrics.finish()
+        return output
+
+    def _send_once(self, request: OpenResponsesRequest) -> OpenResponsesOutput:
+        retry = self.retry
+        pool = self.endpoints
+        body, encoding = self._codec.encode(request)
+        headers = retry.headers(self.headers) if retry is not None else self.headers
+        headers = self._codec.request_headers(headers, encoding)
+        tried: List[Endpoint] = []
+        attempt = 0
+        while True:
+            endpoint = pool.acquire(tried) if pool is not None else None
+            url = self._url if endpoint is None else endpoint.url
+            start = time.monotonic()
+            try:
+                resp = self._client.post(url, content=body, headers=headers)
+            except httpx.TransportError as e:
+                resp, error = None, e
+            except BaseException:
+                if endpoint is not None:
+                    pool.abandon(endpoint)
+                raise
+            status = resp.status_code if resp is not None else None
+            # Failing over to another endpoint is immediate and does not use up retries.
+            if endpoint is not None and _report(pool, endpoint, tried, time.monotonic() - start, status):
+                continue
+            attempt += 1
+            if resp is None:
+                delay = retry.next_delay(attempt, error=error) if retry is not None else None
+                if delay is None:
+                    raise error
+            elif not resp.is_error:
+                return self._codec.decode(OpenResponsesOutput, resp.content, resp.headers.get("content-type"))
+            else:
+                delay = retry.next_delay(attempt, response=resp) if retry is not None else None
+                if delay is None:
+                    resp.raise_for_status()
+            time.sleep(delay)
+
+    def _stream_request(self, request: OpenResponsesRequest) -> EventStream:
+        if self.observer is None:
+            return EventStream(self._stream_events(request, None))
+        metrics = self.observer.start("client", request.model, True)
+        return EventStream(trace(self._stream_events(request, metrics), metrics))
+
+    def _stream_events(
+        self, request: OpenResponsesRequest, metrics: Optional[RequestMetrics]
+    ) -> Generator[StreamEvent, None, None]:
+        retry = self.retry
+        pool = self.endpoints
+        body, encoding = self._codec.encode(request)
+        headers = retry.headers(self.headers) if retry is not None else self.headers
+        headers = self._codec.request_headers(headers, encoding)
+        factories, default = self._event_factories, self._default_event_factory
+        tried: List[Endpoint] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            started = False
+            endpoint = pool.acquire(tried) if pool is not None else None
+            latency = None
+            failed = False
+            url = self._url if endpoint is None else endpoint.url
+            start = time.monotonic()
+            try:
+                with self._client.stream("POST", url, content=body, headers=headers) as resp:
+                    latency = time.monotonic() - start
+                    failed = resp.status_code >= 500
+                    if not resp.is_error:
+                        if metrics is not None:
+                            metrics.first_byte()
+                        for sse in iter_sse(resp.iter_bytes()):
+                            if metrics is not None:
+                                metrics.event(sse.event, len(sse.raw))
+                            try:
+                                data = sse.json()
+                            except ValueError:  # malformed JSON or UTF-8
+                                continue
+                            if not isinstance(data, dict):
+                                continue
+                            started = True
+                            yield _make_event(factories, default, sse.event, data)
+                        return
+                    delay = retry.next_delay(attempt, response=resp) if retry is not None else None
+                    if delay is None:
+                        resp.raise_for_status()
+            except httpx.TransportError as e:
+                failed = True
+                # Once an event was yielded the caller has seen partial output; never replay.
+                delay = retry.next_delay(attempt, error=e) if retry is not None and not started else None
+                if delay is None:
+                    raise
+            finally:
+                if endpoint is not None:
+                    if latency is None and not failed:
+                        # Interrupted before a response: no verdict on the endpoint.
+                        pool.abandon(endpoint)
+                    else:
+                        pool.release(endpoint, None if failed else latency, failed)
+                    tried.append(endpoint)
+            time.sleep(delay)
 
 class AsyncOpenResponsesClient:
     """
     Async Client for Open Responses API.
+
+    The client owns a long-lived `httpx.AsyncClient` connection pool. Use it as
+    an async context manager or call `aclose()` when done. Accepts the same
+    pool, ``endpoints``, ``trusted``, ``retry``, ``observer``, ``wire_format``
+    and ``compression`` options as
+    `OpenResponsesClient`.
+
+    Args:
+        hedge: Optional `HedgePolicy`. Non-streaming calls slower than its
+            delay are raced against a second attempt.
+        rate_limiter: Optional `RateLimiter` applied to every attempt.
+        concurrency_limiter: Optional `AdaptiveConcurrencyLimiter`. Streams
+            hold a slot until they finish and report their time to first byte.
     """
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
-        self.base_url = base_url.rstrip("/")
-        self.headers = {"Content-Type": "application/json"}
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        endpoints: Union[Sequence[str], EndpointPool, None] = None,
+        timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None,
+        trusted: bool = False,
+        retry: Optional[RetryPolicy] = DEFAULT_RETRY,
+        observer: Optional[Observer] = None,
+        wire_format: str = "json",
+        compression: Optional[str] = None,
+        hedge: Optional[HedgePolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ):
+        self.base_url, self.endpoints = _endpoint_pool(base_url, endpoints)
+        self._url = f"{self.base_url}/v1/responses" if self.endpoints is None else ""
+        self._codec = WireCodec(wire_format, compression)
+        self.headers = dict(self._codec.headers)
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
+        self._owns_client = http_client is None
+        self._client = http_client or httpx.AsyncClient(**_pool_options(timeout, limits, http2))
+        self._event_factories, self._default_event_factory = _event_factories(trusted)
+        self.retry = retry
+        self.observer = observer
+        self.hedge = hedge
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+
+    async def __aenter__(self) -> "AsyncOpenResponsesClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying connection pool.
+        """
+        if self._owns_client:
+            await self._client.aclose()
             
     async def create(
         self,
         model: str,
-        input: Union[str, List[MessageItem]],
+        input: Union[str, List[ResponseItem]],
         stream: bool = False,
-        max_tool_calls: Optional[int] = None
-    ) -> Union[OpenResponsesOutput, AsyncGenerator[StreamEvent, None]]:
+        max_tool_calls: Optional[int] = None,
+        previous_response_id: Optional[str] = None,
+    ) -> Union[OpenResponsesOutput, AsyncEventStream]:
         request = OpenResponsesRequest(
             model=model,
             input=input,
             stream=stream,
-            max_tool_calls=max_tool_calls
+            max_tool_calls=max_tool_calls,
+            previous_response_id=previous_response_id,
         )
-        
-        url = f"{self.base_url}/v1/responses"
 
         if stream:
-            return self._stream_request(url, request)
+            return self._stream_request(request)
         else:
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(url, json=request.model_dump(), headers=self.headers, timeout=60.0)
-                resp.raise_for_status()
-                return OpenResponsesOutput(**resp.json())
-
-    async def _stream_request(self, url: str, request: OpenResponsesRequest) -> AsyncGenerator[StreamEvent, None]:
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", url, json=request.model_dump(), headers=self.headers, timeout=60.0) as resp:
-                resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if line.startswith("event:"):
-                        event_type = line.split(": ", 1)[1]
-                    elif line.startswith("data:"):
-                        data_str = line.split(": ", 1)[1]
-                        # Handle potential keeping of newlines or empty data
-                        try:
-                            data = json.loads(data_str)
-                            yield StreamEvent(event=event_type, data=data)
-                        except json.JSONDecodeError:
-                            continue
+            return await self._send(request)
+
+    async def create_many(
+        self,
+        requests: Iterable[BatchRequest],
+        concurrency: int = 16,
+        ordered: bool = False,
+    ) -> AsyncGenerator["BatchResult", None]:
+        """
+        Run many non-streaming requests over this client's connection pool with
+        at most `concurrency` in flight.
+
+        Results are yielded as they complete (or in input order with
+        ``ordered=True``); failures are reported per item in `BatchResult.error`
+        and never cancel the batch. At most ``2 * concurrency`` results are
+        buffered, so the input may be a lazy iterator of any length. Keep
+        `concurrency` within the pool's ``max_connections``.
+
+        Example:
+            ```python
+            async for result in client.create_many(
+                ({"model": "llama3", "input": prompt} for prompt in prompts),
+                concurrency=64,
+            ):
+                if result.error is None:
+                    print(result.index, result.output.output[-1])
+            ```
+        """
+        items = enumerate(requests)
+        window = asyncio.Semaphore(max(concurrency * 2, 1))
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                # The window bounds started-but-unconsumed results.
+                await window.acquire()
+                try:
+                    index, raw = next(items)
+                except StopIteration:
+                    window.release()
+                    return
+                try:
+                    request = _batch_request(raw)
+                    result = BatchResult(index, request, await self._send(request))
+                except Exception as e:
+                    result = BatchResult(index, raw, error=e)
+                results.put_nowait(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(concurrency, 1))]
+        finished = asyncio.ensure_future(asyncio.gather(*workers))
+
+        def on_finished(future: "asyncio.Future[Any]") -> None:
+            if not future.cancelled():
+                future.exception()  # Marks it retrieved when the consumer left early.
+            results.put_nowait(None)
+
+        finished.add_done_callback(on_finished)
+        reorder: Dict[int, BatchResult] = {}
+        next_index = 0
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                if not ordered:
+                    window.release()
+                    yield result
+                    continue
+                reorder[result.index] = result
+                while next_index in reorder:
+                    window.release()
+                    yield reorder.pop(next_index)
+                    next_index += 1
+            finished.result()
+        finally:
+            # Cancelling the gather cancels any worker still running.
+            finished.cancel()
+
+    async def _send(self, request: OpenResponsesRequest) -> OpenResponsesOutput:
+        retry = self.retry
+        body, encoding = self._codec.encode(request)
+        headers = retry.headers(self.headers) if retry is not None else self.headers
+        headers = self._codec.request_headers(headers, encoding)
+        cost = self.rate_limiter.cost(request) if self.rate_limiter is not None else 0
+        if self.observer is None:
+            return await self._send_hedged(body, headers, cost)
+        metrics = self.observer.start("client", request.model, False)
+        try:
+            output = await self._send_hedged(body, headers, cost)
+        except BaseException as e:
+            metrics.finish(e)
+            raise
+        metrics.finish()
+        return output
+
+    async def _send_hedged(self, body: bytes, headers: Dict[str, str], cost: int) -> OpenResponsesOutput:
+        if self.hedge is None:
+            return await self._send_once(body, headers, cost)
+        # Time queued in our own limiters is not upstream latency: admit the
+        # first attempt before the hedge timer starts, so a saturated limiter
+        # does not set off hedges that would only queue behind it.
+        limiter = await self._admit(cost)
+        handed_over: List[bool] = []
+
+        def attempt() -> Awaitable[OpenResponsesOutput]:
+            if handed_over:
+                return self._send_once(body, headers, cost)
+            handed_over.append(True)
+            return self._send_once(body, headers, cost, admitted=True, limiter=limiter)
+
+        try:
+            return await self.hedge.run(attempt, observe=False)
+        finally:
+            # Cancelled before the first attempt ran: its slot is still ours.
+            if not handed_over and limiter is not None:
+                limiter.release()
+
+    async def _send_once(
+        self,
+        body: bytes,
+        headers: Dict[str, str],
+        cost: int,
+        admitted: bool = False,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> OpenResponsesOutput:
+        retry = self.retry
+        pool = self.endpoints
+        tried: List[Endpoint] = []
+        attempt = 0
+        while True:
+            if admitted:
+                admitted = False
+            else:
+                limiter = await self._admit(cost)
+            endpoint = pool.acquire(tried) if pool is not None else None
+            url = self._url if endpoint is None else endpoint.url
+            start = time.monotonic()
+            try:
+                resp = await self._client.post(url, content=body, headers=headers)
+            except httpx.TransportError as e:
+                resp, error = None, e
+            except BaseException:
+                # Cancelled (e.g. a losing hedge): free the slots without a verdict.
+                if limiter is not None:
+                    limiter.release()
+                if endpoint is not None:
+                    pool.abandon(endpoint)
+                raise
+            latency = time.monotonic() - start
+            status = resp.status_code if resp is not None else None
+            if limiter is not None:
+                limiter.release(None if resp is None else latency, status in THROTTLE_STATUSES)
+            # Failing over to another endpoint is immediate and does not use up retries.
+            if endpoint is not None and _report(pool, endpoint, tried, latency, status):
+                continue
+            attempt += 1
+            if resp is None:
+                delay = retry.next_delay(attempt, error=error) if retry is not None else None
+                if delay is None:
+                    raise error
+            elif not resp.is_error:
+                if self.hedge is not None:
+                    # From the send, so hedge delays reflect the upstream alone.
+                    self.hedge.observe(latency)
+                return self._codec.decode(OpenResponsesOutput, resp.content, resp.headers.get("content-type"))
+            else:
+                delay = retry.next_delay(attempt, response=resp) if retry is not None else None
+                if delay is None:
+                    resp.raise_for_status()
+            await asyncio.sleep(delay)
+
+    async def _admit(self, cost: int) -> Optional[AdaptiveConcurrencyLimiter]:
+        # Quota first, then a concurrency slot, so slots are not held while paced.
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(cost)
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            await limiter.acquire()
+        return limiter
+
+    def _stream_request(self, request: OpenResponsesRequest) -> AsyncEventStream:
+        if self.observer is None:
+            return AsyncEventStream(self._stream_events(request, None))
+        metrics = self.observer.start("client", request.model, True)
+        return AsyncEventStream(atrace(self._stream_events(request, metrics), metrics))
+
+    async def _stream_events(
+        self, request: OpenResponsesRequest, metrics: Optional[RequestMetrics]
+    ) -> AsyncGenerator[StreamEvent, None]:
+        retry = self.retry
+        pool = self.endpoints
+        body, encoding = self._codec.encode(request)
+        headers = retry.headers(self.headers) if retry is not None else self.headers
+        headers = self._codec.request_headers(headers, encoding)
+        cost = self.rate_limiter.cost(request) if self.rate_limiter is not None else 0
+        factories, default = self._event_factories, self._default_event_factory
+        tried: List[Endpoint] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            started = False
+            limiter = await self._admit(cost)
+            endpoint = pool.acquire(tried) if pool is not None else None
+            latency = None
+            throttled = failed = False
+            url = self._url if endpoint is None else endpoint.url
+            start = time.monotonic()
+            try:
+                async with self._client.stream("POST", url, content=body, headers=headers) as resp:
+                    latency = time.monotonic() - start
+                    throttled = resp.status_code in THROTTLE_STATUSES
+                    failed = resp.status_code >= 500
+                    if not resp.is_error:
+                        if metrics is not None:
+                            metrics.first_byte()
+                        async for sse in aiter_sse(resp.aiter_bytes()):
+                            if metrics is not None:
+                                metrics.event(sse.event, len(sse.raw))
+                            try:
+                                data = sse.json()
+                            except ValueError:  # malformed JSON or UTF-8
+                                continue
+                            if not isinstance(data, dict):
+                                continue
+                            started = True
+                            yield _make_event(factories, default, sse.event, data)
+                        return
+                    delay = retry.next_delay(attempt, response=resp) if retry is not None else None
+                    if delay is None:
+                        resp.raise_for_status()
+            except httpx.TransportError as e:
+                failed = True
+                # Once an event was yielded the caller has seen partial output; never replay.
+                delay = retry.next_delay(attempt, error=e) if retry is not None and not started else None
+                if delay is None:
+                    raise
+            finally:
+                if limiter is not None:
+                    limiter.release(latency, throttled)
+                if endpoint is not None:
+                    if latency is None and not failed:
+                        # Interrupted before a response: no verdict on the endpoint.
+                        pool.abandon(endpoint)
+                    else:
+                        pool.release(endpoint, None if failed else latency, failed)
+                    tried.append(endpoint)
+            await asyncio.sleep(delay)
@@ -0,0 +1,206 @@
+"""
+Wire encoding and compression.
+
+Bodies are JSON by default, serialized by Pydantic straight to bytes. Client
+and provider can instead agree on msgpack (the ``msgpack`` extra) through
+``Content-Type``/``Accept``, and compress bodies with gzip or zstd (the
+``zstd`` extra) through ``Content-Encoding``/``Accept-Encoding``. Streams stay
+SSE; their frames are compressed with a flush per batch, so compression never
+holds back a token.
+"""
+
+import importlib.util
+import zlib
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+WIRE_FORMATS = {"json": JSON, "msgpack": MSGPACK}
+
+# Bodies smaller than this are sent uncompressed: the saving is a few bytes
+# and the compressor setup costs more than it saves.
+COMPRESS_MIN_BYTES = 1024
+# Upper bound on a decompressed request body, against decompression bombs.
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+_GZIP_WBITS = 31  # zlib with a gzip header and trailer
+_CHUNK = 64 * 1024
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Content encodings available in this environment, in order of preference."""
+    return ("zstd", "gzip") if _installed("zstandard") else ("gzip",)
+
+
+def msgpack_available() -> bool:
+    return _installed("msgpack")
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a whole body with ``gzip`` or ``zstd``."""
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, _GZIP_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def decompress(data: bytes, encoding: str, max_size: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+    """
+    Decompress a body. Raises `ValueError` for unknown encodings, corrupt data
+    or output larger than `max_size`.
+    """
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return data
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        try:
+            output = decompressor.decompress(data, max_size + 1)
+        except zlib.error as e:
+            raise ValueError(f"Invalid gzip body: {e}") from None
+    elif encoding == "zstd" and _installed("zstandard"):
+        import zstandard
+
+        reader = zstandard.ZstdDecompressor().stream_reader(data)
+        chunks, size = [], 0
+        try:
+            while size <= max_size:
+                chunk = reader.read(_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Invalid zstd body: {e}") from None
+        output = b"".join(chunks)
+    else:
+        raise ValueError(f"Unsupported content encoding '{encoding}'")
+    if len(output) > max_size:
+        raise ValueError(f"Decompressed body exceeds {max_size} bytes")
+    return output
+
+
+class StreamCompressor:
+    """
+    Compresses a stream chunk by chunk. Every `compress` call returns output
+    that decodes to everything written so far (a sync flush), while the
+    compression window still spans the whole stream, so repetitive SSE frames
+    compress well.
+    """
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, _GZIP_WBITS)
+            self._sync = zlib.Z_SYNC_FLUSH
+        elif encoding == "zstd":
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+            self._sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = self._compressor
+        return compressor.compress(data) + compressor.flush(self._sync)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def negotiate_encoding(accept_encoding: str, offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick the first of `offered` that an ``Accept-Encoding`` header allows, or None.
+    """
+    if not accept_encoding or not offered:
+        return None
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q=") and params[2:] in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(name.strip())
+    for encoding in offered:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def accepts_msgpack(accept: str) -> bool:
+    return MSGPACK in accept and msgpack_available()
+
+
+def encode_model(model: BaseModel, content_type: str = JSON) -> bytes:
+    """Serialize a model to `content_type`. JSON skips the dict round trip entirely."""
+    if content_type == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(model.model_dump(mode="json"))
+    return model.model_dump_json().encode()
+
+
+def decode_model(cls: Type[M], data: bytes, content_type: str = JSON) -> M:
+    """Validate `data` of `content_type` as `cls`. Raises `ValueError` for undecodable msgpack."""
+    if content_type.split(";")[0].strip().lower() in (MSGPACK, "application/x-msgpack"):
+        import msgpack
+
+        try:
+            raw: Any = msgpack.unpackb(data)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack body: {e}") from None
+        return cls.model_validate(raw)
+    return cls.model_validate_json(data)
+
+
+class WireCodec:
+    """
+    How a client encodes its requests.
+
+    Args:
+        wire_format: ``"json"`` or ``"msgpack"``. With msgpack, non-streaming
+            responses are requested as msgpack too; providers that do not
+            support it answer in JSON.
+        compression: ``"gzip"`` or ``"zstd"`` to compress request bodies of at
+            least `min_size` bytes. Only use it with providers that accept
+            compressed bodies (such as `openresponses.server.create_app`).
+        min_size: Smallest body worth compressing.
+    """
+
+    def __init__(self, wire_format: str = "json", compression: Optional[str] = None, min_size: int = COMPRESS_MIN_BYTES):
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format must be one of {sorted(WIRE_FORMATS)}")
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError("compression must be None, 'gzip' or 'zstd'")
+        self.content_type = WIRE_FORMATS[wire_format]
+        self.compression = compression
+        self.min_size = min_size
+        self.headers: Dict[str, str] = {"Content-Type": self.content_type}
+        if wire_format == "msgpack":
+            self.headers["Accept"] = f"{MSGPACK}, {JSON};q=0.9"
+
+    def encode(self, model: BaseModel) -> Tuple[bytes, Optional[str]]:
+        """The request body and its content encoding (None if uncompressed)."""
+        body = encode_model(model, self.content_type)
+        if self.compression is None or len(body) < self.min_size:
+            return body, None
+        return compress(body, self.compression), self.compression
+
+    def request_headers(self, headers: Dict[str, str], encoding: Optional[str]) -> Dict[str, str]:
+        return headers if encoding is None else {**headers, "Content-Encoding": encoding}
+
+    def decode(self, cls: Type[M], data: bytes, content_type: Optional[str]) -> M:
+        return decode_model(cls, data, content_type or JSON)
@@ -0,0 +1,268 @@
+"""
+Server-side conversation state.
+
+Clients continue a conversation by sending ``previous_response_id`` and only
+the new input items. `ConversationStore` keeps the mapped message history of
+every response it served, so a turn costs mapping its new items instead of the
+whole history, and an optional `TruncationPolicy` keeps histories under a
+token budget.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import ResponseItem
+from .provider import OpenResponsesProvider
+
+Message = Dict[str, Any]
+
+# Role/formatting tokens chat APIs add per message, on top of its content.
+_MESSAGE_OVERHEAD = 4
+
+
+class _Summary(dict):
+    """A system message written by `SummarizeOldest`; unlike other system messages it can be cut again."""
+
+
+class Conversation:
+    """
+    An immutable mapped history.
+
+    Each turn is a node holding only the messages it added and a link to the
+    turn before it, so storing a turn costs its new messages rather than a
+    copy of the whole history. `total` is the estimated token count.
+    """
+
+    __slots__ = ("parent", "added", "tokens", "total")
+
+    def __init__(
+        self,
+        added: Tuple[Message, ...] = (),
+        tokens: Tuple[int, ...] = (),
+        parent: Optional["Conversation"] = None,
+    ):
+        self.parent = parent
+        self.added = added
+        self.tokens = tokens
+        self.total = sum(tokens) + (parent.total if parent is not None else 0)
+
+    def _turns(self) -> List["Conversation"]:
+        turns = []
+        node: Optional[Conversation] = self
+        while node is not None:
+            turns.append(node)
+            node = node.parent
+        turns.reverse()
+        return turns
+
+    def messages(self) -> List[Message]:
+        """All messages, oldest first."""
+        messages: List[Message] = []
+        for turn in self._turns():
+            messages.extend(turn.added)
+        return messages
+
+    def token_counts(self) -> List[int]:
+        """Estimated tokens of each message in `messages()`."""
+        tokens: List[int] = []
+        for turn in self._turns():
+            tokens.extend(turn.tokens)
+        return tokens
+
+
+class TruncationPolicy(ABC):
+    """
+    Keeps a history under `max_tokens`.
+
+    Once a history exceeds `max_tokens` it is cut down to `target` (75% of
+    `max_tokens` by default) rather than to just under the limit. The kept
+    prefix then stays identical for the next several turns, which keeps
+    upstream prompt caches warm and makes the cut a rare event.
+    """
+
+    def __init__(self, max_tokens: int, target: Optional[int] = None, keep_system: bool = True, keep_last: int = 1):
+        self.max_tokens = max_tokens
+        self.target = int(max_tokens * 0.75) if target is None else target
+        self.keep_system = keep_system
+        self.keep_last = keep_last
+
+    def apply(self, conversation: Conversation) -> Conversation:
+        """Return `conversation` if it fits, otherwise a smaller one."""
+        if conversation.total <= self.max_tokens:
+            return conversation
+        messages = conversation.messages()
+        tokens = conversation.token_counts()
+        kept, dropped = self._split(messages, tokens)
+        return self.compact(
+            [messages[i] for i in kept], [tokens[i] for i in kept], [messages[i] for i in dropped]
+        )
+
+    @abstractmethod
+    def compact(self, kept: List[Message], tokens: List[int], dropped: List[Message]) -> Conversation:
+        """Build the new history from the kept messages and those cut from it."""
+
+    def _split(self, messages: List[Message], tokens: List[int]) -> Tuple[List[int], List[int]]:
+        # System messages and the last `keep_last` messages are pinned; the most
+        # recent other messages are kept, contiguously, while they fit. An
+        # assistant message with tool calls and the tool results answering it
+        # are kept or cut together: upstreams reject either half on its own.
+        count = len(messages)
+        pinned = set(range(max(count - self.keep_last, 0), count))
+        if self.keep_system:
+            pinned.update(
+                i for i, message in enumerate(messages)
+                if message.get("role") == "system" and not isinstance(message, _Summary)
+            )
+        units = _units(messages)
+        pinned_units = [unit for unit in units if any(i in pinned for i in unit)]
+        kept = {i for unit in pinned_units for i in unit}
+        budget = self.target - sum(tokens[i] for i in kept)
+        for unit in reversed(units):
+            if unit[0] in kept:
+                continue
+            size = sum(tokens[i] for i in unit)
+            if size > budget:
+                break
+            budget -= size
+            kept.update(unit)
+        return sorted(kept), [i for i in range(count) if i not in kept]
+
+
+def _units(messages: List[Message]) -> List[List[int]]:
+    # Indexes of `messages` grouped into the units truncation keeps or cuts whole.
+    units: List[List[int]] = []
+    for i, message in enumerate(messages):
+        if message.get("role") == "tool" and units and messages[units[-1][0]].get("tool_calls"):
+            units[-1].append(i)
+        else:
+            units.append([i])
+    return units
+
+
+class TruncateOldest(TruncationPolicy):
+    """
+    Drop the oldest messages once a history exceeds `max_tokens`.
+
+    Args:
+        max_tokens: Estimated token budget of a history.
+        target: Size to cut down to; defaults to 75% of `max_tokens`.
+        keep_system: Never drop system messages.
+        keep_last: Never drop this many most recent messages.
+    """
+
+    def compact(self, kept: List[Message], tokens: List[int], dropped: List[Message]) -> Conversation:
+        return Conversation(tuple(kept), tuple(tokens))
+
+
+class SummarizeOldest(TruncationPolicy):
+    """
+    Replace the oldest messages with a summary once a history exceeds `max_tokens`.
+
+    `summarize` receives the dropped messages (including any earlier summary)
+    and returns the text of a system message put in their place. It runs on
+    the event loop, so it should be cheap (e.g. extract headlines), and its
+    output should be short: it is counted against the budget of later turns.
+
+    Args:
+        summarize: Callable turning dropped messages into summary text.
+        chars_per_token: Used to estimate the summary's size.
+        **kwargs: As for `TruncateOldest`.
+    """
+
+    def __init__(
+        self, max_tokens: int, summarize: Callable[[List[Message]], str], *, chars_per_token: float = 4.0, **kwargs
+    ):
+        super().__init__(max_tokens, **kwargs)
+        self.summarize = summarize
+        self.chars_per_token = chars_per_token
+
+    def compact(self, kept: List[Message], tokens: List[int], dropped: List[Message]) -> Conversation:
+        if dropped:
+            summary = _Summary(role="system", content=self.summarize(dropped))
+            # After the leading system messages, where the dropped history was.
+            at = 0
+            while at < len(kept) and kept[at].get("role") == "system":
+                at += 1
+            kept.insert(at, summary)
+            tokens.insert(at, estimate_message_tokens(summary, self.chars_per_token))
+        return Conversation(tuple(kept), tuple(tokens))
+
+
+def estimate_message_tokens(message: Message, chars_per_token: float = 4.0) -> int:
+    """Rough token count of one mapped message."""
+    content = message.get("content")
+    size = len(content) if isinstance(content, str) else 0
+    for call in message.get("tool_calls") or ():
+        function = call["function"]
+        size += len(function["name"]) + len(function["arguments"])
+    return int(size / chars_per_token) + _MESSAGE_OVERHEAD
+
+
+class ConversationStore:
+    """
+    In-memory LRU store of conversation histories, keyed by response id.
+
+    Methods are synchronous and called from the event loop. Histories share
+    their common turns, so a long conversation costs memory proportional to
+    its messages, not to the number of responses stored for it.
+
+    Args:
+        max_entries: Least recently used responses are forgotten beyond this size.
+        ttl: Seconds a response can be continued; None keeps entries until evicted.
+        policy: Optional `TruncationPolicy` applied to every history.
+        chars_per_token: Used to estimate message sizes for the policy.
+
+    Example:
+        ```python
+        app = create_app(backend, conversations=ConversationStore(policy=TruncateOldest(max_tokens=32_000)))
+        ```
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        policy: Optional[TruncationPolicy] = None,
+        chars_per_token: float = 4.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.policy = policy
+        self.chars_per_token = chars_per_token
+        self._entries: "OrderedDict[str, Tuple[float, Conversation]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, response_id: str) -> Optional[Conversation]:
+        """The history up to and including response `response_id`, or None."""
+        entry = self._entries.get(response_id)
+        if entry is None:
+            return None
+        expires, conversation = entry
+        if expires and expires <= time.monotonic():
+            del self._entries[response_id]
+            return None
+        self._entries.move_to_end(response_id)
+        return conversation
+
+    def extend(self, previous: Optional[Conversation], messages: Sequence[Message]) -> Conversation:
+        """Append mapped messages to a history (None starts a new one) and apply the policy."""
+        chars_per_token = self.chars_per_token
+        tokens = tuple(estimate_message_tokens(message, chars_per_token) for message in messages)
+        conversation = Conversation(tuple(messages), tokens, previous)
+        if self.policy is not None:
+            conversation = self.policy.apply(conversation)
+        return conversation
+
+    def save(self, response_id: str, conversation: Conversation, output: Iterable[ResponseItem]) -> Conversation:
+        """Store `conversation` plus the response's output items under `response_id`."""
+        conversation = self.extend(conversation, OpenResponsesProvider.map_items(output))
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._entries[response_id] = (expires, conversation)
+        self._entries.move_to_end(response_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return conversation
@@ -0,0 +1,493 @@
+"""
+Latency and throughput instrumentation.
+
+Clients and the provider server report one `RequestMetrics` per request to an
+`Observer`: time to first byte, to the first reasoning and text deltas, the
+gaps between deltas, total duration and byte/event counts. `MetricsCollector`
+aggregates them into histograms with p50/p95/p99 and renders the Prometheus
+text format; `SQLiteMetrics` does the same across the worker processes of one
+host. With no observer configured nothing is measured.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+T = TypeVar("T")
+
+_REASONING = "response.reasoning.delta"
+_TEXT = "response.text.delta"
+_DELTAS = frozenset({_REASONING, _TEXT, "response.tool_call.delta"})
+
+# Histogram timings, in seconds.
+TIMINGS = ("ttfb", "first_reasoning", "first_text", "inter_token", "duration")
+# The consumer went away (closed the stream, was cancelled) rather than the request failing.
+_CANCELLED = (GeneratorExit, asyncio.CancelledError, KeyboardInterrupt)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetrics:
+    """
+    Measurements for one request, filled in as it progresses.
+
+    Timings are seconds since the request started, and None if the moment
+    never happened (e.g. no reasoning was streamed). `gaps` holds the time
+    between consecutive deltas. `outcome` is ``"ok"``, ``"error"`` or
+    ``"cancelled"``.
+    """
+
+    __slots__ = (
+        "side", "model", "stream", "start", "ttfb", "first_reasoning", "first_text",
+        "duration", "gaps", "events", "bytes", "outcome", "_last", "_observer",
+    )
+
+    def __init__(self, observer: "Observer", side: str, model: str, stream: bool):
+        self.side = side
+        self.model = model
+        self.stream = stream
+        self.start = time.perf_counter()
+        self.ttfb: Optional[float] = None
+        self.first_reasoning: Optional[float] = None
+        self.first_text: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.gaps: List[float] = []
+        self.events = 0
+        self.bytes = 0
+        self.outcome = "ok"
+        self._last: Optional[float] = None
+        self._observer = observer
+
+    def first_byte(self) -> None:
+        """Mark the first byte of the response (headers or first frame)."""
+        if self.ttfb is None:
+            self.ttfb = time.perf_counter() - self.start
+
+    def event(self, event_type: str, size: int = 0) -> None:
+        """Count one stream event of `size` bytes."""
+        self.events += 1
+        self.bytes += size
+        if event_type not in _DELTAS:
+            return
+        now = time.perf_counter()
+        if self._last is not None:
+            self.gaps.append(now - self._last)
+        self._last = now
+        if event_type == _TEXT:
+            if self.first_text is None:
+                self.first_text = now - self.start
+        elif event_type == _REASONING and self.first_reasoning is None:
+            self.first_reasoning = now - self.start
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Close the measurement and hand it to the observer. Idempotent."""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.start
+        if error is not None:
+            self.outcome = "cancelled" if isinstance(error, _CANCELLED) else "error"
+        self._observer.on_request(self)
+
+
+class Observer:
+    """
+    Receives per-request measurements. Subclass and override `on_request`.
+    """
+
+    def start(self, side: str, model: str, stream: bool) -> RequestMetrics:
+        """Begin measuring a request. `side` is ``"client"`` or ``"provider"``."""
+        return RequestMetrics(self, side, model, stream)
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        """Called once per finished request."""
+
+    def close(self) -> None:
+        """Release resources held by the observer."""
+
+
+async def _aclose(events: AsyncIterator) -> None:
+    # Close the wrapped stream now, so an abandoned stream releases its connection.
+    aclose = getattr(events, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+def trace(events: Iterator[T], metrics: RequestMetrics) -> Iterator[T]:
+    """Pass `events` through and finish `metrics` when the stream ends."""
+    error = None
+    try:
+        yield from events
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        metrics.finish(error)
+
+
+async def atrace(events: AsyncIterator[T], metrics: RequestMetrics) -> AsyncIterator[T]:
+    """Async version of `trace`."""
+    error = None
+    try:
+        async for event in events:
+            yield event
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        metrics.finish(error)
+        await _aclose(events)
+
+
+async def atrace_events(events: AsyncIterator[Tuple[str, T]], metrics: RequestMetrics) -> AsyncIterator[Tuple[str, T]]:
+    """Count provider ``(event_type, payload)`` pairs as they leave the backend."""
+    add = metrics.event
+    try:
+        async for event in events:
+            add(event[0])
+            yield event
+    finally:
+        await _aclose(events)
+
+
+async def atrace_frames(frames: AsyncIterator[bytes], metrics: RequestMetrics) -> AsyncIterator[bytes]:
+    """Measure encoded frames as they are written to the client."""
+    error = None
+    try:
+        async for frame in frames:
+            metrics.first_byte()
+            metrics.bytes += len(frame)
+            yield frame
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        metrics.finish(error)
+        await _aclose(frames)
+
+
+def _bounds() -> List[float]:
+    # Log-spaced from 0.1ms to ~10min, ~20% apart: percentiles are within one bucket.
+    bounds = []
+    value = 0.0001
+    while value < 600:
+        bounds.append(round(value, 6))
+        value *= 1.2
+    return bounds
+
+
+BUCKETS = _bounds()
+
+
+class Histogram:
+    """Fixed-bucket histogram with percentile estimates."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the `q` quantile (0..1) by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsCollector(Observer):
+    """
+    In-process aggregator: histograms per timing, side and model, plus
+    request/byte/event counters.
+
+    Example:
+        ```python
+        metrics = MetricsCollector()
+        client = AsyncOpenResponsesClient(base_url, observer=metrics)
+        ...
+        print(metrics.summary())
+        metrics.serve(port=9464)  # Prometheus scrape target
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._bytes: Dict[Tuple[str, str], int] = {}
+        self._events: Dict[Tuple[str, str], int] = {}
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        side, model = metrics.side, metrics.model
+        with self._lock:
+            for name in TIMINGS:
+                if name == "inter_token":
+                    if metrics.gaps:
+                        histogram = self._histogram(name, side, model)
+                        for gap in metrics.gaps:
+                            histogram.observe(gap)
+                    continue
+                value = getattr(metrics, name)
+                if value is not None:
+                    self._histogram(name, side, model).observe(value)
+            key = (side, model, metrics.outcome)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._bytes[(side, model)] = self._bytes.get((side, model), 0) + metrics.bytes
+            self._events[(side, model)] = self._events.get((side, model), 0) + metrics.events
+
+    def _histogram(self, name: str, side: str, model: str) -> Histogram:
+        key = (name, side, model)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        return histogram
+
+    def _state(self) -> Dict[str, list]:
+        # Everything aggregated so far, as JSON-compatible lists; call with the lock held.
+        return {
+            "histograms": [[*key, h.counts, h.count, h.sum] for key, h in self._histograms.items()],
+            "requests": [[*key, count] for key, count in self._requests.items()],
+            "bytes": [[*key, count] for key, count in self._bytes.items()],
+            "events": [[*key, count] for key, count in self._events.items()],
+        }
+
+    def _merge(self, state: Dict[str, list]) -> None:
+        # Add another collector's `_state()` to this one.
+        with self._lock:
+            for name, side, model, counts, count, total in state["histograms"]:
+                histogram = self._histogram(name, side, model)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+            for side, model, outcome, count in state["requests"]:
+                key = (side, model, outcome)
+                self._requests[key] = self._requests.get(key, 0) + count
+            for name in ("bytes", "events"):
+                counters = getattr(self, f"_{name}")
+                for side, model, count in state[name]:
+                    counters[(side, model)] = counters.get((side, model), 0) + count
+
+    def percentiles(
+        self, name: str, side: Optional[str] = None, model: Optional[str] = None
+    ) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 of a timing, merged over every side/model unless filtered."""
+        merged = Histogram()
+        with self._lock:
+            for (metric, metric_side, metric_model), histogram in self._histograms.items():
+                if metric != name or side not in (None, metric_side) or model not in (None, metric_model):
+                    continue
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+        return {"p50": merged.percentile(0.5), "p95": merged.percentile(0.95), "p99": merged.percentile(0.99)}
+
+    def summary(self, side: Optional[str] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """Percentiles for every timing."""
+        return {name: self.percentiles(name, side) for name in TIMINGS}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name in TIMINGS:
+                series = [(key, h) for key, h in self._histograms.items() if key[0] == name]
+                if not series:
+                    continue
+                metric = f"openresponses_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (_, side, model), histogram in series:
+                    labels = f'side="{side}",model="{_escape(model)}"'
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+            lines.append("# TYPE openresponses_requests_total counter")
+            for (side, model, outcome), count in self._requests.items():
+                lines.append(
+                    f'openresponses_requests_total{{side="{side}",model="{_escape(model)}",outcome="{outcome}"}} {count}'
+                )
+            for metric, counters in (("bytes", self._bytes), ("events", self._events)):
+                lines.append(f"# TYPE openresponses_{metric}_total counter")
+                for (side, model), count in counters.items():
+                    lines.append(f'openresponses_{metric}_total{{side="{side}",model="{_escape(model)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """
+        Serve ``GET /metrics`` from a daemon thread, for processes without a
+        web app. Returns the server; call ``shutdown()`` to stop it.
+        """
+        # Imported here: http.server pulls in a lot that clients never need.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = collector.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="openresponses-metrics", daemon=True).start()
+        return server
+
+
+class SQLiteMetrics(MetricsCollector):
+    """
+    A `MetricsCollector` whose reports cover every process sharing `path`.
+
+    Each process aggregates its requests in memory, like `MetricsCollector`,
+    and a background thread adds them to the totals in the database at most
+    every `flush_interval` seconds, then starts aggregating afresh. The
+    database holds a single row however many processes have come and gone,
+    and counters never go backwards. `percentiles`, `summary` and
+    `render_prometheus` report the stored totals plus this process's
+    unflushed requests, so any worker of a multi-process provider (see
+    `openresponses.serve`) answers a scrape for the whole host.
+
+    Requests never touch the database. Reads do, so call them off the event
+    loop, as the ``/metrics`` endpoint of `create_app` does.
+
+    Args:
+        path: Database file, shared by all processes.
+        flush_interval: Seconds between writes of this process's requests.
+    """
+
+    def __init__(self, path: str = "openresponses-metrics.db", flush_interval: float = 1.0):
+        import sqlite3
+
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), state TEXT NOT NULL)")
+        self._dirty = False
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        super().on_request(metrics)
+        self._dirty = True
+        if self._flusher is None:
+            # Started lazily, so processes that only read the metrics run no thread.
+            self._flusher = threading.Thread(target=self._flush_loop, name="openresponses-metrics-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            if self._dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    pass  # e.g. the database stayed locked; the requests are written on a later tick
+
+    def _stored(self) -> Dict[str, list]:
+        import json
+
+        row = self._conn.execute("SELECT state FROM totals WHERE id = 0").fetchone()
+        return json.loads(row[0]) if row else {"histograms": [], "requests": [], "bytes": [], "events": []}
+
+    def flush(self) -> None:
+        """Add this process's requests since the last flush to the stored totals."""
+        import json
+
+        # `_db_lock` is held from taking the local state until it is stored
+        # (or put back), so `_merged` never sees requests in neither place.
+        with self._db_lock:
+            with self._lock:
+                self._dirty = False
+                delta = self._state()
+                self._histograms, self._requests, self._bytes, self._events = {}, {}, {}, {}
+            if not delta["requests"]:
+                return
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    totals = MetricsCollector()
+                    totals._merge(self._stored())
+                    totals._merge(delta)
+                    state = json.dumps(totals._state(), separators=(",", ":"))
+                    self._conn.execute("INSERT OR REPLACE INTO totals (id, state) VALUES (0, ?)", (state,))
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except BaseException:
+                # Kept for the next flush rather than lost.
+                self._merge(delta)
+                self._dirty = True
+                raise
+
+    def _merged(self) -> MetricsCollector:
+        # One snapshot: no flush can move requests from the local state to
+        # the database between the two reads.
+        with self._db_lock:
+            stored = self._stored()
+            with self._lock:
+                local = self._state()
+        merged = MetricsCollector()
+        merged._merge(stored)
+        merged._merge(local)
+        return merged
+
+    def percentiles(
+        self, name: str, side: Optional[str] = None, model: Optional[str] = None
+    ) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 of a timing over all processes."""
+        return self._merged().percentiles(name, side, model)
+
+    def summary(self, side: Optional[str] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        merged = self._merged()
+        return {name: merged.percentiles(name, side) for name in TIMINGS}
+
+    def render_prometheus(self) -> str:
+        """Metrics of all processes in the Prometheus text exposition format."""
+        return self._merged().render_prometheus()
+
+    def close(self) -> None:
+        """Write the remaining requests and close the database."""
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._dirty:
+            self.flush()
+        with self._db_lock:
+            self._conn.close()
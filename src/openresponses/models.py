@@ -5,19 +5,29 @@ This module defines the standardized data structures for the Open Responses prot
 It uses Pydantic V2 for strict validation and schema generation.
 """
 
-from typing import List, Optional, Union, Literal, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, ClassVar, Dict, List, Literal, Optional, Set, Tuple, Type, Union
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag, TypeAdapter
+
+_new_object = object.__new__
+_set_object_attr = object.__setattr__
 
 # --- STANDARDIZATION 1: Atomic Items ---
 # Unlike legacy APIs (which used "messages"), Open Responses uses typed "Items"
 # for both input and output. This allows mixing text, images, tools, and reasoning.
 
-class InputText(BaseModel):
+# Validators are built on first use instead of at import, so short-lived
+# processes only pay for the models they actually touch.
+_DEFERRED = ConfigDict(defer_build=True)
+
+class _Model(BaseModel):
+    model_config = _DEFERRED
+
+class InputText(_Model):
     """Represents a text input block."""
     type: Literal["input_text"] = "input_text"
     text: str
 
-class MessageItem(BaseModel):
+class MessageItem(_Model):
     """Represents a standard chat message."""
     type: Literal["message"] = "message"
     role: Literal["user", "assistant", "system"]
@@ -25,35 +35,63 @@ class MessageItem(BaseModel):
 
 # --- STANDARDIZATION 2: First-Class Reasoning ---
 # The spec explicitly defines reasoning as a visible item, not a hidden "thought".
-class ReasoningItem(BaseModel):
+class ReasoningItem(_Model):
     """Represents a block of reasoning/thought process."""
     type: Literal["reasoning"] = "reasoning"
     content: Optional[str] = Field(default=None, description="Raw reasoning traces (Transparent)")
     summary: Optional[str] = Field(default=None, description="Sanitized summary")
     encrypted_content: Optional[str] = Field(default=None, description="Provider-secure reasoning")
 
-class ToolCallItem(BaseModel):
+class ToolCallItem(_Model):
     """Represents a tool call request."""
     type: Literal["tool_call"] = "tool_call"
     id: str
     name: str
     arguments: Dict[str, Any]
 
-# Union of all possible output items
-ResponseItem = Union[MessageItem, ReasoningItem, ToolCallItem]
+class ToolResultItem(_Model):
+    """Represents the output of a tool call."""
+    type: Literal["tool_result"] = "tool_result"
+    call_id: str
+    output: str
+
+def _item_type(value: Any) -> str:
+    # Items without a `type` are messages, as plain {"role", "content"} inputs always were.
+    if isinstance(value, dict):
+        return value.get("type", "message")
+    return getattr(value, "type", "message")
+
+# Union of all possible output items, discriminated on `type` so validation
+# jumps straight to the matching model instead of trying each member in turn.
+ResponseItem = Annotated[
+    Union[
+        Annotated[MessageItem, Tag("message")],
+        Annotated[ReasoningItem, Tag("reasoning")],
+        Annotated[ToolCallItem, Tag("tool_call")],
+        Annotated[ToolResultItem, Tag("tool_result")],
+    ],
+    Discriminator(_item_type),
+]
+
+# Cached adapters for bulk validation of item lists (e.g. stored histories).
+ResponseItemAdapter: TypeAdapter[ResponseItem] = TypeAdapter(ResponseItem, config=_DEFERRED)
+ResponseItemListAdapter: TypeAdapter[List[ResponseItem]] = TypeAdapter(List[ResponseItem], config=_DEFERRED)
 
 # --- STANDARDIZATION 3: The Request Body ---
 # Supports "Agentic" fields like max_tool_calls (provider-managed loops).
-class OpenResponsesRequest(BaseModel):
+class OpenResponsesRequest(_Model):
     """Standard Request Body for Open Responses API."""
     model: str
-    input: Union[str, List[MessageItem]] # Can be simple text or structured items
+    input: Union[str, List[ResponseItem]] # Can be simple text or structured items
     stream: bool = False
     max_tool_calls: Optional[int] = Field(default=None, description="Limit for provider-managed loops")
+    previous_response_id: Optional[str] = Field(
+        default=None, description="Continue a stored conversation; `input` then holds only the new items"
+    )
 
 # --- STANDARDIZATION 4: The Response Body ---
 # Output is a list of Items, not "choices".
-class OpenResponsesOutput(BaseModel):
+class OpenResponsesOutput(_Model):
     """Standard Response Body for Open Responses API."""
     id: str
     object: Literal["response"] = "response"
@@ -63,7 +101,87 @@ class OpenResponsesOutput(BaseModel):
 
 # --- STANDARDIZATION 5: Semantic Streaming Events ---
 # Events are specific to the item type (e.g., reasoning vs text).
-class StreamEvent(BaseModel):
+class StreamEvent(_Model):
     """Event structure for semantic streaming."""
     event: str  # e.g., 'response.reasoning.delta', 'response.text.delta'
     data: Dict[str, Any]
+
+    # Filled in by _prepare_trusted() once the class exists.
+    _trusted_payload_fields: ClassVar[Tuple[Tuple[str, Any], ...]] = ()
+    _trusted_fields_set: ClassVar[Set[str]] = set()
+
+    @classmethod
+    def from_sse(cls, event: str, data: Dict[str, Any]) -> "StreamEvent":
+        """Validate an event from its SSE name and decoded JSON payload."""
+        return cls.model_validate({**data, "event": event, "data": data})
+
+    @classmethod
+    def from_sse_trusted(cls, event: str, data: Dict[str, Any]) -> "StreamEvent":
+        """
+        Build an event without validation (trusted providers only).
+
+        Equivalent to `model_construct`, minus its generic per-field alias and
+        default handling, which makes it cheaper than validating these small models.
+        """
+        values = {"event": event, "data": data}
+        for name, default in cls._trusted_payload_fields:
+            values[name] = data.get(name, default)
+        inst = _new_object(cls)
+        _set_object_attr(inst, "__dict__", values)
+        _set_object_attr(inst, "__pydantic_fields_set__", cls._trusted_fields_set)
+        _set_object_attr(inst, "__pydantic_extra__", None)
+        _set_object_attr(inst, "__pydantic_private__", None)
+        return inst
+
+# Typed events. Consumers can branch with isinstance() and read attributes
+# (`event.delta`) instead of comparing event names and indexing `data`.
+
+class ReasoningDelta(StreamEvent):
+    """A chunk of reasoning text (`response.reasoning.delta`)."""
+    event: Literal["response.reasoning.delta"] = "response.reasoning.delta"
+    delta: str
+
+class TextDelta(StreamEvent):
+    """A chunk of answer text (`response.text.delta`)."""
+    event: Literal["response.text.delta"] = "response.text.delta"
+    delta: str
+
+class ToolCallDelta(StreamEvent):
+    """A chunk of a tool call (`response.tool_call.delta`); `arguments` is a partial JSON string."""
+    event: Literal["response.tool_call.delta"] = "response.tool_call.delta"
+    id: Optional[str] = None
+    name: Optional[str] = None
+    arguments: str = ""
+
+class ToolResult(StreamEvent):
+    """The output of a tool the provider ran (`response.tool_result`)."""
+    event: Literal["response.tool_result"] = "response.tool_result"
+    call_id: str = ""
+    output: str = ""
+
+class Done(StreamEvent):
+    """End of the response stream (`response.done`)."""
+    event: Literal["response.done"] = "response.done"
+
+class Error(StreamEvent):
+    """A provider error reported in-band (`error`)."""
+    event: Literal["error"] = "error"
+    error: str = ""
+
+def _prepare_trusted(cls: Type[StreamEvent]) -> Type[StreamEvent]:
+    cls._trusted_payload_fields = tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in cls.model_fields.items()
+        if name not in ("event", "data")
+    )
+    # Every field is populated, so sharing one set per class is safe.
+    cls._trusted_fields_set = set(cls.model_fields)
+    return cls
+
+# Precomputed dispatch table used by the client stream parsers: one dict lookup
+# per event picks the concrete class. Unknown events fall back to StreamEvent.
+STREAM_EVENT_TYPES: Dict[str, Type[StreamEvent]] = {
+    cls.model_fields["event"].default: _prepare_trusted(cls)
+    for cls in (ReasoningDelta, TextDelta, ToolCallDelta, ToolResult, Done, Error)
+}
+_prepare_trusted(StreamEvent)
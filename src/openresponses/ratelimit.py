@@ -0,0 +1,211 @@
+"""
+Client-side rate limiting and adaptive concurrency.
+
+`RateLimiter` keeps a client under a provider's requests/sec and tokens/sec
+quotas with token buckets. `AdaptiveConcurrencyLimiter` finds the concurrency
+the backend can sustain with AIMD: it grows by about one slot per round trip
+while latency is steady and halves on throttling or a latency spike.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from .models import OpenResponsesRequest
+
+# Statuses that mean "slow down".
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` per second, holding at most `capacity`.
+
+    Waiters are served in FIFO order. A request larger than the capacity is
+    admitted once the bucket is full and leaves it in debt, so oversized
+    requests are slowed down rather than blocked forever.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take `amount` tokens if available right now."""
+        if self._lock.locked() or self._refill() < min(amount, self.capacity):
+            return False
+        self._tokens -= amount
+        return True
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available and take them."""
+        if self.try_acquire(amount):
+            return
+        async with self._lock:
+            needed = min(amount, self.capacity)
+            while True:
+                missing = needed - self._refill()
+                if missing <= 0:
+                    break
+                await asyncio.sleep(missing / self.rate)
+            self._tokens -= amount
+
+
+def estimate_tokens(request: OpenResponsesRequest, chars_per_token: float = 4.0) -> int:
+    """
+    Rough input token count: characters of text in the request divided by
+    `chars_per_token`. Good enough for quota pacing, not for billing.
+    """
+    if isinstance(request.input, str):
+        chars = len(request.input)
+    else:
+        chars = 0
+        for item in request.input:
+            content = getattr(item, "content", None)
+            if isinstance(content, str):
+                chars += len(content)
+            elif content:
+                chars += sum(len(part.text) for part in content)
+            else:
+                chars += len(str(getattr(item, "arguments", "")))
+    return max(1, int(chars / chars_per_token))
+
+
+class RateLimiter:
+    """
+    Requests/sec and tokens/sec quotas for one client.
+
+    Args:
+        requests_per_second: Request quota; None for no limit.
+        tokens_per_second: Token quota, charged with `estimator`; None for no limit.
+        burst: Seconds of quota that may be spent at once.
+        estimator: Token cost of a request. Defaults to `estimate_tokens`.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        burst: float = 1.0,
+        estimator: Callable[[OpenResponsesRequest], int] = estimate_tokens,
+    ):
+        self.requests = TokenBucket(requests_per_second, requests_per_second * burst) if requests_per_second else None
+        self.tokens = TokenBucket(tokens_per_second, tokens_per_second * burst) if tokens_per_second else None
+        self.estimator = estimator
+
+    def cost(self, request: OpenResponsesRequest) -> int:
+        """Token cost of `request`; 0 when tokens are not limited."""
+        return self.estimator(request) if self.tokens is not None else 0
+
+    async def acquire(self, cost: int = 0) -> None:
+        """Wait for one request slot and `cost` tokens."""
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is not None and cost:
+            await self.tokens.acquire(cost)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit shared by all calls on a client.
+
+    Each successful call adds ``increase / limit`` slots (about +1 per round
+    of calls). A throttled call (429/503), or a call whose latency exceeds
+    `latency_tolerance` times the long-run average, multiplies the limit by
+    `decrease`, at most once per average latency so one burst of failures
+    counts once.
+
+    Args:
+        initial: Starting limit.
+        min_limit: Lower bound.
+        max_limit: Upper bound.
+        increase: Additive increase per round of calls.
+        decrease: Multiplicative decrease factor.
+        latency_tolerance: Latency ratio treated as congestion.
+    """
+
+    def __init__(
+        self,
+        initial: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 512,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._short: Optional[float] = None
+        self._long: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; pass it on.
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        """
+        Free a slot and feed back the outcome. `latency` is None when the call
+        produced no usable sample (e.g. a connection error or cancellation).
+        """
+        self.in_flight -= 1
+        if throttled:
+            self._backoff()
+        elif latency is not None:
+            self._observe(latency)
+        self._wake()
+
+    def _observe(self, latency: float) -> None:
+        self._short = latency if self._short is None else self._short * 0.8 + latency * 0.2
+        self._long = latency if self._long is None else self._long * 0.98 + latency * 0.02
+        if self._short > self._long * self.latency_tolerance:
+            self._backoff()
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+    def _backoff(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self._long or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+
+    def _wake(self) -> None:
+        waiters = self._waiters
+        while waiters and self.in_flight < int(self.limit):
+            waiter = waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
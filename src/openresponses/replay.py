@@ -0,0 +1,444 @@
+"""
+Recording and replay of response streams.
+
+`record` captures the SSE frames of a real ``/v1/responses`` stream, with the
+time each one arrived, and appends them to a recording file. `ReplayServer`
+serves recordings back from a memory map over the same HTTP protocol as the
+providers built with `openresponses.server.create_app`. It replays at the
+original pace, N times faster or as fast as possible, so clients and provider
+stacks can be load-tested and regression-tested without upstream models:
+
+    python -m openresponses.replay record http://localhost:8003 -o ollama.orr --model llama3 --input "Hi"
+    python -m openresponses.replay serve ollama.orr --port 8010 --speed 4
+    python -m openresponses.replay info ollama.orr
+
+A recording is the header ``ORREC1\\n`` followed by records. Each record is
+``kind`` (u8), ``delay_us`` (u32) and ``length`` (u32), little-endian,
+followed by `length` payload bytes. A session is a ``START`` record whose
+payload is the request as JSON, then one ``FRAME`` record per SSE frame, then
+an ``END`` record. A frame's payload is the frame verbatim, and its delay is
+the time since the previous frame (or since the request, for the first one).
+Each session is appended with a single write, so several recorders can share
+a file, and a session cut off by a crash is skipped on load.
+"""
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from pydantic import ValidationError
+
+from .accumulator import ResponseAccumulator
+from .cache import request_cache_key
+from .codec import JSON, MSGPACK, decode_model, decompress, msgpack_available, supported_encodings
+from .models import OpenResponsesRequest
+from .sse import SSEDecoder
+
+MAGIC = b"ORREC1\n"
+START, FRAME, END = 1, 2, 3
+
+_RECORD = struct.Struct("<BII")
+_MAX_DELAY_US = 2**32 - 1
+_DELTAS = ("response.reasoning.delta", "response.text.delta")
+# At full speed frames are written in batches of about this many bytes.
+_BATCH_BYTES = 64 * 1024
+
+
+def _record(kind: int, delay_us: int, payload: bytes) -> bytes:
+    return _RECORD.pack(kind, min(delay_us, _MAX_DELAY_US), len(payload)) + payload
+
+
+def append_session(path: str, request: Dict[str, Any], frames: Sequence[Tuple[float, bytes]]) -> None:
+    """
+    Append one session to a recording, creating the file if needed.
+
+    Args:
+        path: Recording file.
+        request: The request body that produced the stream.
+        frames: ``(delay, frame)`` pairs, delays in seconds since the previous frame.
+    """
+    payload = json.dumps(request, separators=(",", ":"), ensure_ascii=False).encode()
+    parts = [_record(START, 0, payload)]
+    parts.extend(_record(FRAME, int(delay * 1_000_000), frame) for delay, frame in frames)
+    parts.append(_record(END, 0, b""))
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size == 0:
+            parts.insert(0, MAGIC)
+        os.write(fd, b"".join(parts))
+    finally:
+        os.close(fd)
+
+
+async def record(
+    base_url: str,
+    request: Dict[str, Any],
+    path: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
+) -> int:
+    """
+    Stream `request` from the provider at `base_url` and append the session to `path`.
+
+    Frames are recorded as they arrive, with CRLF line endings normalized, so
+    the recording reflects the provider's real pacing and batching. Raises
+    `httpx.HTTPStatusError` if the provider rejects the request. Returns the
+    number of frames recorded.
+    """
+    request = {**request, "stream": True}
+    client = http_client or httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=5.0))
+    frames: List[Tuple[float, bytes]] = []
+    try:
+        last = time.perf_counter()
+        async with client.stream(
+            "POST", f"{base_url.rstrip('/')}/v1/responses", json=request, headers=headers
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            buffer = b""
+            async for chunk in response.aiter_bytes():
+                now = time.perf_counter()
+                buffer += chunk.replace(b"\r\n", b"\n") if b"\r" in chunk else chunk
+                *complete, buffer = buffer.split(b"\n\n")
+                for frame in complete:
+                    if frame:
+                        frames.append((now - last, frame + b"\n\n"))
+                        last = now
+            if buffer.strip():
+                frames.append((time.perf_counter() - last, buffer.rstrip(b"\n") + b"\n\n"))
+    finally:
+        if http_client is None:
+            await client.aclose()
+    append_session(path, request, frames)
+    return len(frames)
+
+
+class Session:
+    """
+    One recorded stream. Frames stay in the recording's memory map; the
+    session only holds their offsets and when each is due.
+    """
+
+    __slots__ = ("request", "at", "offsets", "lengths", "_map")
+
+    def __init__(self, request: bytes, buffer: mmap.mmap):
+        self.request = request
+        self.at = array("d")  # seconds from the start of the stream
+        self.offsets = array("Q")
+        self.lengths = array("I")
+        self._map = buffer
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def duration(self) -> float:
+        return self.at[-1] if self.at else 0.0
+
+    def frames(self) -> Iterator[memoryview]:
+        view = memoryview(self._map)
+        for offset, length in zip(self.offsets, self.lengths):
+            yield view[offset:offset + length]
+
+    def request_json(self) -> Dict[str, Any]:
+        return json.loads(self.request)
+
+    def output_json(self) -> bytes:
+        """The stream assembled into a non-streaming response body."""
+        accumulator = ResponseAccumulator()
+        decoder = SSEDecoder()
+        for frame in self.frames():
+            for event in decoder.feed(bytes(frame)):
+                data = event.json()
+                accumulator.add_provider_event(event.event, data.get("delta") if event.event in _DELTAS else data)
+        output = accumulator.result()
+        output.model = output.model or self.request_json().get("model", "")
+        return output.model_dump_json().encode()
+
+
+class Recording:
+    """
+    A recording file opened as a read-only memory map.
+
+    Sessions are indexed when the file is opened; frame bytes are only read
+    when served, so recordings much larger than memory can be replayed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sessions = self._index()
+
+    def _index(self) -> List[Session]:
+        buffer = self._map
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a recording")
+        sessions: List[Session] = []
+        session: Optional[Session] = None
+        at = 0.0
+        pos, size, header = len(MAGIC), len(buffer), _RECORD.size
+        while pos + header <= size:
+            kind, delay_us, length = _RECORD.unpack_from(buffer, pos)
+            start = pos + header
+            pos = start + length
+            if pos > size:
+                break
+            if kind == START:
+                session, at = Session(buffer[start:pos], buffer), 0.0
+            elif session is None:
+                continue
+            elif kind == FRAME:
+                at += delay_us / 1_000_000
+                session.at.append(at)
+                session.offsets.append(start)
+                session.lengths.append(length)
+            elif kind == END:
+                sessions.append(session)
+                session = None
+        return sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _write_error(writer: asyncio.StreamWriter, status: bytes, detail: Any) -> None:
+    payload = json.dumps({"detail": detail}, default=str).encode()
+    writer.write(
+        b"HTTP/1.1 %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+        % (status, len(payload), payload)
+    )
+
+
+def _chunk_header(length: int) -> bytes:
+    return b"%x\r\n" % length
+
+
+class ReplayServer:
+    """
+    Serves ``POST /v1/responses`` from a `Recording` on raw asyncio, so one
+    process can hold thousands of concurrent streams.
+
+    Streaming requests get a recorded session's frames at their recorded
+    times divided by `speed`; ``speed=0`` sends them as fast as the client
+    reads. Other requests get the session assembled into a JSON response.
+    Sessions are picked in turn, or with ``match="request"`` by the recorded
+    request equal to the incoming one (ignoring ``stream``); requests without
+    a match get a 404. An ``X-Replay-Session: <index>`` header selects a
+    session and ``X-Replay-Speed`` overrides the speed for one request.
+    Request bodies may be compressed or msgpack, as for `create_app`.
+
+    Args:
+        recording: The recording to serve.
+        speed: Replay speed; 1 is real time.
+        match: ``"cycle"`` or ``"request"``.
+    """
+
+    def __init__(self, recording: Recording, speed: float = 1.0, match: str = "cycle"):
+        if match not in ("cycle", "request"):
+            raise ValueError("match must be 'cycle' or 'request'")
+        if not recording.sessions:
+            raise ValueError(f"{recording.path} has no complete sessions")
+        self.recording = recording
+        self.speed = speed
+        self.match = match
+        self._next = 0
+        self._outputs: Dict[int, bytes] = {}
+        self._by_request: Dict[str, int] = {}
+        if match == "request":
+            for index, session in enumerate(recording.sessions):
+                request = OpenResponsesRequest.model_validate(session.request_json())
+                self._by_request.setdefault(request_cache_key(request), index)
+
+    def _select(self, request: OpenResponsesRequest, selected: Optional[int]) -> Optional[int]:
+        if selected is not None:
+            return selected if 0 <= selected < len(self.recording) else None
+        if self.match == "request":
+            return self._by_request.get(request_cache_key(request))
+        index = self._next
+        self._next = (index + 1) % len(self.recording)
+        return index
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.split(b"\r\n")
+                length, selected, speed = 0, None, self.speed
+                encoding, content_type = "", JSON
+                try:
+                    for line in lines[1:]:
+                        name, _, value = line.partition(b":")
+                        name = name.strip().lower()
+                        if name == b"content-length":
+                            length = int(value)
+                            if length < 0:
+                                raise ValueError(length)
+                        elif name == b"content-encoding":
+                            encoding = value.decode("latin-1").strip().lower()
+                        elif name == b"content-type":
+                            content_type = value.decode("latin-1").strip()
+                        elif name == b"x-replay-session":
+                            selected = int(value)
+                        elif name == b"x-replay-speed":
+                            speed = float(value)
+                except ValueError:
+                    # The body cannot be delimited reliably, so the connection is not reused.
+                    _write_error(writer, b"400 Bad Request", f"Invalid {name.decode('latin-1')} header")
+                    await writer.drain()
+                    return
+                body = await reader.readexactly(length) if length else b""
+                if not lines[0].startswith(b"POST /v1/responses"):
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                    continue
+                # Bodies are decoded as `create_app` decodes them: compressed and msgpack bodies are accepted.
+                if encoding not in ("", "identity") and encoding not in supported_encodings():
+                    _write_error(writer, b"415 Unsupported Media Type", f"Unsupported content encoding '{encoding}'")
+                    continue
+                if MSGPACK in content_type and not msgpack_available():
+                    _write_error(writer, b"415 Unsupported Media Type", "msgpack bodies are not supported by this server")
+                    continue
+                try:
+                    request = decode_model(OpenResponsesRequest, decompress(body, encoding), content_type)
+                except ValidationError as e:
+                    _write_error(writer, b"422 Unprocessable Entity", e.errors(include_url=False))
+                    continue
+                except ValueError as e:
+                    _write_error(writer, b"400 Bad Request", str(e))
+                    continue
+                index = self._select(request, selected)
+                if index is None:
+                    _write_error(writer, b"404 Not Found", "No recorded session for this request")
+                elif request.stream:
+                    await self._stream(writer, self.recording.sessions[index], speed)
+                else:
+                    payload = self._outputs.get(index)
+                    if payload is None:
+                        payload = self._outputs[index] = self.recording.sessions[index].output_json()
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                        % (len(payload), payload)
+                    )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, session: Session, speed: float) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # Frames due at the same moment go out together, as one chunk.
+        batch: List[Any] = []
+        size = 0
+        for at, frame in zip(session.at, session.frames()):
+            delay = start + at / speed - loop.time() if speed > 0 else 0.0
+            if batch and (delay > 0 or size >= _BATCH_BYTES):
+                writer.writelines([_chunk_header(size), *batch, b"\r\n"])
+                await writer.drain()
+                batch, size = [], 0
+            if delay > 0:
+                await asyncio.sleep(delay)
+            batch.append(frame)
+            size += len(frame)
+        if batch:
+            writer.writelines([_chunk_header(size), *batch, b"\r\n"])
+        writer.write(b"0\r\n\r\n")
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8010) -> None:
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+async def _record_all(args: argparse.Namespace) -> None:
+    if args.requests:
+        with open(args.requests) as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+    else:
+        requests = [{"model": args.model, "input": args.input}]
+    headers = {name.strip(): value.strip() for name, _, value in (header.partition(":") for header in args.header)}
+    async with httpx.AsyncClient(timeout=httpx.Timeout(args.timeout, connect=5.0)) as client:
+        for request in requests:
+            for _ in range(args.repeat):
+                count = await record(args.url, request, args.output, headers=headers, http_client=client)
+                print(f"recorded {count} frames")
+
+
+def _info(path: str) -> None:
+    with Recording(path) as recording:
+        sessions = recording.sessions
+        frames = sum(len(session) for session in sessions)
+        size = sum(sum(session.lengths) for session in sessions)
+        print(f"{path}: {len(sessions)} sessions, {frames} frames, {size / 1024:.1f} KiB of SSE")
+        for index, session in enumerate(sessions):
+            request = session.request_json()
+            print(f"  [{index}] {request.get('model', '')!r}: {len(session)} frames over {session.duration:.2f}s")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m openresponses.replay", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Record streams from a provider")
+    rec.add_argument("url", help="Provider root, e.g. http://localhost:8003")
+    rec.add_argument("-o", "--output", required=True, help="Recording file to append to")
+    rec.add_argument("--model", default="")
+    rec.add_argument("--input", default="Hello")
+    rec.add_argument("--requests", help="JSONL file of request bodies, instead of --model/--input")
+    rec.add_argument("--repeat", type=int, default=1, help="Record each request this many times")
+    rec.add_argument("--header", action="append", default=[], help="Extra 'Name: value' request header")
+    rec.add_argument("--timeout", type=float, default=60.0)
+
+    serve = commands.add_parser("serve", help="Serve a recording")
+    serve.add_argument("recording")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8010)
+    serve.add_argument("--speed", default="1", help="Speed factor, or 'max'")
+    serve.add_argument("--match", choices=("cycle", "request"), default="cycle")
+
+    info = commands.add_parser("info", help="Summarize a recording")
+    info.add_argument("recording")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        asyncio.run(_record_all(args))
+    elif args.command == "info":
+        _info(args.recording)
+    else:
+        speed = 0.0 if args.speed == "max" else float(args.speed)
+        with Recording(args.recording) as recording:
+            server = ReplayServer(recording, speed=speed, match=args.match)
+            print(f"Replaying {len(recording)} sessions on http://{args.host}:{args.port}")
+            try:
+                asyncio.run(server.serve(args.host, args.port))
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
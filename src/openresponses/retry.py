@@ -0,0 +1,210 @@
+"""
+Retries and hedged requests.
+
+`RetryPolicy` decides whether a failed attempt is repeated and how long to
+wait first: exponential backoff with full jitter, capped, honouring
+``Retry-After``. Generating a response is not idempotent in general, so by
+default only failures where the server provably did no work are retried;
+`HedgePolicy` cuts tail latency by racing a second attempt against a slow one.
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Failures where the request never reached the server or was refused before
+# any work was done; repeating them is always safe.
+SAFE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+SAFE_STATUSES = frozenset({429, 503})
+# Failures that may have happened after the server started generating.
+UNSAFE_STATUSES = frozenset({408, 500, 502, 504})
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before repeating a request.
+
+    Args:
+        max_attempts: Total attempts, including the first one.
+        backoff: Base delay in seconds; attempt ``n`` waits a random time up to
+            ``backoff * 2 ** (n - 1)`` ("full jitter").
+        max_backoff: Cap on a single computed delay.
+        max_retry_after: Cap on a server-provided ``Retry-After``. Longer
+            requested waits fail immediately instead of stalling the caller.
+        idempotent: Also retry failures that may have happened mid-generation
+            (5xx other than 503, read timeouts, dropped connections). The
+            upstream may then do the work twice.
+        idempotency_key: Send one ``Idempotency-Key`` header per logical
+            request, identical across its retries and hedges, so servers that
+            support it can deduplicate.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.25,
+        max_backoff: float = 8.0,
+        max_retry_after: float = 30.0,
+        idempotent: bool = False,
+        idempotency_key: bool = True,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.idempotent = idempotent
+        self.idempotency_key = idempotency_key
+
+    def headers(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """The headers for one logical request."""
+        if not self.idempotency_key:
+            return headers
+        return {**headers, "Idempotency-Key": uuid.uuid4().hex}
+
+    def next_delay(
+        self,
+        attempt: int,
+        *,
+        response: Optional[httpx.Response] = None,
+        error: Optional[BaseException] = None,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before attempt ``attempt + 1`` after a failed `response`
+        or `error`, or None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if response is not None:
+            status = response.status_code
+            if status not in SAFE_STATUSES and not (self.idempotent and status in UNSAFE_STATUSES):
+                return None
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        elif not isinstance(error, SAFE_ERRORS) and not (self.idempotent and isinstance(error, httpx.TransportError)):
+            return None
+        return random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class HedgePolicy:
+    """
+    Hedged requests: if an attempt has not answered after `delay`, start
+    another one and take whichever finishes first.
+
+    The delay defaults to the `percentile` of recently observed latencies, so
+    only the slowest ~5% of calls are duplicated. Until `min_samples` latencies
+    are known, `initial_delay` is used.
+
+    Args:
+        percentile: Latency percentile used as the hedge delay.
+        initial_delay: Delay in seconds before enough samples exist.
+        min_delay: Lower bound on the delay, to avoid hedging every call.
+        max_hedges: Extra attempts per request.
+        window: Number of recent latencies kept.
+        min_samples: Samples needed before the percentile is trusted.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.05,
+        max_hedges: int = 1,
+        window: int = 256,
+        min_samples: int = 20,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._delay: Optional[float] = None
+        self._samples = 0
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a successful attempt."""
+        self._latencies.append(latency)
+        self._samples += 1
+        # Re-sorting on every sample would dominate short calls; refresh periodically.
+        if self._samples % 16 == 0:
+            self._delay = None
+
+    @property
+    def delay(self) -> float:
+        """The current hedge delay in seconds."""
+        latencies = self._latencies
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        if self._delay is None:
+            ordered = sorted(latencies)
+            rank = min(int(self.percentile * len(ordered)), len(ordered) - 1)
+            self._delay = max(ordered[rank], self.min_delay)
+        return self._delay
+
+    async def run(self, fn: Callable[[], Awaitable[T]], observe: bool = True) -> T:
+        """
+        Await ``fn()``, racing up to `max_hedges` further calls against it.
+        Losing attempts are cancelled. If every started attempt fails, the
+        first error is raised. With ``observe=False`` attempts are not timed;
+        `fn` then reports its own latency to `observe`, e.g. to leave out
+        time spent waiting in a local limiter.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def attempt() -> Any:
+            started = loop.time()
+            result = await fn()
+            if observe:
+                self.observe(loop.time() - started)
+            return result
+
+        tasks = [asyncio.ensure_future(attempt())]
+        errors = []
+        try:
+            while True:
+                hedge = len(tasks) <= self.max_hedges
+                done, _ = await asyncio.wait(
+                    [task for task in tasks if not task.done()],
+                    timeout=self.delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+                if len(errors) == len(tasks):
+                    raise errors[0]
+                if not done:
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(attempt()))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,235 @@
+"""
+Multi-process provider runner.
+
+    python -m openresponses.serve examples.ollama_proxy:app --workers 8 --port 8003
+
+A single uvicorn process does all of a provider's request parsing, JSON
+encoding and SSE framing on one core. The runner binds the listening socket
+once and starts `workers` uvicorn processes accepting on it, so connections
+spread over every core of the host.
+
+Workers share state through `worker_cache` and `worker_metrics`. Under the
+runner they return SQLite-backed stores in a directory shared by all
+workers; run standalone, they return the in-process ones:
+
+    app = create_app(backend, cache=worker_cache(), metrics=worker_metrics())
+
+On SIGHUP the runner starts a fresh set of workers, which import the app
+again, and drains the old set. Draining workers stop accepting connections
+and finish their in-flight requests and streams for up to
+``--graceful-timeout`` seconds before they exit. SIGINT and SIGTERM drain
+every worker and stop the runner. Workers that die are restarted.
+Requires the ``server`` extra.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import MemoryCache, ResponseCache, SQLiteCache
+from .metrics import MetricsCollector, SQLiteMetrics
+
+# Set in worker processes to the directory holding the shared stores.
+STATE_DIR_ENV = "OPENRESPONSES_STATE_DIR"
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker that exits sooner than this after starting is restarted after a
+# pause, so an app that fails on import does not spin the runner.
+_MIN_UPTIME = 1.0
+
+
+def worker_cache(max_entries: int = 100_000, ttl: Optional[float] = 3600.0) -> ResponseCache:
+    """
+    The response cache for this process: a `SQLiteCache` shared by all workers
+    under the runner, otherwise a `MemoryCache`.
+    """
+    state_dir = os.environ.get(STATE_DIR_ENV)
+    if state_dir:
+        return SQLiteCache(os.path.join(state_dir, "cache.db"), max_entries=max_entries, ttl=ttl)
+    return MemoryCache(max_entries=max_entries, ttl=ttl)
+
+
+def worker_metrics(flush_interval: float = 1.0) -> MetricsCollector:
+    """
+    The metrics collector for this process: a `SQLiteMetrics` reporting for all
+    workers under the runner, otherwise a `MetricsCollector`.
+    """
+    state_dir = os.environ.get(STATE_DIR_ENV)
+    if state_dir:
+        return SQLiteMetrics(os.path.join(state_dir, "metrics.db"), flush_interval=flush_interval)
+    return MetricsCollector()
+
+
+def _run_worker(config: Dict[str, Any], sock: socket.socket, state_dir: str) -> None:
+    import uvicorn
+
+    os.environ[STATE_DIR_ENV] = state_dir
+    # uvicorn handles SIGINT/SIGTERM itself: stop accepting, finish requests, exit.
+    uvicorn.Server(uvicorn.Config(**config)).run(sockets=[sock])
+
+
+class Runner:
+    """
+    Runs an ASGI app in several worker processes sharing one socket.
+
+    Args:
+        app: Import string of the app, ``"module:attribute"``.
+        workers: Number of worker processes; defaults to the CPU count.
+        host: Interface to bind.
+        port: Port to bind.
+        factory: `app` names a callable returning the app.
+        state_dir: Directory for the shared cache and metrics databases. By
+            default a temporary directory is used and removed on exit.
+        graceful_timeout: Seconds a draining worker may spend finishing its
+            requests before they are cancelled.
+        log_level: uvicorn log level.
+        **uvicorn_options: Passed to `uvicorn.Config` in every worker.
+    """
+
+    def __init__(
+        self,
+        app: str,
+        workers: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        *,
+        factory: bool = False,
+        state_dir: Optional[str] = None,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info",
+        **uvicorn_options: Any,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self.state_dir = state_dir
+        self.config: Dict[str, Any] = {
+            "app": app,
+            "host": host,
+            "port": port,
+            "factory": factory,
+            "log_level": log_level,
+            "timeout_graceful_shutdown": graceful_timeout,
+            **uvicorn_options,
+        }
+        self._context = multiprocessing.get_context("spawn")
+        self._wakeup = threading.Event()
+        self._reload = False
+        self._stop = False
+
+    def _spawn(self, sock: socket.socket, state_dir: str) -> Tuple[Any, float]:
+        process = self._context.Process(target=_run_worker, args=(self.config, sock, state_dir), daemon=False)
+        process.start()
+        return process, time.monotonic()
+
+    def _drain(self, processes: List[Any]) -> List[Tuple[Any, float]]:
+        # Leave a little time past uvicorn's own graceful timeout for it to cancel and exit.
+        deadline = time.monotonic() + self.graceful_timeout + 5.0
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        return [(process, deadline) for process in processes]
+
+    @staticmethod
+    def _reap(draining: List[Tuple[Any, float]]) -> List[Tuple[Any, float]]:
+        now = time.monotonic()
+        left = []
+        for process, deadline in draining:
+            if not process.is_alive():
+                process.join()
+            elif now >= deadline:
+                logger.warning("Worker %s did not drain in time; killing it", process.pid)
+                process.kill()
+                process.join()
+            else:
+                left.append((process, deadline))
+        return left
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        if signum == getattr(signal, "SIGHUP", None):
+            self._reload = True
+        else:
+            self._stop = True
+        self._wakeup.set()
+
+    def run(self) -> None:
+        """Start the workers and supervise them until SIGINT or SIGTERM."""
+        import uvicorn
+
+        sock = uvicorn.Config(**self.config).bind_socket()
+        state_dir = self.state_dir or tempfile.mkdtemp(prefix="openresponses-")
+        os.makedirs(state_dir, exist_ok=True)
+        for signum in (signal.SIGINT, signal.SIGTERM, getattr(signal, "SIGHUP", None)):
+            if signum is not None:
+                signal.signal(signum, self._on_signal)
+
+        workers = [self._spawn(sock, state_dir) for _ in range(self.workers)]
+        draining: List[Tuple[Any, float]] = []
+        logger.info("Started %d workers (runner pid %d)", self.workers, os.getpid())
+        try:
+            while not self._stop:
+                self._wakeup.wait(0.5)
+                self._wakeup.clear()
+                if self._reload:
+                    self._reload = False
+                    # New workers first, so the socket always has someone accepting.
+                    old = [process for process, _ in workers]
+                    workers = [self._spawn(sock, state_dir) for _ in range(self.workers)]
+                    draining += self._drain(old)
+                    logger.info("Reloading: started %d workers, draining %d", len(workers), len(old))
+                now = time.monotonic()
+                for index, (process, started) in enumerate(workers):
+                    if process.is_alive() or self._stop:
+                        continue
+                    if now - started < _MIN_UPTIME:
+                        continue  # retried on a later tick, once the worker has had its minimum uptime
+                    process.join()
+                    logger.warning("Worker %s exited with code %s; restarting", process.pid, process.exitcode)
+                    workers[index] = self._spawn(sock, state_dir)
+                draining = self._reap(draining)
+        finally:
+            draining += self._drain([process for process, _ in workers])
+            logger.info("Draining %d workers", len(draining))
+            while draining:
+                time.sleep(0.1)
+                draining = self._reap(draining)
+            sock.close()
+            if self.state_dir is None:
+                shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m openresponses.serve", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("app", help="App import string, e.g. examples.ollama_proxy:app")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--factory", action="store_true", help="The app is a factory returning the app")
+    parser.add_argument("--state-dir", help="Directory for the shared cache and metrics (default: temporary)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0, help="Seconds to drain a worker")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    Runner(
+        args.app,
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        factory=args.factory,
+        state_dir=args.state_dir,
+        graceful_timeout=args.graceful_timeout,
+        log_level=args.log_level,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+"""
+Open Responses server framework.
+
+Builds a FastAPI app serving ``POST /v1/responses`` on top of
+`OpenResponsesProvider`. Model access is delegated to pluggable `Backend`s, and
+several backends can be served from one process, selected by `model` prefix.
+Requires the ``server`` extra (and ``openai`` for `OpenAIChatBackend`).
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import httpx
+from pydantic import ValidationError
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from .accumulator import ResponseAccumulator
+from .cache import ResponseCache, request_cache_key
+from .codec import (
+    COMPRESS_MIN_BYTES,
+    JSON,
+    MSGPACK,
+    StreamCompressor,
+    accepts_msgpack,
+    compress,
+    decode_model,
+    decompress,
+    encode_model,
+    msgpack_available,
+    negotiate_encoding,
+    supported_encodings,
+)
+from .conversation import Conversation, ConversationStore
+from .metrics import PROMETHEUS_CONTENT_TYPE, MetricsCollector, Observer, atrace_events, atrace_frames
+from .singleflight import SingleFlight
+from .models import MessageItem, OpenResponsesOutput, OpenResponsesRequest, ReasoningItem, ResponseItem, ToolCallItem
+from .provider import OpenResponsesProvider, ReasoningSplitter, SSEStreamEncoder, aclose_stream
+
+# Upstream pool defaults: one long-lived pool per backend, sized for many
+# concurrent streams against a single host.
+UPSTREAM_LIMITS = httpx.Limits(max_connections=512, max_keepalive_connections=128, keepalive_expiry=60.0)
+UPSTREAM_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+
+ProviderEvent = Tuple[str, Any]
+
+
+class Backend(ABC):
+    """
+    A model backend served through the Open Responses API.
+
+    Implementations receive the request and its messages already mapped by
+    `OpenResponsesProvider.map_request_to_messages`.
+
+    Backends with ``supports_tools = True`` also accept a ``tools`` keyword
+    (function definitions in the Chat Completions format) and report the
+    model's tool calls as `ToolCallItem`s or ``response.tool_call.delta``
+    events; `openresponses.tools.ToolLoopBackend` requires one.
+    """
+
+    supports_tools = False
+
+    @abstractmethod
+    async def create(self, request: OpenResponsesRequest, messages: List[Dict[str, Any]]) -> OpenResponsesOutput:
+        """Return a complete response."""
+
+    @abstractmethod
+    def stream(self, request: OpenResponsesRequest, messages: List[Dict[str, Any]]) -> AsyncIterator[ProviderEvent]:
+        """
+        Yield ``(event_type, payload)`` pairs as accepted by `SSEStreamEncoder`,
+        ending with ``("response.done", {})``.
+        """
+
+    async def aclose(self) -> None:
+        """Release upstream connections. Called on app shutdown."""
+
+
+class OpenAIChatBackend(Backend):
+    """
+    Backend for any OpenAI-compatible Chat Completions API (OpenAI, OpenRouter,
+    Ollama, LM Studio, TGI, ...).
+
+    Args:
+        base_url: Upstream API root, e.g. ``http://localhost:11434/v1``.
+        api_key: Upstream API key.
+        default_model: Model used when the request leaves `model` empty.
+        http_client: Share one `httpx.AsyncClient` between backends; by default
+            each backend owns a long-lived pool built from `limits`/`timeout`/`http2`.
+        reasoning_fields: Message/delta attributes that carry reasoning text.
+        reasoning_tags: ``(open, close)`` tags, e.g. `THINK_TAGS`, that mark
+            reasoning inside ``content``; it is split out with `ReasoningSplitter`.
+    """
+
+    supports_tools = True
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        default_model: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        limits: httpx.Limits = UPSTREAM_LIMITS,
+        timeout: httpx.Timeout = UPSTREAM_TIMEOUT,
+        http2: bool = False,
+        reasoning_fields: Sequence[str] = ("reasoning", "reasoning_content"),
+        reasoning_tags: Optional[Tuple[str, str]] = None,
+    ):
+        from openai import AsyncOpenAI
+
+        self.default_model = default_model
+        self.reasoning_fields = tuple(reasoning_fields)
+        self.reasoning_tags = reasoning_tags
+        self._owns_http_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=self._http_client)
+
+    def _reasoning(self, obj: Any) -> Optional[str]:
+        for field in self.reasoning_fields:
+            value = getattr(obj, field, None)
+            if value:
+                return value
+        return None
+
+    async def create(
+        self,
+        request: OpenResponsesRequest,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> OpenResponsesOutput:
+        model = request.model or self.default_model
+        extra = {"tools": tools} if tools else {}
+        completion = await self.client.chat.completions.create(model=model, messages=messages, stream=False, **extra)
+        message = completion.choices[0].message
+        output: List[ResponseItem] = []
+        reasoning = self._reasoning(message)
+        content = message.content
+        if content and self.reasoning_tags:
+            inline, content = OpenResponsesProvider.split_reasoning(content, *self.reasoning_tags)
+            reasoning = (reasoning or "") + inline
+        if reasoning:
+            output.append(ReasoningItem(content=reasoning))
+        if content:
+            output.append(MessageItem(role="assistant", content=content))
+        for call in message.tool_calls or ():
+            arguments = _tool_arguments(call.function.arguments)
+            output.append(ToolCallItem(id=call.id, name=call.function.name, arguments=arguments))
+        return OpenResponsesOutput(id=completion.id, created=completion.created, model=model, output=output)
+
+    async def stream(
+        self,
+        request: OpenResponsesRequest,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[ProviderEvent]:
+        model = request.model or self.default_model
+        extra = {"tools": tools} if tools else {}
+        stream = await self.client.chat.completions.create(model=model, messages=messages, stream=True, **extra)
+        # Only the first chunk of a tool call carries its id; later ones refer to it by index.
+        call_ids: Dict[int, str] = {}
+        splitter = ReasoningSplitter(*self.reasoning_tags) if self.reasoning_tags else None
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                reasoning = self._reasoning(delta)
+                if reasoning:
+                    yield ("response.reasoning.delta", reasoning)
+                if delta.content:
+                    if splitter is None:
+                        yield ("response.text.delta", delta.content)
+                    else:
+                        for event in splitter.feed(delta.content):
+                            yield event
+                for call in delta.tool_calls or ():
+                    call_id = call_ids.setdefault(call.index, call.id or f"call_{call.index}")
+                    function = call.function
+                    yield ("response.tool_call.delta", {
+                        "id": call_id,
+                        "name": function.name if function is not None else None,
+                        "arguments": (function.arguments if function is not None else None) or "",
+                    })
+        finally:
+            # Runs when the client goes away too: closing the response stops upstream generation.
+            await stream.close()
+        if splitter is not None:
+            for event in splitter.finish():
+                yield event
+        yield ("response.done", {})
+
+    async def aclose(self) -> None:
+        if self._owns_http_client:
+            await self._http_client.aclose()
+
+
+def _tool_arguments(raw: Optional[str]) -> Dict[str, Any]:
+    try:
+        arguments = json.loads(raw) if raw else {}
+    except ValueError:
+        arguments = None
+    # Keep unparseable arguments rather than dropping them, as the accumulator does.
+    return arguments if isinstance(arguments, dict) else {"_raw": raw}
+
+
+class BackendRouter:
+    """
+    Selects a backend by the longest matching `model` prefix.
+
+    With ``strip_prefix=True`` the matched prefix is removed before the request
+    reaches the backend, so ``"ollama/llama3"`` is sent upstream as ``"llama3"``.
+    An empty-string prefix acts as the default route.
+    """
+
+    def __init__(self, routes: Mapping[str, Backend], strip_prefix: bool = True):
+        self.routes = dict(routes)
+        self.strip_prefix = strip_prefix
+        self._prefixes = sorted(self.routes, key=len, reverse=True)
+
+    def resolve(self, request: OpenResponsesRequest) -> Tuple[Backend, OpenResponsesRequest]:
+        """Return the backend and the request to send to it. Raises `LookupError` if nothing matches."""
+        model = request.model
+        for prefix in self._prefixes:
+            if model.startswith(prefix):
+                if self.strip_prefix and prefix:
+                    request = request.model_copy(update={"model": model[len(prefix):]})
+                return self.routes[prefix], request
+        raise LookupError(f"No backend configured for model '{model}'")
+
+    async def aclose(self) -> None:
+        seen = set()
+        for backend in self.routes.values():
+            if id(backend) not in seen:
+                seen.add(id(backend))
+                await backend.aclose()
+
+
+async def _guard_stream(events: AsyncIterator[ProviderEvent]) -> AsyncIterator[ProviderEvent]:
+    # Upstream failures mid-stream are reported in-band, as the proxies always did.
+    try:
+        async for event in events:
+            yield event
+    except Exception as e:
+        yield ("error", {"error": str(e)})
+    finally:
+        await aclose_stream(events)
+
+
+async def _complete_done(events: AsyncIterator[ProviderEvent], model: str) -> AsyncIterator[ProviderEvent]:
+    # Live streams end with the same `response.done` payload as a cached replay
+    # (see `OpenResponsesProvider.output_to_events`): id, created and the requested model.
+    try:
+        async for event in events:
+            event_type, payload = event
+            if event_type == "response.done":
+                event = (event_type, {
+                    **payload,
+                    "id": payload.get("id") or f"resp_{uuid.uuid4().hex}",
+                    "created": payload.get("created") or int(time.time()),
+                    "model": model or payload.get("model", ""),
+                })
+            yield event
+    finally:
+        await aclose_stream(events)
+
+
+async def _replay(events: Iterable[ProviderEvent]) -> AsyncIterator[ProviderEvent]:
+    for event in events:
+        yield event
+
+
+async def _cache_stream(
+    events: AsyncIterator[ProviderEvent], cache: ResponseCache, key: str, model: str
+) -> AsyncIterator[ProviderEvent]:
+    # Rebuild the output while streaming it; only complete, error-free streams are stored.
+    accumulator = ResponseAccumulator(model=model)
+    add = accumulator.add_provider_event
+    try:
+        async for event in events:
+            add(*event)
+            yield event
+    finally:
+        await aclose_stream(events)
+    if accumulator.done and accumulator.error is None:
+        output = accumulator.result()
+        output.model = model or output.model
+        await cache.aset(key, output)
+
+
+async def _conversation_stream(
+    events: AsyncIterator[ProviderEvent], conversations: ConversationStore, conversation: Conversation
+) -> AsyncIterator[ProviderEvent]:
+    # Store the finished turn before `response.done` goes out, so the client can
+    # continue from it at once with the id that event carries.
+    accumulator = ResponseAccumulator()
+    add = accumulator.add_provider_event
+    try:
+        async for event in events:
+            event_type, payload = event
+            if event_type == "response.done":
+                add(*event)
+                if accumulator.error is None:
+                    conversations.save(accumulator.id, conversation, accumulator.result().output)
+            else:
+                add(*event)
+            yield event
+    finally:
+        await aclose_stream(events)
+
+
+async def _read_request(http_request: Request) -> OpenResponsesRequest:
+    # Parsed here rather than by FastAPI, so bodies may be compressed or msgpack,
+    # and JSON is validated in one pass straight from bytes.
+    encoding = http_request.headers.get("content-encoding", "").strip().lower()
+    if encoding not in ("", "identity") and encoding not in supported_encodings():
+        raise HTTPException(status_code=415, detail=f"Unsupported content encoding '{encoding}'")
+    content_type = http_request.headers.get("content-type", JSON)
+    if MSGPACK in content_type and not msgpack_available():
+        raise HTTPException(status_code=415, detail="msgpack bodies are not supported by this server")
+    try:
+        body = decompress(await http_request.body(), encoding)
+        return decode_model(OpenResponsesRequest, body, content_type)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _compress_stream(frames: AsyncIterator[bytes], compressor: StreamCompressor) -> AsyncIterator[bytes]:
+    try:
+        async for frame in frames:
+            yield compressor.compress(frame)
+    finally:
+        await aclose_stream(frames)
+    yield compressor.finish()
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    A `StreamingResponse` that closes its body as soon as the response ends,
+    however it ends. When the client disconnects, Starlette stops iterating
+    the body but leaves it suspended until it is garbage collected; closing it
+    here cancels the upstream generation right away.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await aclose_stream(self.body_iterator)
+
+
+def _cache_allowed(http_request: Request) -> bool:
+    cache_control = http_request.headers.get("cache-control", "")
+    return "no-cache" not in cache_control and "no-store" not in cache_control
+
+
+def create_app(
+    backends: Union[Backend, Mapping[str, Backend], BackendRouter],
+    *,
+    title: str = "Open Responses Provider",
+    flush_interval: float = 0.02,
+    max_bytes: int = 4096,
+    stall_timeout: Optional[float] = 30.0,
+    cache: Optional[ResponseCache] = None,
+    single_flight: Optional[SingleFlight] = None,
+    metrics: Optional[Observer] = None,
+    conversations: Optional[ConversationStore] = None,
+    compression: Sequence[str] = (),
+) -> FastAPI:
+    """
+    Create a FastAPI app serving ``POST /v1/responses``.
+
+    Args:
+        backends: A single backend, a mapping of model prefix to backend, or a
+            `BackendRouter`.
+        title: App title.
+        flush_interval: `SSEStreamEncoder` batching window in seconds.
+        max_bytes: `SSEStreamEncoder` flush threshold.
+        stall_timeout: Seconds a client may stop reading a stream while the
+            upstream keeps producing before the upstream is cancelled; None
+            waits forever. Streams of clients that disconnect are cancelled
+            at once either way.
+        cache: Optional `ResponseCache`. Identical requests are answered from it
+            (replayed as SSE when ``stream=True``) and responses carry an
+            ``X-Cache: HIT|MISS`` header. Clients can bypass it with
+            ``Cache-Control: no-cache``. Counters are served at
+            ``GET /v1/cache/stats``.
+        single_flight: Optional `SingleFlight`. Concurrent identical requests
+            share one upstream call; streams are fanned out to every waiting
+            subscriber.
+        metrics: Optional `openresponses.metrics.Observer` measuring every
+            request as served (first frame, first deltas, token gaps from the
+            backend, duration, bytes written). A `MetricsCollector` is also
+            exposed at ``GET /metrics`` for Prometheus.
+        conversations: Optional `ConversationStore`. Every response's history
+            is stored under its id, and requests with ``previous_response_id``
+            send only their new items; backends receive the full (possibly
+            truncated) history.
+        compression: Response content encodings to offer, in order of
+            preference, e.g. ``("zstd", "gzip")`` (zstd requires the ``zstd``
+            extra). Streams are compressed with a flush per batch of frames,
+            other bodies from `COMPRESS_MIN_BYTES` up. Compressed (gzip/zstd)
+            and msgpack request bodies are always accepted, and msgpack
+            responses are sent to clients that ask for them.
+
+    Example:
+        ```python
+        app = create_app({
+            "ollama/": OpenAIChatBackend("http://localhost:11434/v1", "ollama"),
+            "": OpenAIChatBackend("https://openrouter.ai/api/v1", OPENROUTER_API_KEY),
+        }, cache=MemoryCache(max_entries=10_000, ttl=600))
+        ```
+    """
+    offered = tuple(compression)
+    unsupported = set(offered) - set(supported_encodings())
+    if unsupported:
+        raise ValueError(f"Unsupported compression {sorted(unsupported)}; available: {supported_encodings()}")
+
+    if isinstance(backends, Backend):
+        router = BackendRouter({"": backends})
+    elif isinstance(backends, BackendRouter):
+        router = backends
+    else:
+        router = BackendRouter(backends)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await router.aclose()
+        if cache is not None:
+            await asyncio.to_thread(cache.close)
+        if metrics is not None:
+            await asyncio.to_thread(metrics.close)
+
+    app = FastAPI(title=title, lifespan=lifespan)
+    app.state.router = router
+    app.state.cache = cache
+
+    @app.post("/v1/responses")
+    async def create_response(http_request: Request):
+        request = await _read_request(http_request)
+        try:
+            backend, upstream_request = router.resolve(request)
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        conversation = None
+        if conversations is not None:
+            previous = None
+            if request.previous_response_id is not None:
+                previous = conversations.get(request.previous_response_id)
+                if previous is None:
+                    raise HTTPException(
+                        status_code=404, detail=f"Unknown previous_response_id '{request.previous_response_id}'"
+                    )
+            new_messages = OpenResponsesProvider.map_request_to_messages(upstream_request)
+            conversation = conversations.extend(previous, new_messages)
+        elif request.previous_response_id is not None:
+            raise HTTPException(status_code=400, detail="previous_response_id requires a conversation store")
+
+        def map_messages() -> List[Dict[str, Any]]:
+            if conversation is not None:
+                return conversation.messages()
+            return OpenResponsesProvider.map_request_to_messages(upstream_request)
+
+        key = cached = None
+        headers = {}
+        content_encoding = negotiate_encoding(http_request.headers.get("accept-encoding", ""), offered)
+        if offered:
+            headers["Vary"] = "Accept-Encoding"
+        use_cache = cache is not None and _cache_allowed(http_request)
+        if use_cache or single_flight is not None:
+            key = request_cache_key(request)
+        if use_cache:
+            cached = await cache.aget(key)
+            headers["X-Cache"] = "HIT" if cached is not None else "MISS"
+
+        if request.stream:
+            encoder = SSEStreamEncoder(flush_interval=flush_interval, max_bytes=max_bytes, stall_timeout=stall_timeout)
+            if cached is not None:
+                events = _replay(OpenResponsesProvider.output_to_events(cached))
+                if conversation is not None:
+                    events = _conversation_stream(events, conversations, conversation)
+            else:
+                def upstream() -> AsyncIterator[ProviderEvent]:
+                    events = _guard_stream(backend.stream(upstream_request, map_messages()))
+                    events = _complete_done(events, request.model)
+                    if conversation is not None:
+                        events = _conversation_stream(events, conversations, conversation)
+                    if use_cache:
+                        events = _cache_stream(events, cache, key, request.model)
+                    return events
+
+                events = upstream() if single_flight is None else single_flight.stream(key, upstream)
+            if metrics is None:
+                body = encoder.stream(events)
+            else:
+                measured = metrics.start("provider", request.model, True)
+                body = encoder.stream(atrace_events(events, measured))
+            if content_encoding is not None:
+                body = _compress_stream(body, StreamCompressor(content_encoding))
+                headers["Content-Encoding"] = content_encoding
+            if metrics is not None:
+                body = atrace_frames(body, measured)
+            return EventStreamResponse(body, media_type="text/event-stream", headers=headers)
+
+        measured = metrics.start("provider", request.model, False) if metrics is not None else None
+        if cached is not None:
+            output = cached
+        else:
+            async def call_upstream() -> OpenResponsesOutput:
+                output = await backend.create(upstream_request, map_messages())
+                output.model = request.model or output.model
+                if use_cache:
+                    await cache.aset(key, output)
+                return output
+
+            try:
+                if single_flight is None:
+                    output = await call_upstream()
+                else:
+                    output = await single_flight.do(key, call_upstream)
+            except Exception as e:
+                if measured is not None:
+                    measured.finish(e)
+                raise HTTPException(status_code=500, detail=str(e))
+        if conversation is not None:
+            conversations.save(output.id, conversation, output.output)
+        # Serialize directly instead of going through FastAPI's jsonable_encoder.
+        media_type = MSGPACK if accepts_msgpack(http_request.headers.get("accept", "")) else JSON
+        content = encode_model(output, media_type)
+        if content_encoding is not None and len(content) >= COMPRESS_MIN_BYTES:
+            content = compress(content, content_encoding)
+            headers["Content-Encoding"] = content_encoding
+        if measured is not None:
+            measured.bytes = len(content)
+            measured.finish()
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    if cache is not None:
+        @app.get("/v1/cache/stats")
+        async def cache_stats():
+            return await cache.astats()
+
+    if isinstance(metrics, MetricsCollector):
+        @app.get("/metrics")
+        async def prometheus_metrics():
+            # `SQLiteMetrics` reads its database here, so the render runs off the event loop.
+            text = await asyncio.to_thread(metrics.render_prometheus)
+            return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return app
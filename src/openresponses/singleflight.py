@@ -0,0 +1,163 @@
+"""
+Request coalescing (single-flight).
+
+Concurrent identical requests share one upstream call. Non-streaming callers
+await the same result; streaming callers subscribe to one upstream stream that
+is fanned out through per-subscriber bounded buffers.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class SlowSubscriberError(RuntimeError):
+    """Raised in a subscriber that fell more than `buffer_size` events behind its stream."""
+
+
+class _Subscriber:
+    __slots__ = ("items", "ready", "done", "error")
+
+    def __init__(self, backlog: List[Any]):
+        self.items: Deque[Any] = deque(backlog)
+        self.ready = asyncio.Event()
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class _Flight:
+    """One in-flight upstream stream and its subscribers."""
+
+    def __init__(self, events: AsyncIterator[Any], buffer_size: int):
+        self.events = events
+        self.buffer_size = buffer_size
+        # Events so far, replayed to late joiners; dropped once joining closes.
+        self.history: Optional[List[Any]] = []
+        self.subscribers: Set[_Subscriber] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def joinable(self) -> bool:
+        return self.history is not None and len(self.history) < self.buffer_size
+
+    def subscribe(self) -> _Subscriber:
+        subscriber = _Subscriber(self.history or [])
+        self.subscribers.add(subscriber)
+        if self.task is None:
+            self.task = asyncio.create_task(self._pump())
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self.task is not None and not self.task.done():
+            # Nobody is listening any more: stop paying for the upstream.
+            self.task.cancel()
+
+    async def _pump(self) -> None:
+        error: Optional[BaseException] = None
+        try:
+            async for event in self.events:
+                history = self.history
+                if history is not None:
+                    history.append(event)
+                    if len(history) >= self.buffer_size:
+                        self.history = None
+                for subscriber in list(self.subscribers):
+                    subscriber.items.append(event)
+                    if len(subscriber.items) > self.buffer_size:
+                        subscriber.error = SlowSubscriberError(
+                            f"Subscriber fell more than {self.buffer_size} events behind"
+                        )
+                        self.subscribers.discard(subscriber)
+                    subscriber.ready.set()
+        except Exception as e:
+            error = e
+        finally:
+            self.history = None
+            for subscriber in self.subscribers:
+                subscriber.done = True
+                subscriber.error = subscriber.error or error
+                subscriber.ready.set()
+            aclose = getattr(self.events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Args:
+        buffer_size: Per-subscriber buffer for streams, in events. A subscriber
+            that falls further behind is dropped with `SlowSubscriberError`
+            instead of stalling the others. Late joiners are only attached to a
+            stream while its backlog still fits in the buffer; otherwise they
+            start their own upstream call.
+    """
+
+    def __init__(self, buffer_size: int = 1024):
+        self.buffer_size = buffer_size
+        self.calls = 0
+        self.coalesced = 0
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[str, int] = {}
+        self._flights: Dict[str, _Flight] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn()`` once for all concurrent callers with the same key. The call
+        is cancelled only when every caller has gone away.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._forget_call(key, task))
+        else:
+            self.coalesced += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Subscribe to the in-flight stream for `key`, starting one with
+        ``factory()`` if none is joinable.
+        """
+        flight = self._flights.get(key)
+        if flight is None or not flight.joinable():
+            self.calls += 1
+            flight = self._flights[key] = _Flight(factory(), self.buffer_size)
+        else:
+            self.coalesced += 1
+        subscriber = flight.subscribe()
+        try:
+            while True:
+                if subscriber.error is not None and (not subscriber.done or not subscriber.items):
+                    raise subscriber.error
+                if subscriber.items:
+                    yield subscriber.items.popleft()
+                    continue
+                if subscriber.done:
+                    return
+                subscriber.ready.clear()
+                await subscriber.ready.wait()
+        finally:
+            flight.unsubscribe(subscriber)
+            if self._flights.get(key) is flight and (flight.task is None or flight.task.done() or not flight.subscribers):
+                del self._flights[key]
+
+    def _forget_call(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
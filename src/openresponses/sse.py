@@ -0,0 +1,184 @@
+"""
+Server-Sent Events decoding.
+
+An incremental decoder for the `text/event-stream` format that works directly on
+raw byte chunks as they arrive from the network. It follows the WHATWG parsing
+rules: CR, LF and CRLF line endings, `data:` with or without a space, multi-line
+`data:` fields, `id:`/`retry:` fields and `:` comments.
+"""
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+_BOM = b"\xef\xbb\xbf"
+_json = json.JSONDecoder()
+
+
+class ServerSentEvent:
+    """A single dispatched SSE event. `data` is decoded lazily from the raw bytes."""
+
+    __slots__ = ("event", "id", "retry", "_raw")
+
+    def __init__(self, event: str, raw: bytes, id: str = "", retry: Optional[int] = None):
+        self.event = event
+        self.id = id
+        self.retry = retry
+        self._raw = raw
+
+    @property
+    def data(self) -> str:
+        return self._raw.decode("utf-8", errors="replace")
+
+    @property
+    def raw(self) -> bytes:
+        return self._raw
+
+    def json(self) -> Any:
+        """Parse the data field as JSON."""
+        text = self._raw.decode("utf-8")
+        # raw_decode skips json.loads' whitespace regex passes; fall back to the
+        # strict path for padded or malformed payloads so errors still surface.
+        try:
+            value, end = _json.raw_decode(text)
+        except ValueError:
+            return _json.decode(text)
+        return value if end == len(text) else _json.decode(text)
+
+    def __repr__(self) -> str:
+        return f"ServerSentEvent(event={self.event!r}, data={self.data!r}, id={self.id!r}, retry={self.retry!r})"
+
+
+class SSEDecoder:
+    """
+    Incremental SSE decoder.
+
+    Feed it byte chunks of any size with `feed()`; it returns the events completed
+    by that chunk and buffers the trailing partial line. Call `flush()` at the end
+    of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._head = b""
+        self._started = False
+        # Pieces of the current, unterminated line. They are joined once the
+        # line ends, so a long line costs linear time however it is chunked.
+        self._pending: List[bytes] = []
+        # The last chunk ended with CR; an LF starting the next one completes that CRLF.
+        self._skip_lf = False
+        self._event = ""
+        self._data: List[bytes] = []
+        self._last_id = ""
+        self._retry: Optional[int] = None
+        # Event names repeat constantly in a stream; decode each distinct one once.
+        self._names: Dict[bytes, str] = {}
+
+    def feed(self, chunk: bytes) -> List[ServerSentEvent]:
+        if not self._started:
+            if len(self._head) + len(chunk) < len(_BOM) and _BOM.startswith(self._head + chunk):
+                self._head += chunk
+                return []
+            chunk = self._head + chunk
+            self._head = b""
+            self._started = True
+            if chunk.startswith(_BOM):
+                chunk = chunk[len(_BOM):]
+
+        if self._skip_lf:
+            self._skip_lf = False
+            if chunk[:1] == b"\n":
+                chunk = chunk[1:]
+        if b"\r" in chunk:
+            self._skip_lf = chunk.endswith(b"\r")
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        # Only the new chunk is scanned for line endings.
+        if b"\n" not in chunk:
+            if chunk:
+                self._pending.append(chunk)
+            return []
+        lines = chunk.split(b"\n")
+        pending = self._pending
+        if pending:
+            pending.append(lines[0])
+            lines[0] = b"".join(pending)
+            pending.clear()
+        last = lines.pop()
+        if last:
+            pending.append(last)
+        return self._process(lines)
+
+    def flush(self) -> List[ServerSentEvent]:
+        """
+        Finish the stream. Any event not terminated by a blank line is
+        discarded, per the spec.
+        """
+        self._pending.clear()
+        self._skip_lf = False
+        self._event = ""
+        self._data = []
+        return []
+
+    def _process(self, lines: List[bytes]) -> List[ServerSentEvent]:
+        events = []
+        data = self._data
+        names = self._names
+        for line in lines:
+            if not line:
+                if data:
+                    raw = data[0] if len(data) == 1 else b"\n".join(data)
+                    events.append(ServerSentEvent(self._event or "message", raw, self._last_id, self._retry))
+                    data = self._data = []
+                self._event = ""
+                continue
+            # Fast paths for the two fields that make up nearly every line.
+            if line.startswith(b"data:"):
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+                continue
+            if line.startswith(b"event: "):
+                name = line[7:]
+                event = names.get(name)
+                if event is None:
+                    event = name.decode("utf-8", errors="replace")
+                    if len(names) < 64:
+                        names[name] = event
+                self._event = event
+                continue
+            if line[0] == 0x3A:  # ":" comment / keep-alive
+                continue
+
+            colon = line.find(b":")
+            if colon == -1:
+                field, value = line, b""
+            else:
+                field = line[:colon]
+                value = line[colon + 2:] if line[colon + 1:colon + 2] == b" " else line[colon + 1:]
+
+            if field == b"event":
+                self._event = value.decode("utf-8", errors="replace")
+            elif field == b"data":
+                data.append(value)
+            elif field == b"id":
+                if b"\x00" not in value:
+                    self._last_id = value.decode("utf-8", errors="replace")
+            elif field == b"retry":
+                if value.isdigit():
+                    self._retry = int(value)
+        return events
+
+
+def iter_sse(chunks: Iterable[bytes]) -> Iterator[ServerSentEvent]:
+    """Decode an iterable of byte chunks (e.g. `httpx.Response.iter_bytes()`)."""
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.flush()
+
+
+async def aiter_sse(chunks: AsyncIterable[bytes]) -> AsyncIterator[ServerSentEvent]:
+    """Decode an async iterable of byte chunks (e.g. `httpx.Response.aiter_bytes()`)."""
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
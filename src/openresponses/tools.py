@@ -0,0 +1,305 @@
+"""
+Provider-managed tool loops.
+
+`ToolRegistry` holds Python functions the provider may run on the model's
+behalf. `ToolLoopBackend` wraps a tool-capable `Backend`: when the model
+calls registered tools, they run in the provider (independent calls of one
+turn concurrently) and the model is called again with their results, until it
+answers or ``max_tool_calls`` is reached. Clients get the whole loop in one
+response instead of paying a network round trip per tool call.
+Requires the ``server`` extra.
+"""
+
+import asyncio
+import inspect
+import json
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import create_model
+
+from .accumulator import ResponseAccumulator
+from .models import OpenResponsesOutput, OpenResponsesRequest, ResponseItem, ToolCallItem, ToolResultItem
+from .provider import OpenResponsesProvider, aclose_stream
+from .server import Backend, ProviderEvent
+
+# Used when neither the request nor the backend sets max_tool_calls.
+DEFAULT_MAX_TOOL_CALLS = 16
+
+ToolFunction = Callable[..., Union[Any, Awaitable[Any]]]
+
+
+def _parameters_schema(fn: ToolFunction) -> Dict[str, Any]:
+    # JSON schema of the function's keyword arguments, from its annotations.
+    fields: Dict[str, Any] = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        annotation = Any if param.annotation is param.empty else param.annotation
+        fields[name] = (annotation, ... if param.default is param.empty else param.default)
+    schema = create_model(f"{fn.__name__}_arguments", **fields).model_json_schema()
+    schema.pop("title", None)
+    return schema
+
+
+class Tool:
+    """
+    A registered tool.
+
+    Args:
+        fn: Sync or async function called with the model's arguments as keywords.
+        name: Name shown to the model; defaults to the function name.
+        description: Defaults to the function's docstring.
+        parameters: JSON schema of the arguments; derived from the signature by default.
+        pure: The result depends only on the arguments, so it can be cached.
+        timeout: Seconds before the call is abandoned and reported as failed.
+    """
+
+    __slots__ = ("fn", "name", "description", "parameters", "pure", "timeout", "is_async")
+
+    def __init__(
+        self,
+        fn: ToolFunction,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        pure: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.description = description if description is not None else inspect.getdoc(fn) or ""
+        self.parameters = parameters if parameters is not None else _parameters_schema(fn)
+        self.pure = pure
+        self.timeout = timeout
+        self.is_async = inspect.iscoroutinefunction(fn)
+
+    def definition(self) -> Dict[str, Any]:
+        """The tool in the Chat Completions ``tools`` format."""
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": self.parameters},
+        }
+
+    async def __call__(self, arguments: Dict[str, Any]) -> Any:
+        if self.is_async:
+            call = self.fn(**arguments)
+        else:
+            # Blocking tools run in the default executor so they do not stall the event loop.
+            call = asyncio.to_thread(self.fn, **arguments)
+        if self.timeout is None:
+            return await call
+        return await asyncio.wait_for(call, self.timeout)
+
+
+def _output_text(result: Any) -> str:
+    return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=str)
+
+
+class ToolRegistry:
+    """
+    Tools the provider can run.
+
+    Results of ``pure`` tools are kept in an LRU of `cache_size` entries keyed
+    by name and arguments, and identical pure calls in one turn run once.
+
+    Example:
+        ```python
+        tools = ToolRegistry()
+
+        @tools.register(pure=True)
+        def get_weather(city: str) -> dict:
+            \"\"\"Current weather for a city.\"\"\"
+            return weather_api.lookup(city)
+
+        app = create_app(ToolLoopBackend(OpenAIChatBackend(base_url, api_key), tools))
+        ```
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._tools: Dict[str, Tool] = {}
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.cache_hits = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def register(
+        self,
+        fn: Optional[ToolFunction] = None,
+        *,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        pure: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        """Register a function, directly or as a decorator (with or without arguments)."""
+        def decorator(fn: ToolFunction) -> ToolFunction:
+            tool = Tool(fn, name=name, description=description, parameters=parameters, pure=pure, timeout=timeout)
+            self._tools[tool.name] = tool
+            self._definitions = None
+            return fn
+
+        return decorator if fn is None else decorator(fn)
+
+    def definitions(self) -> List[Dict[str, Any]]:
+        """All tools in the Chat Completions ``tools`` format."""
+        if self._definitions is None:
+            self._definitions = [tool.definition() for tool in self._tools.values()]
+        return self._definitions
+
+    async def run(self, calls: Sequence[ToolCallItem]) -> List[ToolResultItem]:
+        """
+        Run tool calls concurrently; results are in call order. A failing tool
+        does not fail the others: its error is returned as its output, for the
+        model to react to.
+        """
+        outputs: Dict[int, str] = {}
+        pending: Dict[Any, "asyncio.Task[str]"] = {}
+        keys: List[Any] = []
+        for index, call in enumerate(calls):
+            tool = self._tools.get(call.name)
+            key: Any = index
+            if tool is not None and tool.pure:
+                key = (call.name, json.dumps(call.arguments, sort_keys=True, separators=(",", ":")))
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    outputs[index] = cached
+                    keys.append(None)
+                    continue
+            keys.append(key)
+            if key not in pending:
+                pending[key] = asyncio.ensure_future(self._call(tool, call, key if isinstance(key, tuple) else None))
+        if pending:
+            try:
+                await asyncio.gather(*pending.values())
+            finally:
+                for task in pending.values():
+                    task.cancel()
+        for index, key in enumerate(keys):
+            if key is not None:
+                outputs[index] = pending[key].result()
+        return [ToolResultItem(call_id=call.id, output=outputs[index]) for index, call in enumerate(calls)]
+
+    async def _call(self, tool: Optional[Tool], call: ToolCallItem, cache_key: Optional[Tuple[str, str]]) -> str:
+        if tool is None:
+            return f"Error: unknown tool '{call.name}'"
+        try:
+            output = _output_text(await tool(call.arguments))
+        except asyncio.TimeoutError:
+            return f"Error: tool '{call.name}' timed out after {tool.timeout}s"
+        except Exception as e:
+            return f"Error: {type(e).__name__}: {e}"
+        if cache_key is not None:
+            self._cache[cache_key] = output
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return output
+
+
+class ToolLoopBackend(Backend):
+    """
+    Runs registered tools in the provider until the model stops calling them.
+
+    Each round calls the wrapped backend with the registry's tool definitions.
+    If the model calls tools, they run (concurrently within the round), the
+    calls and results are appended to the conversation, and the model is
+    called again. Streams pass every delta through and add a
+    ``response.tool_result`` event per result. The loop ends when the model
+    answers without tool calls, when it calls a tool that is not registered
+    (those calls are returned for the client to run), or when the request's
+    ``max_tool_calls`` (else `max_tool_calls`) would be exceeded, in which
+    case the unexecuted calls are returned as they are.
+
+    Args:
+        backend: A backend with ``supports_tools``, e.g. `OpenAIChatBackend`.
+        tools: The `ToolRegistry`.
+        max_tool_calls: Limit for requests that do not set one.
+    """
+
+    supports_tools = True
+
+    def __init__(self, backend: Backend, tools: ToolRegistry, max_tool_calls: int = DEFAULT_MAX_TOOL_CALLS):
+        if not backend.supports_tools:
+            raise TypeError(f"{type(backend).__name__} does not support tools")
+        self.backend = backend
+        self.tools = tools
+        self.max_tool_calls = max_tool_calls
+
+    def _limit(self, request: OpenResponsesRequest) -> int:
+        return request.max_tool_calls if request.max_tool_calls is not None else self.max_tool_calls
+
+    def _runnable(self, calls: List[ToolCallItem], made: int, limit: int) -> bool:
+        return bool(calls) and made + len(calls) <= limit and all(call.name in self.tools for call in calls)
+
+    async def create(
+        self,
+        request: OpenResponsesRequest,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> OpenResponsesOutput:
+        definitions = self.tools.definitions() + list(tools or ())
+        messages = list(messages)
+        items: List[ResponseItem] = []
+        limit = self._limit(request)
+        made = 0
+        while True:
+            output = await self.backend.create(request, messages, tools=definitions)
+            items.extend(output.output)
+            calls = [item for item in output.output if item.type == "tool_call"]
+            if not self._runnable(calls, made, limit):
+                output.output = items
+                return output
+            results = await self.tools.run(calls)
+            made += len(calls)
+            items.extend(results)
+            messages.extend(OpenResponsesProvider.map_items([*calls, *results]))
+
+    async def stream(
+        self,
+        request: OpenResponsesRequest,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[ProviderEvent]:
+        definitions = self.tools.definitions() + list(tools or ())
+        messages = list(messages)
+        limit = self._limit(request)
+        made = 0
+        while True:
+            # Deltas go straight to the client; the accumulator only collects this round's tool calls.
+            round_output = ResponseAccumulator()
+            done: Dict[str, Any] = {}
+            events = self.backend.stream(request, messages, tools=definitions)
+            try:
+                async for event_type, payload in events:
+                    if event_type == "response.done":
+                        done = payload
+                        break
+                    if event_type == "response.tool_call.delta":
+                        round_output.add_provider_event(event_type, payload)
+                    elif event_type == "error":
+                        yield (event_type, payload)
+                        return
+                    yield (event_type, payload)
+            finally:
+                await aclose_stream(events)
+            calls = [item for item in round_output.result().output if item.type == "tool_call"]
+            if not self._runnable(calls, made, limit):
+                yield ("response.done", done)
+                return
+            results = await self.tools.run(calls)
+            made += len(calls)
+            for result in results:
+                yield ("response.tool_result", {"call_id": result.call_id, "output": result.output})
+            messages.extend(OpenResponsesProvider.map_items([*calls, *results]))
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
@@ -0,0 +1,92 @@
+import asyncio
+
+from openresponses.accumulator import ResponseAccumulator
+from openresponses.models import (
+    MessageItem,
+    OpenResponsesOutput,
+    ReasoningItem,
+    StreamEvent,
+    ToolCallItem,
+    ToolResultItem,
+)
+from openresponses.provider import OpenResponsesProvider
+
+
+def _event(event_type, **data):
+    return StreamEvent.from_sse(event_type, data)
+
+
+EVENTS = [
+    _event("response.reasoning.delta", delta="Let me "),
+    _event("response.reasoning.delta", delta="check."),
+    _event("response.tool_call.delta", id="call_1", name="lookup", arguments='{"q": '),
+    _event("response.tool_call.delta", id="call_1", arguments='"weather"}'),
+    _event("response.tool_result", call_id="call_1", output="sunny"),
+    _event("response.text.delta", delta="It is "),
+    _event("response.text.delta", delta="sunny."),
+    _event("response.done", id="resp_9", created=123, model="m"),
+]
+
+
+def test_consecutive_deltas_form_items_in_stream_order():
+    output = ResponseAccumulator().consume(EVENTS)
+    assert output.id == "resp_9" and output.created == 123 and output.model == "m"
+    assert output.output == [
+        ReasoningItem(content="Let me check."),
+        ToolCallItem(id="call_1", name="lookup", arguments={"q": "weather"}),
+        ToolResultItem(call_id="call_1", output="sunny"),
+        MessageItem(role="assistant", content="It is sunny."),
+    ]
+
+
+def test_snapshot_reflects_the_stream_so_far():
+    accumulator = ResponseAccumulator(model="m")
+    for event in EVENTS[:2]:
+        accumulator.add(event)
+    assert accumulator.snapshot().output == [ReasoningItem(content="Let me check.")]
+    assert not accumulator.done
+    for event in EVENTS[2:]:
+        accumulator.add(event)
+    assert accumulator.done and accumulator.result() == accumulator.snapshot()
+
+
+def test_tool_call_chunks_without_id_continue_the_current_call():
+    accumulator = ResponseAccumulator()
+    accumulator.add(_event("response.tool_call.delta", id="call_1", name="f", arguments="{"))
+    accumulator.add(_event("response.tool_call.delta", arguments="}"))
+    accumulator.add(_event("response.tool_call.delta", id="call_2", name="g", arguments="not json"))
+    assert accumulator.result().output == [
+        ToolCallItem(id="call_1", name="f", arguments={}),
+        ToolCallItem(id="call_2", name="g", arguments={"_raw": "not json"}),
+    ]
+
+
+def test_errors_and_unknown_events():
+    accumulator = ResponseAccumulator()
+    accumulator.add(_event("response.created", id="x"))
+    accumulator.add(_event("error", error="upstream failed"))
+    assert accumulator.error == "upstream failed" and accumulator.result().output == []
+
+
+def test_track_passes_events_through():
+    accumulator = ResponseAccumulator()
+    assert list(accumulator.track(EVENTS)) == EVENTS
+    assert accumulator.done
+
+    async def main():
+        async def events():
+            for event in EVENTS:
+                yield event
+
+        return await ResponseAccumulator().aconsume(events())
+
+    assert asyncio.run(main()).output == accumulator.result().output
+
+
+def test_provider_events_round_trip_through_output_to_events():
+    output = ResponseAccumulator().consume(EVENTS)
+    rebuilt = ResponseAccumulator()
+    for event_type, payload in OpenResponsesProvider.output_to_events(output):
+        rebuilt.add_provider_event(event_type, payload)
+    assert rebuilt.result() == output
+    assert isinstance(rebuilt.result(), OpenResponsesOutput)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from openresponses.balancer import EndpointPool
+from openresponses.client import AsyncOpenResponsesClient, OpenResponsesClient
+from openresponses.retry import HedgePolicy
+
+OUTPUT = {"id": "resp_1", "created": 0, "model": "m", "output": []}
+
+
+def test_least_outstanding_spreads_requests():
+    pool = EndpointPool(["http://a", "http://b"])
+    first, second = pool.acquire(), pool.acquire()
+    assert {first.base_url, second.base_url} == {"http://a", "http://b"}
+    pool.release(first, latency=0.1)
+    assert first.outstanding == 0 and first.latency == 0.1
+
+
+def test_round_robin_cycles():
+    pool = EndpointPool(["http://a", "http://b", "http://c"], strategy="round_robin")
+    picks = []
+    for _ in range(6):
+        endpoint = pool.acquire()
+        picks.append(endpoint.base_url)
+        pool.release(endpoint)
+    assert sorted(picks[:3]) == ["http://a", "http://b", "http://c"] and picks[:3] == picks[3:]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        EndpointPool([])
+    with pytest.raises(ValueError):
+        EndpointPool(["http://a"], strategy="fastest")
+
+
+def test_endpoint_is_ejected_after_consecutive_failures_and_avoided():
+    pool = EndpointPool(["http://a", "http://b"], failure_threshold=2)
+    a, b = pool.endpoints
+    for _ in range(2):
+        a.outstanding += 1
+        pool.release(a, failed=True)
+    assert not a.healthy
+    assert all(pool.acquire() is b for _ in range(5))
+    assert not pool.can_failover([b])
+
+
+def test_success_resets_the_failure_count():
+    pool = EndpointPool(["http://a"], failure_threshold=2)
+    (a,) = pool.endpoints
+    for failed in (True, False, True):
+        a.outstanding += 1
+        pool.release(a, latency=None if failed else 0.1, failed=failed)
+    assert a.healthy and a.failures == 1
+
+
+def test_expired_ejection_lets_one_probe_through():
+    pool = EndpointPool(["http://a", "http://b"], failure_threshold=1, ejection_time=0.01, strategy="ewma")
+    a, b = pool.endpoints
+    b.latency = 1.0
+    a.outstanding += 1
+    pool.release(a, failed=True)
+    time.sleep(0.02)
+    assert pool.acquire() is a and a.probing
+    # Only one probe at a time.
+    assert pool.acquire() is b
+    pool.release(a, latency=0.1)
+    assert a.healthy and not a.probing
+
+
+def test_failed_probe_doubles_the_ejection():
+    pool = EndpointPool(["http://a"], failure_threshold=1, ejection_time=0.01)
+    (a,) = pool.endpoints
+    a.outstanding += 1
+    pool.release(a, failed=True)
+    time.sleep(0.02)
+    assert pool.acquire() is a and a.probing
+    pool.release(a, failed=True)
+    assert a.ejections == 2 and a.ejected_until - time.monotonic() > 0.015
+
+
+def test_all_ejected_falls_back_to_the_one_due_back_first():
+    pool = EndpointPool(["http://a", "http://b"], failure_threshold=1)
+    a, b = pool.endpoints
+    for endpoint in (a, b):
+        endpoint.outstanding += 1
+        pool.release(endpoint, failed=True)
+    assert pool.acquire() is a
+
+
+def test_abandoned_probe_leaves_the_endpoint_ejected():
+    pool = EndpointPool(["http://a"], failure_threshold=1, ejection_time=0.01)
+    (a,) = pool.endpoints
+    a.outstanding += 1
+    pool.release(a, failed=True)
+    time.sleep(0.02)
+    assert pool.acquire() is a and a.probing
+    pool.abandon(a)
+    assert not a.healthy and a.ejections == 1 and not a.probing and a.outstanding == 0
+
+
+def test_sync_client_fails_over_and_ejects():
+    def handler(request):
+        if request.url.host == "dead":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json=OUTPUT)
+
+    pool = EndpointPool(["http://dead", "http://live"], strategy="round_robin", failure_threshold=1)
+    client = OpenResponsesClient(endpoints=pool, http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    for _ in range(4):
+        assert client.create(model="m", input="hi").id == "resp_1"
+    dead, live = pool.endpoints
+    assert not dead.healthy and live.healthy
+    assert dead.outstanding == live.outstanding == 0
+
+
+def test_losing_hedge_on_a_probed_endpoint_does_not_mark_it_healthy():
+    async def handler(request):
+        if request.url.host == "dead":
+            await asyncio.sleep(10)
+        return httpx.Response(200, json=OUTPUT)
+
+    async def main():
+        pool = EndpointPool(["http://dead", "http://live"], failure_threshold=1, ejection_time=0.01, strategy="ewma")
+        dead, live = pool.endpoints
+        live.latency = 1.0
+        dead.outstanding += 1
+        pool.release(dead, failed=True)
+        await asyncio.sleep(0.02)
+        client = AsyncOpenResponsesClient(
+            endpoints=pool,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            hedge=HedgePolicy(initial_delay=0.01, min_delay=0.01),
+        )
+        # The first attempt probes the dead endpoint and is cancelled when the hedge on `live` wins.
+        output = await client.create(model="m", input="hi")
+        await asyncio.sleep(0)
+        assert output.id == "resp_1"
+        assert not dead.healthy and dead.ejections == 1
+        assert not dead.probing and dead.outstanding == 0 and live.outstanding == 0
+
+    asyncio.run(main())
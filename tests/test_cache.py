@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+import time
+
+from openresponses.cache import MemoryCache, SQLiteCache, request_cache_key
+from openresponses.models import OpenResponsesOutput, OpenResponsesRequest
+
+
+def _output(text="hello"):
+    return OpenResponsesOutput(
+        id="resp_1", created=0, model="m", output=[{"type": "message", "role": "assistant", "content": text}]
+    )
+
+
+def test_cache_key_ignores_stream_and_key_order():
+    plain = OpenResponsesRequest(model="m", input="hi", tools=[{"name": "f", "parameters": {"a": 1, "b": 2}}])
+    streamed = OpenResponsesRequest(model="m", input="hi", stream=True, tools=[{"parameters": {"b": 2, "a": 1}, "name": "f"}])
+    assert request_cache_key(plain) == request_cache_key(streamed)
+    assert request_cache_key(plain) != request_cache_key(OpenResponsesRequest(model="m", input="bye"))
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2, ttl=None)
+    cache.set("a", _output("a"))
+    cache.set("b", _output("b"))
+    assert cache.get("a") == _output("a")
+    cache.set("c", _output("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") == _output("a") and cache.get("c") == _output("c")
+    assert len(cache) == 2
+    assert cache.stats.as_dict() == {"hits": 3, "misses": 1, "evictions": 1, "expirations": 0, "hit_ratio": 0.75}
+
+
+def test_memory_cache_expires_entries():
+    cache = MemoryCache(ttl=0.01)
+    cache.set("a", _output())
+    assert cache.get("a") == _output()
+    time.sleep(0.02)
+    assert cache.get("a") is None and len(cache) == 0
+    assert (cache.stats.expirations, cache.stats.misses) == (1, 1)
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=10, ttl=0.05)
+    cache.set("old", _output())
+    time.sleep(0.1)
+    assert cache.get("old") is None
+    assert cache.stats.expirations == 1
+    cache.ttl = None
+    # Eviction runs every 64 writes and keeps the most recently used entries.
+    for i in range(63):
+        cache.set(str(i), _output(str(i)))
+    assert cache.stats.evictions == 53
+    assert cache.get("52") is None and cache.get("53") == _output("53")
+    cache.close()
+
+
+def test_sqlite_cache_stats_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = SQLiteCache(path), SQLiteCache(path)
+    first.set("key", _output())
+    assert second.get("key") == _output()
+    assert first.get("other") is None
+    # `stats` is this process's; `astats` covers everyone sharing the file.
+    assert (first.stats.hits, first.stats.misses) == (0, 1)
+    assert (second.stats.hits, second.stats.misses) == (1, 0)
+    shared = asyncio.run(first.astats())
+    assert (shared["hits"], shared["misses"], shared["hit_ratio"]) == (1, 1, 0.5)
+    first.close()
+    second.close()
+
+
+def test_sqlite_cache_waits_for_a_locked_database_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        write = asyncio.create_task(cache.aset("key", _output()))
+        await asyncio.sleep(0.2)
+        assert not write.done() and ticks >= 10
+        blocker.execute("COMMIT")
+        await asyncio.wait_for(write, 5)
+        ticker.cancel()
+        assert await cache.aget("key") == _output()
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start < 5
+    blocker.close()
+    cache.close()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+import httpx
+
+from openresponses.client import AsyncOpenResponsesClient, OpenResponsesClient
+from openresponses.models import StreamEvent, TextDelta
+
+OUTPUT = {
+    "id": "resp_1",
+    "created": 0,
+    "model": "m",
+    "output": [{"type": "message", "role": "assistant", "content": "hi"}],
+}
+
+STREAM = (
+    b"event: response.text.delta\n"
+    b'data: {"delta": "Hi"}\n\n'
+    b"event: response.text.delta\n"
+    b'data: {"text": "no delta field"}\n\n'
+    b"event: error\n"
+    b'data: {"error": {"message": "upstream overloaded"}}\n\n'
+    b"event: response.done\n"
+    b"data: {}\n\n"
+)
+
+
+def _client(**options):
+    def handler(request):
+        return httpx.Response(200, content=STREAM, headers={"Content-Type": "text/event-stream"})
+
+    return OpenResponsesClient("http://test", http_client=httpx.Client(transport=httpx.MockTransport(handler)), **options)
+
+
+def test_stream_events_are_typed():
+    events = list(_client().create(model="m", input="hi", stream=True))
+    assert isinstance(events[0], TextDelta) and events[0].delta == "Hi"
+    assert [event.event for event in events] == [
+        "response.text.delta",
+        "response.text.delta",
+        "error",
+        "response.done",
+    ]
+
+
+def test_payload_that_does_not_fit_its_event_falls_back_to_stream_event():
+    events = list(_client().create(model="m", input="hi", stream=True))
+    assert type(events[1]) is StreamEvent and events[1].data == {"text": "no delta field"}
+    assert type(events[2]) is StreamEvent and events[2].data["error"]["message"] == "upstream overloaded"
+
+
+
+def test_client_owns_one_pool_and_closes_it():
+    client = OpenResponsesClient("http://test", timeout=5.0)
+    pool = client._client
+    assert pool.timeout == httpx.Timeout(5.0)
+    with client:
+        pass
+    assert pool.is_closed
+
+
+def test_supplied_http_client_is_reused_and_left_open():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json=OUTPUT)
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    with OpenResponsesClient("http://test/", http_client=http_client) as client:
+        assert client.create(model="m", input="a").id == "resp_1"
+        assert client.create(model="m", input="b").output[0].content == "hi"
+    assert seen == ["/v1/responses", "/v1/responses"]
+    assert not http_client.is_closed
+
+
+def test_async_client_owns_its_pool():
+    async def main():
+        async with AsyncOpenResponsesClient("http://test") as client:
+            pool = client._client
+        assert pool.is_closed
+
+    asyncio.run(main())
+
+
+def test_trusted_events_match_validated_ones():
+    trusted = list(_client(trusted=True).create(model="m", input="hi", stream=True))
+    validated = list(_client().create(model="m", input="hi", stream=True))
+    # Well-formed events (the first and last here) are built the same either way.
+    for index in (0, -1):
+        assert type(trusted[index]) is type(validated[index])
+        assert trusted[index].model_dump() == validated[index].model_dump()
+    assert trusted[0].delta == "Hi"
+    # Trusted mode does not check payloads: they pass through as received.
+    assert [event.data for event in trusted] == [event.data for event in validated]
+
+
+def test_async_stream_events_are_typed():
+    async def main():
+        def handler(request):
+            return httpx.Response(200, content=STREAM, headers={"Content-Type": "text/event-stream"})
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncOpenResponsesClient("http://test", http_client=http_client, trusted=True) as client:
+            async with await client.create(model="m", input="hi", stream=True) as stream:
+                return [event async for event in stream]
+
+    events = asyncio.run(main())
+    assert isinstance(events[0], TextDelta) and events[0].delta == "Hi"
+    assert [event.event for event in events][-1] == "response.done"
+
+
+def _echo_output(request):
+    body = json.loads(request.content)
+    return {**OUTPUT, "output": [{"type": "message", "role": "assistant", "content": body["input"]}]}
+
+
+def test_create_many_reports_results_and_failures_per_item():
+    def handler(request):
+        if json.loads(request.content)["input"] == "bad":
+            return httpx.Response(400, json={"detail": "bad input"})
+        return httpx.Response(200, json=_echo_output(request))
+
+    client = OpenResponsesClient("http://test", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    requests = [{"model": "m", "input": text} for text in ["a", "bad", "c", "d"]]
+    requests.append({"model": "m", "input": "e", "stream": True})
+    results = list(client.create_many(requests, concurrency=2, ordered=True))
+    assert [result.index for result in results] == [0, 1, 2, 3, 4]
+    assert [result.output.output[0].content for result in results if result.error is None] == ["a", "c", "d"]
+    assert isinstance(results[1].error, httpx.HTTPStatusError) and results[1].request == requests[1]
+    assert isinstance(results[4].error, ValueError)
+
+
+def test_async_create_many_bounds_concurrency():
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001 * (int(json.loads(request.content)["input"]) % 3))
+        in_flight -= 1
+        return httpx.Response(200, json=_echo_output(request))
+
+    async def main(ordered):
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncOpenResponsesClient("http://test", http_client=http_client) as client:
+            requests = ({"model": "m", "input": str(i)} for i in range(40))
+            return [result async for result in client.create_many(requests, concurrency=4, ordered=ordered)]
+
+    unordered = asyncio.run(main(False))
+    assert sorted(result.index for result in unordered) == list(range(40))
+    assert all(result.output.output[0].content == str(result.index) for result in unordered)
+    assert peak == 4
+    ordered = asyncio.run(main(True))
+    assert [result.index for result in ordered] == list(range(40))
+
+
+def test_async_create_many_can_stop_early():
+    async def handler(request):
+        return httpx.Response(200, json=_echo_output(request))
+
+    async def main():
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncOpenResponsesClient("http://test", http_client=http_client) as client:
+            batch = client.create_many(({"model": "m", "input": str(i)} for i in range(1000)), concurrency=4)
+            async for result in batch:
+                break
+            await batch.aclose()
+            return result
+
+    assert asyncio.run(main()).error is None
+
+
+def test_leaving_a_stream_early_closes_the_response():
+    closed = []
+
+    class Body(httpx.SyncByteStream):
+        def __iter__(self):
+            while True:
+                yield b'event: response.text.delta\ndata: {"delta": "x"}\n\n'
+
+        def close(self):
+            closed.append(True)
+
+    def handler(request):
+        return httpx.Response(200, stream=Body(), headers={"Content-Type": "text/event-stream"})
+
+    client = OpenResponsesClient("http://test", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    with client.create(model="m", input="hi", stream=True) as stream:
+        assert next(stream).delta == "x"
+    assert closed == [True]
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import zlib
+
+import httpx
+import pytest
+
+from openresponses.client import AsyncOpenResponsesClient
+from openresponses.codec import (
+    JSON,
+    MSGPACK,
+    StreamCompressor,
+    WireCodec,
+    compress,
+    decode_model,
+    decompress,
+    encode_model,
+    negotiate_encoding,
+)
+from openresponses.models import MessageItem, OpenResponsesOutput, OpenResponsesRequest
+from openresponses.server import Backend, create_app
+
+BODY = b'{"model": "m", "input": "' + b"token " * 1000 + b'"}'
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_compress_round_trips(encoding):
+    if encoding == "zstd":
+        pytest.importorskip("zstandard")
+    packed = compress(BODY, encoding)
+    assert len(packed) < len(BODY) // 10
+    assert decompress(packed, encoding.upper()) == BODY
+    with pytest.raises(ValueError, match="exceeds"):
+        decompress(packed, encoding, max_size=len(BODY) - 1)
+    with pytest.raises(ValueError):
+        decompress(b"not compressed", encoding)
+
+
+def test_gzip_output_is_standard_and_unknown_encodings_fail():
+    assert gzip.decompress(compress(BODY, "gzip")) == BODY
+    assert decompress(BODY, "identity") == BODY
+    with pytest.raises(ValueError, match="Unsupported"):
+        decompress(BODY, "br")
+    with pytest.raises(ValueError, match="Unsupported"):
+        compress(BODY, "br")
+
+
+def test_stream_compressor_output_decodes_after_every_chunk():
+    compressor = StreamCompressor("gzip")
+    decoder = zlib.decompressobj(31)
+    for i in range(5):
+        frame = f"event: response.text.delta\ndata: {i}\n\n".encode()
+        assert decoder.decompress(compressor.compress(frame)) == frame
+    decoder.decompress(compressor.finish())
+    assert decoder.eof
+
+
+def test_negotiate_encoding():
+    offered = ("zstd", "gzip")
+    assert negotiate_encoding("gzip, deflate", offered) == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, zstd", offered) == "zstd"
+    assert negotiate_encoding("zstd;q=0, gzip", offered) == "gzip"
+    assert negotiate_encoding("*", offered) == "zstd"
+    assert negotiate_encoding("br", offered) is None
+    assert negotiate_encoding("", offered) is None
+    assert negotiate_encoding("gzip", ()) is None
+
+
+def test_msgpack_models_round_trip():
+    pytest.importorskip("msgpack")
+    output = OpenResponsesOutput(id="r", created=1, model="m", output=[MessageItem(role="assistant", content="hi")])
+    data = encode_model(output, MSGPACK)
+    assert decode_model(OpenResponsesOutput, data, f"{MSGPACK}; charset=binary") == output
+    assert decode_model(OpenResponsesOutput, encode_model(output), JSON) == output
+    with pytest.raises(ValueError, match="msgpack"):
+        decode_model(OpenResponsesOutput, b"\xc1", MSGPACK)
+
+
+def test_wire_codec_compresses_only_large_bodies():
+    codec = WireCodec("json", compression="gzip", min_size=100)
+    small, encoding = codec.encode(OpenResponsesRequest(model="m", input="hi"))
+    assert encoding is None and small.startswith(b"{")
+    large, encoding = codec.encode(OpenResponsesRequest(model="m", input="x" * 1000))
+    assert encoding == "gzip" and b'"x' in gzip.decompress(large)
+    assert codec.request_headers({"A": "1"}, encoding) == {"A": "1", "Content-Encoding": "gzip"}
+    assert WireCodec("msgpack").headers["Accept"].startswith(MSGPACK)
+    with pytest.raises(ValueError):
+        WireCodec("xml")
+    with pytest.raises(ValueError):
+        WireCodec(compression="br")
+
+
+class Echo(Backend):
+    async def create(self, request, messages):
+        return OpenResponsesOutput(
+            id="r", created=0, model="m", output=[MessageItem(role="assistant", content=messages[-1]["content"])]
+        )
+
+    async def stream(self, request, messages):
+        yield ("response.text.delta", messages[-1]["content"])
+        yield ("response.done", {})
+
+
+def test_server_accepts_compressed_msgpack_and_compresses_responses():
+    pytest.importorskip("msgpack")
+    app = create_app(Echo(), compression=("gzip",))
+    text = "token " * 1000
+
+    async def main():
+        transport = httpx.ASGITransport(app)
+        options = {"wire_format": "msgpack", "compression": "gzip"}
+        async with AsyncOpenResponsesClient("http://test", http_client=httpx.AsyncClient(transport=transport), **options) as client:
+            output = await client.create(model="m", input=text)
+            events = [event async for event in await client.create(model="m", input=text, stream=True)]
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            raw = await http.post(
+                "/v1/responses",
+                content=compress(BODY, "gzip"),
+                headers={"Content-Encoding": "gzip", "Accept": MSGPACK, "Accept-Encoding": "gzip"},
+            )
+        return output, events, raw
+
+    output, events, raw = asyncio.run(main())
+    assert output.output[0].content == text
+    assert events[0].delta == text
+    assert raw.headers["content-type"] == MSGPACK and raw.headers["content-encoding"] == "gzip"
+    assert decode_model(OpenResponsesOutput, raw.content, MSGPACK).output[0].content.startswith("token")
+
+
+def test_server_rejects_unsupported_and_corrupt_bodies():
+    app = create_app(Echo())
+
+    async def post(content, encoding):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            return await http.post("/v1/responses", content=content, headers={"Content-Encoding": encoding})
+
+    assert asyncio.run(post(BODY, "br")).status_code == 415
+    assert asyncio.run(post(b"not gzip", "gzip")).status_code == 400
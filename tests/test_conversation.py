@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+
+from openresponses.conversation import ConversationStore, SummarizeOldest, TruncateOldest
+from openresponses.models import MessageItem, OpenResponsesOutput
+from openresponses.server import Backend, create_app
+from openresponses.sse import SSEDecoder
+
+
+def _message(role, text, **extra):
+    return {"role": role, "content": text, **extra}
+
+
+def _tool_call_message(call_id):
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "lookup", "arguments": "{}"}}],
+    }
+
+
+def test_history_under_budget_is_unchanged():
+    store = ConversationStore(policy=TruncateOldest(max_tokens=1000))
+    conversation = store.extend(None, [_message("user", "hi"), _message("assistant", "hello")])
+    assert [m["content"] for m in conversation.messages()] == ["hi", "hello"]
+
+
+def test_truncate_oldest_keeps_system_and_recent_messages():
+    store = ConversationStore(policy=TruncateOldest(max_tokens=60, target=40), chars_per_token=1.0)
+    messages = [_message("system", "rules")] + [_message("user", f"{i:02d}" * 5) for i in range(10)]
+    conversation = store.extend(None, messages)
+    kept = conversation.messages()
+    assert kept[0]["role"] == "system"
+    assert kept[-1] == messages[-1]
+    assert conversation.total <= 40
+    # Kept messages are the most recent ones, contiguously.
+    assert kept[1:] == messages[len(messages) - len(kept) + 1:]
+
+
+def test_truncation_never_splits_tool_calls_from_their_results():
+    # Regression: the cut fell between an assistant tool-call message and its
+    # results, leaving ['tool', 'assistant', 'user'], which upstreams reject.
+    store = ConversationStore(policy=TruncateOldest(max_tokens=60, target=45), chars_per_token=1.0)
+    messages = [
+        _message("user", "x" * 30),
+        _tool_call_message("call_1"),
+        {"role": "tool", "tool_call_id": "call_1", "content": "y" * 10},
+        _message("assistant", "z" * 10),
+        _message("user", "next"),
+    ]
+    kept = store.extend(None, messages).messages()
+    roles = [m["role"] for m in kept]
+    assert roles[0] != "tool"
+    for i, message in enumerate(kept):
+        if message["role"] == "tool":
+            assert kept[i - 1]["role"] in ("assistant", "tool")
+            assert any(m.get("tool_calls") for m in kept[:i])
+
+
+def test_pinned_tool_result_keeps_its_tool_call():
+    policy = TruncateOldest(max_tokens=40, target=30, keep_last=1)
+    store = ConversationStore(policy=policy, chars_per_token=1.0)
+    messages = [
+        _message("user", "x" * 40),
+        _tool_call_message("call_1"),
+        {"role": "tool", "tool_call_id": "call_1", "content": "result"},
+    ]
+    kept = store.extend(None, messages).messages()
+    assert [m["role"] for m in kept] == ["assistant", "tool"]
+
+
+def test_summarize_oldest_replaces_dropped_messages_once():
+    policy = SummarizeOldest(40, lambda dropped: f"{len(dropped)} earlier", target=30, chars_per_token=1.0)
+    store = ConversationStore(policy=policy, chars_per_token=1.0)
+    conversation = None
+    for i in range(6):
+        conversation = store.extend(conversation, [_message("user", f"turn {i} " + "x" * 8)])
+    summaries = [m for m in conversation.messages() if m["role"] == "system"]
+    assert len(summaries) == 1
+    assert summaries[0]["content"].endswith("earlier")
+
+
+def test_store_returns_saved_history_and_evicts_oldest():
+    store = ConversationStore(max_entries=2)
+    base = store.extend(None, [_message("user", "hi")])
+    for response_id in ("a", "b", "c"):
+        store.save(response_id, base, [])
+    assert store.get("a") is None
+    assert [m["content"] for m in store.get("c").messages()] == ["hi"]
+
+
+class _Recorder(Backend):
+    """Replies "reply N" and records the messages each call was sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def create(self, request, messages):
+        self.sent.append(messages)
+        return OpenResponsesOutput(
+            id=f"resp_{len(self.sent)}",
+            created=0,
+            model=request.model,
+            output=[MessageItem(role="assistant", content=f"reply {len(self.sent)}")],
+        )
+
+    async def stream(self, request, messages):
+        self.sent.append(messages)
+        yield ("response.text.delta", f"reply {len(self.sent)}")
+        yield ("response.done", {})
+
+
+def _post(app, body):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            return await http.post("/v1/responses", json=body)
+
+    return asyncio.run(main())
+
+
+def test_server_continues_conversations_from_previous_response_id():
+    backend = _Recorder()
+    app = create_app(backend, conversations=ConversationStore())
+    first = _post(app, {"model": "m", "input": "hi"}).json()
+    streamed = _post(app, {"model": "m", "input": "and then?", "previous_response_id": first["id"], "stream": True})
+    done = [event for event in SSEDecoder().feed(streamed.content) if event.event == "response.done"]
+    _post(app, {"model": "m", "input": "thanks", "previous_response_id": done[0].json()["id"]})
+    assert [(m["role"], m["content"]) for m in backend.sent[-1]] == [
+        ("user", "hi"),
+        ("assistant", "reply 1"),
+        ("user", "and then?"),
+        ("assistant", "reply 2"),
+        ("user", "thanks"),
+    ]
+    # Continuing from an earlier response branches off it.
+    _post(app, {"model": "m", "input": "other", "previous_response_id": first["id"]})
+    assert [m["content"] for m in backend.sent[-1]] == ["hi", "reply 1", "other"]
+
+
+def test_server_rejects_unknown_previous_response_ids():
+    body = {"model": "m", "input": "hi", "previous_response_id": "resp_missing"}
+    assert _post(create_app(_Recorder(), conversations=ConversationStore()), body).status_code == 404
+    assert _post(create_app(_Recorder()), body).status_code == 400
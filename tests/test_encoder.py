@@ -0,0 +1,148 @@
+import asyncio
+import json
+
+from openresponses.provider import SSEStreamEncoder
+from openresponses.sse import SSEDecoder
+
+
+def _events(data):
+    decoder = SSEDecoder()
+    return [(event.event, json.loads(event.data)) for event in decoder.feed(data)]
+
+
+def test_consecutive_deltas_are_merged_per_kind():
+    encoder = SSEStreamEncoder()
+    for event in [
+        ("response.reasoning.delta", "a"),
+        ("response.reasoning.delta", "b"),
+        ("response.text.delta", "c"),
+        ("response.text.delta", "d"),
+        ("response.tool_call.delta", {"id": "call_1", "name": "f", "arguments": "{}"}),
+        ("response.text.delta", "e"),
+        ("response.done", {}),
+    ]:
+        encoder.add(*event)
+    assert encoder.pending > 0
+    assert _events(encoder.flush()) == [
+        ("response.reasoning.delta", {"delta": "ab"}),
+        ("response.text.delta", {"delta": "cd"}),
+        ("response.tool_call.delta", {"id": "call_1", "name": "f", "arguments": "{}"}),
+        ("response.text.delta", {"delta": "e"}),
+        ("response.done", {}),
+    ]
+    assert encoder.pending == 0 and encoder.flush() == b""
+
+
+def test_frames_escape_json():
+    encoder = SSEStreamEncoder()
+    encoder.add("response.text.delta", 'line\n"quoted" é')
+    assert _events(encoder.flush()) == [("response.text.delta", {"delta": 'line\n"quoted" é'})]
+
+
+async def _collect(encoder, source):
+    return [frame async for frame in encoder.stream(source)]
+
+
+def test_stream_batches_fast_deltas_and_flushes_on_done():
+    async def source():
+        for i in range(50):
+            yield ("response.text.delta", str(i % 10))
+        yield ("response.done", {})
+
+    frames = asyncio.run(_collect(SSEStreamEncoder(flush_interval=1.0), source()))
+    events = _events(b"".join(frames))
+    assert events == [("response.text.delta", {"delta": "0123456789" * 5}), ("response.done", {})]
+    assert len(frames) == 1
+
+
+def test_stream_flushes_on_size():
+    async def source():
+        for _ in range(10):
+            yield ("response.text.delta", "x" * 100)
+        yield ("response.done", {})
+
+    frames = asyncio.run(_collect(SSEStreamEncoder(flush_interval=10.0, max_bytes=250), source()))
+    assert len(frames) > 3
+    deltas = "".join(payload.get("delta", "") for _, payload in _events(b"".join(frames)))
+    assert deltas == "x" * 1000
+
+
+def test_stream_flushes_on_time_while_upstream_is_stalled():
+    async def main():
+        gate = asyncio.Event()
+
+        async def source():
+            yield ("response.text.delta", "early")
+            await gate.wait()
+            yield ("response.done", {})
+
+        stream = SSEStreamEncoder(flush_interval=0.01).stream(source())
+        first = await asyncio.wait_for(stream.__anext__(), 1)
+        gate.set()
+        rest = [frame async for frame in stream]
+        return first, rest
+
+    first, rest = asyncio.run(main())
+    assert _events(first) == [("response.text.delta", {"delta": "early"})]
+    assert _events(b"".join(rest)) == [("response.done", {})]
+
+
+def test_source_errors_propagate_after_buffered_frames():
+    async def source():
+        yield ("response.text.delta", "partial")
+        raise RuntimeError("upstream failed")
+
+    async def main():
+        frames = []
+        try:
+            async for frame in SSEStreamEncoder(flush_interval=10.0).stream(source()):
+                frames.append(frame)
+        except RuntimeError as e:
+            return frames, e
+
+    frames, error = asyncio.run(main())
+    assert str(error) == "upstream failed"
+    assert _events(b"".join(frames)) == [("response.text.delta", {"delta": "partial"})]
+
+
+def test_closing_the_stream_closes_the_source():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                yield ("response.text.delta", "x")
+                await asyncio.sleep(0.001)
+        finally:
+            closed.set()
+
+    async def main():
+        stream = SSEStreamEncoder(flush_interval=0.005).stream(source())
+        await stream.__anext__()
+        await stream.aclose()
+        return closed.is_set()
+
+    assert asyncio.run(main())
+
+
+def test_stalled_client_closes_the_source():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                yield ("response.done", {})
+        finally:
+            closed.set()
+
+    async def main():
+        stream = SSEStreamEncoder(queue_size=4, stall_timeout=0.05).stream(source())
+        frames = [await stream.__anext__()]
+        # Stop reading until the read-ahead buffer has been full for longer than the timeout.
+        await asyncio.wait_for(closed.wait(), 5)
+        frames.extend([frame async for frame in stream])
+        return frames
+
+    events = _events(b"".join(asyncio.run(main())))
+    assert events[-1] == ("error", {"error": "Client is not reading the stream"})
+    assert all(event == ("response.done", {}) for event in events[:-1])
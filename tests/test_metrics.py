@@ -0,0 +1,156 @@
+import asyncio
+import re
+import sqlite3
+import threading
+
+import httpx
+
+from openresponses.client import OpenResponsesClient
+from openresponses.metrics import BUCKETS, Histogram, MetricsCollector, Observer, SQLiteMetrics
+from openresponses.server import Backend, create_app
+
+
+def _requests_total(metrics):
+    text = metrics.render_prometheus()
+    return sum(int(value) for value in re.findall(r"^openresponses_requests_total\{.*\} (\d+)$", text, re.M))
+
+
+def _record(metrics, count, model="m"):
+    for _ in range(count):
+        metrics.start("client", model, False).finish()
+
+
+def test_histogram_percentiles_stay_within_a_bucket():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) is None
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)
+    for q in (0.5, 0.95, 0.99):
+        assert abs(histogram.percentile(q) - q) <= q * 0.2
+    assert histogram.count == 1000 and abs(histogram.sum - 500.5) < 1e-6
+    histogram.observe(10_000)
+    assert histogram.percentile(1.0) == BUCKETS[-1]
+
+
+def test_request_metrics_record_first_deltas_and_gaps():
+    finished = []
+
+    class Recorder(Observer):
+        def on_request(self, metrics):
+            finished.append(metrics)
+
+    metrics = Recorder().start("client", "m", True)
+    metrics.first_byte()
+    metrics.event("response.reasoning.delta", 10)
+    metrics.event("response.text.delta", 5)
+    metrics.event("response.text.delta", 5)
+    metrics.event("response.done", 2)
+    metrics.finish()
+    metrics.finish(RuntimeError("ignored: already finished"))
+    assert finished == [metrics]
+    assert metrics.ttfb <= metrics.first_reasoning <= metrics.first_text <= metrics.duration
+    assert (len(metrics.gaps), metrics.events, metrics.bytes, metrics.outcome) == (2, 4, 22, "ok")
+    Recorder().start("client", "m", True).finish(asyncio.CancelledError())
+    assert finished[-1].outcome == "cancelled"
+
+
+def test_collector_renders_prometheus_text():
+    collector = MetricsCollector()
+    ok = collector.start("provider", 'a"b', True)
+    ok.event("response.text.delta", 3)
+    ok.event("response.text.delta", 3)
+    ok.finish()
+    collector.start("provider", 'a"b', False).finish(ValueError())
+    text = collector.render_prometheus()
+    assert '# TYPE openresponses_duration_seconds histogram' in text
+    assert 'openresponses_duration_seconds_count{side="provider",model="a\\"b"} 2' in text
+    assert 'openresponses_inter_token_seconds_count{side="provider",model="a\\"b"} 1' in text
+    assert 'openresponses_requests_total{side="provider",model="a\\"b",outcome="error"} 1' in text
+    assert 'openresponses_events_total{side="provider",model="a\\"b"} 2' in text
+    assert "openresponses_ttfb_seconds" not in text
+    assert collector.summary()["first_text"]["p50"] is not None
+    assert collector.percentiles("duration", side="client") == {"p50": None, "p95": None, "p99": None}
+
+
+def test_client_and_provider_report_to_observers():
+    stream = b'event: response.text.delta\ndata: {"delta": "hi"}\n\nevent: response.done\ndata: {}\n\n'
+
+    def handler(request):
+        return httpx.Response(200, content=stream, headers={"Content-Type": "text/event-stream"})
+
+    collector = MetricsCollector()
+    client = OpenResponsesClient("http://test", http_client=httpx.Client(transport=httpx.MockTransport(handler)), observer=collector)
+    assert len(list(client.create(model="m", input="hi", stream=True))) == 2
+    assert 'openresponses_requests_total{side="client",model="m",outcome="ok"} 1' in collector.render_prometheus()
+    assert collector.percentiles("ttfb", side="client")["p50"] is not None
+
+    class Hello(Backend):
+        async def create(self, request, messages):
+            raise NotImplementedError
+
+        async def stream(self, request, messages):
+            yield ("response.text.delta", "hi")
+            yield ("response.done", {})
+
+    provider = MetricsCollector()
+    app = create_app(Hello(), metrics=provider)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            await http.post("/v1/responses", json={"model": "m", "input": "hi", "stream": True})
+            return await http.get("/metrics")
+
+    scrape = asyncio.run(main())
+    assert scrape.headers["content-type"].startswith("text/plain")
+    assert 'openresponses_requests_total{side="provider",model="m",outcome="ok"} 1' in scrape.text
+    assert 'openresponses_events_total{side="provider",model="m"} 2' in scrape.text
+
+
+def test_sqlite_metrics_report_every_process_sharing_the_database(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    first, second = SQLiteMetrics(path, flush_interval=60), SQLiteMetrics(path, flush_interval=60)
+    _record(first, 3)
+    _record(second, 2, model="other")
+    # Unflushed requests count for the process that made them.
+    assert _requests_total(first) == 3
+    first.flush()
+    second.flush()
+    assert _requests_total(first) == _requests_total(second) == 5
+    assert second.percentiles("duration", model="m")["p50"] is not None
+    first.close()
+    second.close()
+
+
+def test_sqlite_metrics_keep_a_single_row(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    for _ in range(5):
+        metrics = SQLiteMetrics(path)
+        _record(metrics, 2)
+        metrics.close()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM totals").fetchone() == (1,)
+    reader = SQLiteMetrics(path)
+    assert _requests_total(reader) == 10
+    reader.close()
+
+
+def test_sqlite_metrics_counters_never_go_backwards_during_flushes(tmp_path):
+    metrics = SQLiteMetrics(str(tmp_path / "metrics.db"), flush_interval=60)
+    stop = threading.Event()
+
+    def flush_constantly():
+        while not stop.is_set():
+            metrics.flush()
+
+    flusher = threading.Thread(target=flush_constantly)
+    flusher.start()
+    try:
+        seen = 0
+        for i in range(300):
+            _record(metrics, 1)
+            total = _requests_total(metrics)
+            assert total == i + 1 and total >= seen
+            seen = total
+    finally:
+        stop.set()
+        flusher.join()
+    metrics.close()
@@ -0,0 +1,12 @@
+from openresponses.models import MessageItem, OpenResponsesRequest, ReasoningItem, ResponseItemListAdapter
+
+
+def test_input_items_without_type_are_messages():
+    request = OpenResponsesRequest(
+        model="m",
+        input=[{"role": "user", "content": "hi"}, {"type": "reasoning", "content": "hm"}],
+    )
+    assert isinstance(request.input[0], MessageItem)
+    assert isinstance(request.input[1], ReasoningItem)
+    items = ResponseItemListAdapter.validate_python([{"role": "assistant", "content": "hello"}])
+    assert isinstance(items[0], MessageItem)
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+import openresponses
+
+
+def _fresh(code):
+    # A new interpreter, so modules imported by other tests do not count.
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_import_loads_no_dependencies():
+    loaded = _fresh(
+        "import sys, openresponses\n"
+        "print(*sorted(m for m in sys.modules if m.split('.')[0] in {'openresponses', 'pydantic', 'httpx', 'fastapi'}))"
+    )
+    assert loaded == ["openresponses"]
+
+
+def test_names_resolve_on_first_access():
+    loaded = _fresh(
+        "import sys, openresponses\n"
+        "openresponses.OpenResponsesOutput\n"
+        "print(*sorted(m for m in sys.modules if m.startswith(('openresponses', 'fastapi'))))"
+    )
+    assert "openresponses.models" in loaded
+    assert "openresponses.client" not in loaded and "fastapi" not in loaded
+
+
+def test_exports_and_submodules():
+    from openresponses.models import OpenResponsesOutput
+
+    assert openresponses.OpenResponsesOutput is OpenResponsesOutput
+    assert "OpenResponsesOutput" in vars(openresponses)
+    assert openresponses.cache.MemoryCache.__module__ == "openresponses.cache"
+    assert set(openresponses.__all__) <= set(dir(openresponses))
+    with pytest.raises(AttributeError):
+        openresponses.missing
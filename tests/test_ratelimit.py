@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+from openresponses.models import OpenResponsesRequest
+from openresponses.ratelimit import AdaptiveConcurrencyLimiter, RateLimiter, TokenBucket, estimate_tokens
+
+
+def test_token_bucket_starts_full_and_refills():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    time.sleep(0.02)
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_paces_waiters():
+    async def main():
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        # One token up front, then five more at 100/s.
+        assert time.monotonic() - start >= 0.045
+
+    asyncio.run(main())
+
+
+def test_oversized_request_is_admitted_in_debt():
+    async def main():
+        bucket = TokenBucket(rate=1000, capacity=10)
+        await asyncio.wait_for(bucket.acquire(50), 1)
+        assert not bucket.try_acquire()
+
+    asyncio.run(main())
+
+
+def test_rate_limiter_charges_estimated_tokens():
+    request = OpenResponsesRequest(model="m", input="x" * 400)
+    assert estimate_tokens(request) == 100
+    assert RateLimiter(requests_per_second=10).cost(request) == 0
+    limiter = RateLimiter(tokens_per_second=1000)
+    assert limiter.cost(request) == 100
+
+    async def main():
+        await limiter.acquire(limiter.cost(request))
+        assert limiter.tokens.try_acquire(900)
+        assert not limiter.tokens.try_acquire(100)
+
+    asyncio.run(main())
+
+
+def test_concurrency_limiter_queues_beyond_the_limit():
+    async def main():
+        limiter = AdaptiveConcurrencyLimiter(initial=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done() and limiter.in_flight == 2
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(main())
+
+
+def test_concurrency_limiter_grows_on_success_and_halves_on_throttling():
+    limiter = AdaptiveConcurrencyLimiter(initial=10, max_limit=20)
+    for _ in range(10):
+        limiter.in_flight += 1
+        limiter.release(latency=0.1)
+    grown = limiter.limit
+    assert 10.9 < grown < 11
+    limiter.in_flight += 1
+    limiter.release(throttled=True)
+    assert limiter.limit == pytest.approx(grown / 2)
+    # A burst of throttling within one average latency counts once.
+    limit = limiter.limit
+    limiter.in_flight += 1
+    limiter.release(throttled=True)
+    assert limiter.limit == limit
+
+
+def test_concurrency_limiter_backs_off_on_latency_spike():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, latency_tolerance=2.0)
+    for _ in range(20):
+        limiter.in_flight += 1
+        limiter.release(latency=0.001)
+    limit = limiter.limit
+    limiter.in_flight += 1
+    limiter.release(latency=1.0)
+    assert limiter.limit == pytest.approx(limit / 2)
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def main():
+        limiter = AdaptiveConcurrencyLimiter(initial=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    asyncio.run(main())
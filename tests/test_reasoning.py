@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from openresponses.provider import OpenResponsesProvider, ReasoningSplitter
+
+REASONING = "response.reasoning.delta"
+TEXT = "response.text.delta"
+
+
+def _split(chunks, **options):
+    splitter = ReasoningSplitter(**options)
+    deltas = []
+    for chunk in chunks:
+        deltas.extend(splitter.feed(chunk))
+    deltas.extend(splitter.finish())
+    reasoning = "".join(text for event_type, text in deltas if event_type == REASONING)
+    text = "".join(text for event_type, text in deltas if event_type == TEXT)
+    return reasoning, text
+
+
+def test_splits_tagged_reasoning_from_text():
+    assert _split(["<think>Let me see.</think>The answer is 4."]) == ("Let me see.", "The answer is 4.")
+
+
+def test_content_without_tags_is_text():
+    assert _split(["Hello", " world"]) == ("", "Hello world")
+
+
+def test_tags_split_across_chunks():
+    splitter = ReasoningSplitter()
+    assert splitter.feed("a<th") == [(TEXT, "a")]
+    assert splitter.feed("ink>r1</thi") == [(REASONING, "r1")]
+    assert splitter.feed("nk>b") == [(TEXT, "b")]
+    assert splitter.finish() == []
+
+
+def test_any_chunking_gives_the_same_split():
+    content = "intro <think>step one < step two </thin </think>done <b>bold</b>"
+    expected = _split([content])
+    assert expected == ("step one < step two </thin ", "intro done <b>bold</b>")
+    rng = random.Random(0)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(content)), rng.randint(1, 15)))
+        assert _split([content[a:b] for a, b in zip([0, *cuts], [*cuts, len(content)])]) == expected
+
+
+def test_partial_tag_at_end_of_stream_is_flushed_as_content():
+    splitter = ReasoningSplitter()
+    assert splitter.feed("a<th") == [(TEXT, "a")]
+    assert splitter.finish() == [(TEXT, "<th")]
+
+
+def test_reasoning_first_and_custom_tags():
+    assert _split(["plan</think>answer"], reasoning_first=True) == ("plan", "answer")
+    assert _split(["[r]x[/r]y"], open_tag="[r]", close_tag="[/r]") == ("x", "y")
+
+
+def test_empty_tags_are_rejected():
+    with pytest.raises(ValueError):
+        ReasoningSplitter(open_tag="")
+
+
+def test_sse_frames():
+    splitter = ReasoningSplitter()
+    assert splitter.sse("<think>hm") == 'event: response.reasoning.delta\ndata: {"delta": "hm"}\n\n'
+    assert ReasoningSplitter().sse_finish() == ""
+
+
+def test_split_reasoning():
+    assert OpenResponsesProvider.split_reasoning("<think>r</think>t") == ("r", "t")
+    assert OpenResponsesProvider.split_reasoning("plain") == ("", "plain")
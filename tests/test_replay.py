@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from openresponses.client import AsyncOpenResponsesClient
+from openresponses.codec import compress
+from openresponses.models import MessageItem, OpenResponsesOutput
+from openresponses.replay import Recording, ReplayServer, append_session, record
+from openresponses.server import Backend, create_app
+
+
+class Echo(Backend):
+    async def create(self, request, messages):
+        raise NotImplementedError
+
+    async def stream(self, request, messages):
+        yield ("response.reasoning.delta", "thinking")
+        yield ("response.text.delta", messages[-1]["content"])
+        yield ("response.done", {})
+
+
+def _frame(text):
+    return f'event: response.text.delta\ndata: {{"delta": "{text}"}}\n\n'.encode()
+
+
+DONE = b'event: response.done\ndata: {"id": "resp_1", "created": 1, "model": "m"}\n\n'
+
+
+def _recording(tmp_path, *texts, delay=0.0):
+    path = str(tmp_path / "session.orr")
+    for text in texts:
+        append_session(path, {"model": "m", "input": text, "stream": True}, [(delay, _frame(text)), (0.0, DONE)])
+    return path
+
+
+def test_record_captures_a_provider_stream(tmp_path):
+    path = str(tmp_path / "recorded.orr")
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(create_app(Echo(), flush_interval=0.001)))
+    count = asyncio.run(record("http://test", {"model": "m", "input": "hello"}, path, http_client=http_client))
+    with Recording(path) as recording:
+        (session,) = recording.sessions
+        assert len(session) == count
+        assert session.request_json() == {"model": "m", "input": "hello", "stream": True}
+        assert b"".join(session.frames()).count(b"\n\n") == count
+        output = OpenResponsesOutput.model_validate_json(session.output_json())
+    assert output.model == "m" and output.output[-1] == MessageItem(role="assistant", content="hello")
+
+
+def test_cut_off_sessions_are_skipped(tmp_path):
+    path = _recording(tmp_path, "a", "b")
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "ab") as f:
+        f.write(data[len(b"ORREC1\n"):-20])
+    with Recording(path) as recording:
+        assert [session.request_json()["input"] for session in recording.sessions] == ["a", "b", "a"]
+    (tmp_path / "other").write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        Recording(str(tmp_path / "other"))
+
+
+async def _serving(server, run):
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        async with AsyncOpenResponsesClient(f"http://127.0.0.1:{port}", retry=None) as client:
+            return await run(client, f"http://127.0.0.1:{port}")
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_replay_cycles_through_sessions(tmp_path):
+    async def run(client, url):
+        streamed = []
+        for _ in range(3):
+            events = [event async for event in await client.create(model="x", input="?", stream=True)]
+            streamed.append(events[0].delta)
+        output = await client.create(model="x", input="?")
+        return streamed, output
+
+    with Recording(_recording(tmp_path, "a", "b")) as recording:
+        streamed, output = asyncio.run(_serving(ReplayServer(recording, speed=0), run))
+    assert streamed == ["a", "b", "a"]
+    assert output.output == [MessageItem(role="assistant", content="b")] and output.id == "resp_1"
+
+
+def test_replay_matches_requests(tmp_path):
+    async def run(client, url):
+        async with httpx.AsyncClient(base_url=url) as http:
+            matched = await http.post("/v1/responses", json={"model": "m", "input": "b"})
+            selected = await http.post("/v1/responses", json={"model": "m", "input": "zzz"}, headers={"X-Replay-Session": "0"})
+            missing = await http.post("/v1/responses", json={"model": "m", "input": "zzz"})
+            compressed = await http.post(
+                "/v1/responses",
+                content=compress(b'{"model": "m", "input": "a"}', "gzip"),
+                headers={"Content-Encoding": "gzip"},
+            )
+        return matched, selected, missing, compressed
+
+    with Recording(_recording(tmp_path, "a", "b")) as recording:
+        matched, selected, missing, compressed = asyncio.run(_serving(ReplayServer(recording, speed=0, match="request"), run))
+    assert matched.json()["output"][0]["content"] == "b"
+    assert selected.json()["output"][0]["content"] == "a"
+    assert missing.status_code == 404
+    assert compressed.json()["output"][0]["content"] == "a"
+
+
+def test_replay_rejects_bad_requests(tmp_path):
+    async def run(client, url):
+        async with httpx.AsyncClient(base_url=url) as http:
+            unsupported = await http.post("/v1/responses", content=b"{}", headers={"Content-Encoding": "br"})
+            invalid = await http.post("/v1/responses", json={"input": "no model"})
+            corrupt = await http.post("/v1/responses", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+            wrong_path = await http.post("/v1/other", json={})
+        reader, writer = await asyncio.open_connection(*url[len("http://"):].split(":"))
+        writer.write(b"POST /v1/responses HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+        malformed = await reader.read()
+        writer.close()
+        return unsupported, invalid, corrupt, wrong_path, malformed
+
+    with Recording(_recording(tmp_path, "a")) as recording:
+        unsupported, invalid, corrupt, wrong_path, malformed = asyncio.run(_serving(ReplayServer(recording), run))
+    assert (unsupported.status_code, invalid.status_code, corrupt.status_code, wrong_path.status_code) == (415, 422, 400, 404)
+    assert malformed.startswith(b"HTTP/1.1 400")
+
+
+def test_replay_keeps_the_recorded_pace(tmp_path):
+    async def run(client, url):
+        timings = []
+        async with httpx.AsyncClient(base_url=url) as http:
+            for speed in ("1", "0"):
+                start = time.perf_counter()
+                await http.post("/v1/responses", json={"model": "m", "input": "a", "stream": True}, headers={"X-Replay-Speed": speed})
+                timings.append(time.perf_counter() - start)
+        return timings
+
+    with Recording(_recording(tmp_path, "a", delay=0.5)) as recording:
+        paced, fast = asyncio.run(_serving(ReplayServer(recording), run))
+    assert paced >= 0.5 and fast < 0.5
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+
+from openresponses.client import AsyncOpenResponsesClient, OpenResponsesClient
+from openresponses.retry import HedgePolicy, RetryPolicy
+
+OUTPUT = {
+    "id": "resp_1",
+    "created": 0,
+    "model": "m",
+    "output": [{"type": "message", "role": "assistant", "content": "hi"}],
+}
+
+
+def test_only_safe_failures_are_retried_by_default():
+    policy = RetryPolicy(backoff=1.0, max_backoff=1.5)
+    assert 0.0 <= policy.next_delay(1, response=httpx.Response(503)) <= 1.0
+    assert 0.0 <= policy.next_delay(2, error=httpx.ConnectError("refused")) <= 1.5
+    assert policy.next_delay(1, response=httpx.Response(500)) is None
+    assert policy.next_delay(1, response=httpx.Response(400)) is None
+    assert policy.next_delay(1, error=httpx.ReadTimeout("slow")) is None
+    assert policy.next_delay(3, response=httpx.Response(503)) is None
+    idempotent = RetryPolicy(idempotent=True)
+    assert idempotent.next_delay(1, response=httpx.Response(500)) is not None
+    assert idempotent.next_delay(1, error=httpx.ReadTimeout("slow")) is not None
+
+
+def test_retry_after_is_honoured_and_capped():
+    policy = RetryPolicy(max_retry_after=10.0)
+    assert policy.next_delay(1, response=httpx.Response(429, headers={"Retry-After": "3"})) == 3.0
+    assert policy.next_delay(1, response=httpx.Response(429, headers={"Retry-After": "60"})) is None
+
+
+def test_sync_client_retries_with_one_idempotency_key():
+    keys, statuses = [], [503, 429, 200]
+
+    def handler(request):
+        keys.append(request.headers["Idempotency-Key"])
+        status = statuses[len(keys) - 1]
+        return httpx.Response(status, json=OUTPUT if status == 200 else {})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = OpenResponsesClient("http://test", http_client=http_client, retry=RetryPolicy(backoff=0.001))
+    assert client.create(model="m", input="hi").id == "resp_1"
+    assert len(keys) == 3 and len(set(keys)) == 1
+
+
+def test_sync_client_does_not_repeat_unsafe_failures():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, json={"detail": "boom"})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = OpenResponsesClient("http://test", http_client=http_client, retry=RetryPolicy(backoff=0.001))
+    with pytest.raises(httpx.HTTPStatusError):
+        client.create(model="m", input="hi")
+    assert len(calls) == 1
+
+
+def test_hedge_delay_follows_observed_latencies():
+    policy = HedgePolicy(percentile=0.9, initial_delay=2.0, min_delay=0.05, min_samples=10)
+    assert policy.delay == 2.0
+    for i in range(16):
+        policy.observe(i / 10)
+    assert policy.delay == 1.4
+    fast = HedgePolicy(min_samples=1)
+    fast.observe(0.001)
+    assert fast.delay == fast.min_delay
+
+
+def test_hedge_runs_a_second_attempt_when_the_first_is_slow():
+    async def main():
+        policy = HedgePolicy(initial_delay=0.01)
+        calls = 0
+        cancelled = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return calls
+
+        result = await asyncio.wait_for(policy.run(fn), 5)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return result, policy
+
+    result, policy = asyncio.run(main())
+    assert result == 2
+    assert (policy.hedges, policy.hedge_wins) == (1, 1)
+
+
+def test_hedge_raises_the_first_error_when_every_attempt_fails():
+    async def main():
+        failures = iter([ValueError("first"), ValueError("second")])
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            raise next(failures)
+
+        await HedgePolicy(initial_delay=0.01).run(fn)
+
+    with pytest.raises(ValueError, match="first"):
+        asyncio.run(main())
+
+
+def test_async_client_hedges_slow_requests():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json=OUTPUT)
+
+    async def main():
+        hedge = HedgePolicy(initial_delay=0.01)
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncOpenResponsesClient("http://test", http_client=http_client, hedge=hedge) as client:
+            output = await asyncio.wait_for(client.create(model="m", input="hi"), 5)
+        return output, hedge
+
+    output, hedge = asyncio.run(main())
+    assert output.id == "resp_1"
+    assert calls == 2 and hedge.hedge_wins == 1
@@ -0,0 +1,83 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+import httpx
+
+from openresponses.cache import MemoryCache, SQLiteCache
+from openresponses.metrics import MetricsCollector, SQLiteMetrics
+from openresponses.serve import STATE_DIR_ENV, worker_cache, worker_metrics
+
+APP = textwrap.dedent("""
+    import os
+
+    from openresponses.models import MessageItem, OpenResponsesOutput
+    from openresponses.serve import worker_cache, worker_metrics
+    from openresponses.server import Backend, create_app
+
+
+    class Pid(Backend):
+        async def create(self, request, messages):
+            output = [MessageItem(role="assistant", content=str(os.getpid()))]
+            return OpenResponsesOutput(id="r", created=0, model=request.model, output=output)
+
+        async def stream(self, request, messages):
+            yield ("response.done", {})
+
+
+    app = create_app(Pid(), cache=worker_cache(), metrics=worker_metrics(flush_interval=0.05))
+""")
+
+
+def test_worker_stores_are_shared_only_under_the_runner(tmp_path, monkeypatch):
+    monkeypatch.delenv(STATE_DIR_ENV, raising=False)
+    assert type(worker_cache()) is MemoryCache
+    assert type(worker_metrics()) is MetricsCollector
+    monkeypatch.setenv(STATE_DIR_ENV, str(tmp_path))
+    cache, metrics = worker_cache(), worker_metrics()
+    assert isinstance(cache, SQLiteCache) and cache.path == str(tmp_path / "cache.db")
+    assert isinstance(metrics, SQLiteMetrics)
+    cache.close()
+    metrics.close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_runner_workers_share_cache_and_metrics(tmp_path):
+    (tmp_path / "pid_app.py").write_text(APP)
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), *sys.path])}
+    runner = subprocess.Popen(
+        [sys.executable, "-m", "openresponses.serve", "pid_app:app", "--workers", "2", "--port", str(port),
+         "--state-dir", str(tmp_path / "state"), "--log-level", "warning", "--graceful-timeout", "2"],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as http:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    first = http.post("/v1/responses", json={"model": "m", "input": "hi"})
+                    break
+                except httpx.TransportError:
+                    assert time.monotonic() < deadline, "runner did not start"
+                    time.sleep(0.1)
+            assert first.headers["X-Cache"] == "MISS"
+            # Whichever worker takes them, repeats are answered from the shared cache.
+            repeats = [http.post("/v1/responses", json={"model": "m", "input": "hi"}, headers={"Connection": "close"}) for _ in range(8)]
+            assert all(r.headers["X-Cache"] == "HIT" and r.json() == first.json() for r in repeats)
+            assert http.get("/v1/cache/stats").json()["hits"] == 8
+            time.sleep(0.2)
+            text = http.get("/metrics").text
+            assert 'openresponses_requests_total{side="provider",model="m",outcome="ok"} 9' in text
+    finally:
+        runner.send_signal(signal.SIGTERM)
+        assert runner.wait(30) == 0
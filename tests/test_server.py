@@ -0,0 +1,256 @@
+import asyncio
+import json
+
+import httpx
+
+from openresponses.accumulator import ResponseAccumulator
+from openresponses.cache import MemoryCache
+from openresponses.client import AsyncOpenResponsesClient
+from openresponses.models import MessageItem, OpenResponsesOutput, ReasoningItem, StreamEvent, ToolCallItem
+from openresponses.provider import THINK_TAGS
+from openresponses.server import Backend, OpenAIChatBackend, create_app
+from openresponses.sse import SSEDecoder
+
+
+class EchoBackend(Backend):
+    """Answers with the last input text; streams it in two deltas without a done payload."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, request, messages):
+        self.calls += 1
+        return OpenResponsesOutput(
+            id="chatcmpl-1",
+            created=1,
+            model="upstream-name",
+            output=[MessageItem(role="assistant", content=messages[-1]["content"])],
+        )
+
+    async def stream(self, request, messages):
+        self.calls += 1
+        text = messages[-1]["content"]
+        yield ("response.reasoning.delta", "thinking")
+        yield ("response.text.delta", text[:2])
+        yield ("response.text.delta", text[2:])
+        yield ("response.done", {})
+
+
+def _client(app):
+    return AsyncOpenResponsesClient("http://test", http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app)))
+
+
+def test_live_and_cached_streams_end_with_the_same_done_payload():
+    async def main():
+        backend = EchoBackend()
+        async with _client(create_app({"": backend}, cache=MemoryCache())) as client:
+            live = await ResponseAccumulator().aconsume(await client.create(model="echo", input="hello", stream=True))
+            cached = await ResponseAccumulator().aconsume(await client.create(model="echo", input="hello", stream=True))
+        assert backend.calls == 1
+        assert live.model == cached.model == "echo"
+        assert live.id == cached.id and live.id.startswith("resp_")
+        assert live.created == cached.created
+        assert live.output == cached.output
+
+    asyncio.run(main())
+
+
+def test_cache_headers_and_bypass():
+    backend = EchoBackend()
+    app = create_app(backend, cache=MemoryCache())
+    body = {"model": "echo", "input": "hello"}
+    assert _post(app, body).headers["X-Cache"] == "MISS"
+    hit = _post(app, body)
+    assert hit.headers["X-Cache"] == "HIT" and hit.json()["model"] == "echo"
+    assert _post(app, {**body, "stream": True}).headers["X-Cache"] == "HIT"
+    bypass = _post(app, body, headers={"Cache-Control": "no-cache"})
+    assert "X-Cache" not in bypass.headers
+    assert backend.calls == 2
+
+    async def stats():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            return (await http.get("/v1/cache/stats")).json()
+
+    assert asyncio.run(stats())["hits"] == 2
+
+
+class RecordingBackend(EchoBackend):
+    def __init__(self, fail=False):
+        super().__init__()
+        self.models = []
+        self.fail = fail
+
+    async def create(self, request, messages):
+        self.models.append(request.model)
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        return await super().create(request, messages)
+
+    async def stream(self, request, messages):
+        self.models.append(request.model)
+        yield ("response.text.delta", "partial")
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        yield ("response.done", {})
+
+
+def _post(app, body, **options):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            return await http.post("/v1/responses", json=body, **options)
+
+    return asyncio.run(main())
+
+
+def _sse(response):
+    decoder = SSEDecoder()
+    return [(event.event, event.json()) for event in decoder.feed(response.content)]
+
+
+def test_requests_are_routed_by_longest_model_prefix():
+    local, remote, default = RecordingBackend(), RecordingBackend(), RecordingBackend()
+    app = create_app({"ollama/": local, "ollama/remote/": remote, "": default})
+    response = _post(app, {"model": "ollama/llama3", "input": "hello"})
+    assert response.status_code == 200
+    assert response.json()["model"] == "ollama/llama3"
+    assert response.json()["output"] == [{"type": "message", "role": "assistant", "content": "hello"}]
+    _post(app, {"model": "ollama/remote/qwen", "input": "hi"})
+    _post(app, {"model": "gpt-4o", "input": "hi"})
+    # Matched prefixes are stripped before the request reaches the backend.
+    assert (local.models, remote.models, default.models) == (["llama3"], ["qwen"], ["gpt-4o"])
+
+
+def test_unknown_model_and_invalid_body():
+    app = create_app({"ollama/": RecordingBackend()})
+    assert _post(app, {"model": "gpt-4o", "input": "hi"}).status_code == 404
+    invalid = _post(app, {"input": "no model"})
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"] == ["body", "model"]
+    malformed = _post(app, None, content=b"{not json", headers={"Content-Type": "application/json"})
+    assert malformed.status_code == 422
+
+
+def test_streamed_response_is_sse():
+    response = _post(create_app(EchoBackend()), {"model": "echo", "input": "hello", "stream": True})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse(response)
+    assert events[:2] == [("response.reasoning.delta", {"delta": "thinking"}), ("response.text.delta", {"delta": "hello"})]
+    assert events[-1][0] == "response.done"
+
+
+def test_upstream_failures():
+    app = create_app(RecordingBackend(fail=True))
+    response = _post(app, {"model": "m", "input": "hi"})
+    assert response.status_code == 500 and response.json()["detail"] == "upstream failed"
+    # Mid-stream failures are reported in-band.
+    events = _sse(_post(app, {"model": "m", "input": "hi", "stream": True}))
+    assert events == [("response.text.delta", {"delta": "partial"}), ("error", {"error": "upstream failed"})]
+
+
+def _chat_upstream(seen):
+    """An OpenAI-compatible upstream: JSON for plain requests, SSE chunks when streaming."""
+
+    def handler(request):
+        body = json.loads(request.content)
+        seen.append(body)
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 7, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+                    "role": "assistant",
+                    "content": "<think>hmm</think>Checking.",
+                    "tool_calls": [{"id": "call_1", "type": "function",
+                                    "function": {"name": "lookup", "arguments": '{"q": "x"}'}}],
+                }}],
+            })
+        deltas = [
+            {"role": "assistant", "reasoning_content": "hmm"},
+            {"content": "Hel"},
+            {"content": "lo"},
+            {"tool_calls": [{"index": 0, "id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": "{"}}]},
+            {"tool_calls": [{"index": 0, "function": {"arguments": "}"}}]},
+        ]
+        chunks = [
+            {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 7, "model": body["model"],
+             "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            for delta in deltas
+        ]
+        text = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, content=text.encode(), headers={"Content-Type": "text/event-stream"})
+
+    return handler
+
+
+def test_openai_chat_backend_translates_completions():
+    seen = []
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(_chat_upstream(seen)))
+    backend = OpenAIChatBackend("http://upstream/v1", "key", http_client=upstream, reasoning_tags=THINK_TAGS)
+    app = create_app({"chat/": backend})
+
+    output = OpenResponsesOutput.model_validate(_post(app, {"model": "chat/llama3", "input": "hi"}).json())
+    assert seen[-1]["model"] == "llama3"
+    assert seen[-1]["messages"] == [{"role": "user", "content": "hi"}]
+    assert output.model == "chat/llama3"
+    assert output.output == [
+        ReasoningItem(content="hmm"),
+        MessageItem(role="assistant", content="Checking."),
+        ToolCallItem(id="call_1", name="lookup", arguments={"q": "x"}),
+    ]
+
+    events = _sse(_post(app, {"model": "chat/llama3", "input": "hi", "stream": True}))
+    accumulator = ResponseAccumulator()
+    for event_type, payload in events:
+        accumulator.add(StreamEvent.from_sse(event_type, payload))
+    streamed = accumulator.result()
+    assert streamed.model == "chat/llama3"
+    assert streamed.output == [
+        ReasoningItem(content="hmm"),
+        MessageItem(role="assistant", content="Hello"),
+        ToolCallItem(id="call_1", name="lookup", arguments={}),
+    ]
+
+
+def test_client_disconnect_closes_the_backend_stream():
+    closed = asyncio.Event()
+
+    class Endless(EchoBackend):
+        async def stream(self, request, messages):
+            try:
+                while True:
+                    yield ("response.text.delta", "x")
+                    await asyncio.sleep(0.001)
+            finally:
+                closed.set()
+
+    app = create_app(Endless(), flush_interval=0.001)
+
+    async def main():
+        body = json.dumps({"model": "m", "input": "hi", "stream": True}).encode()
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/v1/responses", "raw_path": b"/v1/responses", "query_string": b"",
+            "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        chunks = 0
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal chunks
+            if message["type"] == "http.response.body":
+                chunks += 1
+                if chunks == 3:
+                    raise OSError("connection reset")
+
+        try:
+            await asyncio.wait_for(app(scope, receive, send), 5)
+        except OSError:
+            pass
+        return closed.is_set()
+
+    assert asyncio.run(main())
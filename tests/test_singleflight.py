@@ -0,0 +1,197 @@
+import asyncio
+
+import httpx
+import pytest
+
+from openresponses.models import MessageItem, OpenResponsesOutput
+from openresponses.server import Backend, create_app
+from openresponses.singleflight import SingleFlight, SlowSubscriberError
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    async def main():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+        assert results == ["result"] * 10
+        assert calls == 1 and flight.calls == 1 and flight.coalesced == 9
+        # Finished calls are forgotten, so a later call runs again.
+        assert await flight.do("key", fetch) == "result"
+        assert calls == 2
+
+    asyncio.run(main())
+
+
+def test_different_keys_do_not_coalesce():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        assert await asyncio.gather(flight.do("a", lambda: fetch(1)), flight.do("b", lambda: fetch(2))) == [1, 2]
+        assert flight.calls == 2
+
+    asyncio.run(main())
+
+
+def test_errors_reach_every_caller():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(main())
+
+
+def test_call_is_cancelled_only_when_every_caller_is_gone():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(main())
+
+
+async def _numbers(count, delay=0.0):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield i
+
+
+def test_stream_subscribers_share_one_upstream_stream():
+    async def main():
+        flight = SingleFlight()
+        upstreams = 0
+
+        def factory():
+            nonlocal upstreams
+            upstreams += 1
+            return _numbers(5, delay=0.001)
+
+        async def consume():
+            return [event async for event in flight.stream("key", factory)]
+
+        results = await asyncio.gather(*(consume() for _ in range(4)))
+        assert results == [list(range(5))] * 4
+        assert upstreams == 1 and flight.coalesced == 3
+
+    asyncio.run(main())
+
+
+def test_late_joiner_gets_the_backlog():
+    async def main():
+        flight = SingleFlight()
+        first = flight.stream("key", lambda: _numbers(6, delay=0.005))
+        seen = [await first.__anext__(), await first.__anext__()]
+        late = [event async for event in flight.stream("key", lambda: _numbers(0))]
+        seen += [event async for event in first]
+        assert seen == late == list(range(6))
+        assert flight.calls == 1
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_dropped_without_stalling_others():
+    async def main():
+        flight = SingleFlight(buffer_size=4)
+        fast_events = []
+        slow = flight.stream("key", lambda: _numbers(20, delay=0.001))
+        assert await slow.__anext__() == 0
+
+        async def fast():
+            async for event in flight.stream("key", lambda: _numbers(0)):
+                fast_events.append(event)
+
+        await fast()
+        assert fast_events == list(range(20))
+        with pytest.raises(SlowSubscriberError):
+            async for _ in slow:
+                pass
+
+    asyncio.run(main())
+
+
+def test_upstream_stream_is_closed_when_every_subscriber_leaves():
+    async def main():
+        flight = SingleFlight()
+        closed = asyncio.Event()
+
+        async def upstream():
+            try:
+                for i in range(1000):
+                    await asyncio.sleep(0.001)
+                    yield i
+            finally:
+                closed.set()
+
+        stream = flight.stream("key", upstream)
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+        await asyncio.wait_for(closed.wait(), 1)
+
+    asyncio.run(main())
+
+
+def test_server_coalesces_identical_requests():
+    class Slow(Backend):
+        calls = 0
+
+        async def create(self, request, messages):
+            Slow.calls += 1
+            await asyncio.sleep(0.05)
+            return OpenResponsesOutput(id="r", created=0, model="m", output=[MessageItem(role="assistant", content="hi")])
+
+        async def stream(self, request, messages):
+            Slow.calls += 1
+            await asyncio.sleep(0.05)
+            yield ("response.text.delta", "hi")
+            yield ("response.done", {})
+
+    app = create_app(Slow(), single_flight=SingleFlight())
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            def post(**extra):
+                return http.post("/v1/responses", json={"model": "m", "input": "hi", **extra})
+
+            plain = await asyncio.gather(*(post() for _ in range(5)))
+            streamed = await asyncio.gather(*(post(stream=True) for _ in range(5)))
+            other = await post(input="different")
+        return plain, streamed, other
+
+    plain, streamed, other = asyncio.run(main())
+    assert len({response.content for response in plain}) == 1
+    assert all(b'"delta":"hi"' in response.content for response in streamed)
+    assert other.status_code == 200
+    assert Slow.calls == 3
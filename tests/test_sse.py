@@ -0,0 +1,83 @@
+import random
+import time
+
+import pytest
+
+from openresponses.sse import SSEDecoder
+
+STREAM = (
+    b"event: response.created\n"
+    b'data: {"id": "resp_1"}\n'
+    b"\n"
+    b": keep-alive comment\n"
+    b"event: response.text.delta\n"
+    b"id: 7\n"
+    b'data: {"delta": "Hel"}\n'
+    b"\n"
+    b"data: first\n"
+    b"data: second\n"
+    b"\n"
+)
+
+
+def _decode(chunks):
+    decoder = SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.feed(chunk))
+    events.extend(decoder.flush())
+    return [(event.event, event.data, event.id) for event in events]
+
+
+def test_decodes_events_fields_and_multiline_data():
+    assert _decode([STREAM]) == [
+        ("response.created", '{"id": "resp_1"}', ""),
+        ("response.text.delta", '{"delta": "Hel"}', "7"),
+        ("message", "first\nsecond", "7"),
+    ]
+
+
+def test_json_payload():
+    decoder = SSEDecoder()
+    (event,) = decoder.feed(b'data: {"delta": "hi"}\n\n')
+    assert event.json() == {"delta": "hi"}
+
+
+@pytest.mark.parametrize("newline", [b"\r\n", b"\r"])
+def test_cr_and_crlf_line_endings(newline):
+    assert _decode([STREAM.replace(b"\n", newline)]) == _decode([STREAM])
+
+
+def test_bom_is_stripped_even_when_split():
+    stream = b"\xef\xbb\xbf" + STREAM
+    assert _decode([stream[:1], stream[1:2], stream[2:]]) == _decode([STREAM])
+
+
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n", b"\r"])
+def test_any_chunking_gives_the_same_events(newline):
+    stream = STREAM.replace(b"\n", newline)
+    expected = _decode([stream])
+    rng = random.Random(0)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(stream)), rng.randint(1, 20)))
+        chunks = [stream[a:b] for a, b in zip([0, *cuts], [*cuts, len(stream)])]
+        assert _decode(chunks) == expected
+    assert _decode([stream[i : i + 1] for i in range(len(stream))]) == expected
+
+
+def test_unterminated_event_is_discarded_on_flush():
+    assert _decode([b"data: done\n\ndata: partial"]) == [("message", "done", "")]
+
+
+def test_long_event_in_small_chunks_is_linear():
+    payload = b"x" * (4 * 1024 * 1024)
+    stream = b"data: " + payload + b"\n\n"
+    decoder = SSEDecoder()
+    events = []
+    start = time.perf_counter()
+    for i in range(0, len(stream), 1400):
+        events.extend(decoder.feed(stream[i : i + 1400]))
+    elapsed = time.perf_counter() - start
+    assert len(events) == 1 and events[0].raw == payload
+    # Rescanning the buffered line on every chunk took seconds here.
+    assert elapsed < 1.0
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from openresponses.models import MessageItem, OpenResponsesOutput, OpenResponsesRequest, ToolCallItem
+from openresponses.server import Backend
+from openresponses.tools import ToolLoopBackend, ToolRegistry
+
+
+class Scripted(Backend):
+    """Answers each round with the next list of items, recording what it was sent."""
+
+    supports_tools = True
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.sent = []
+
+    async def create(self, request, messages, tools=None):
+        self.sent.append((list(messages), tools))
+        return OpenResponsesOutput(id="r", created=0, model="m", output=self.rounds.pop(0))
+
+    async def stream(self, request, messages, tools=None):
+        self.sent.append((list(messages), tools))
+        for item in self.rounds.pop(0):
+            if item.type == "tool_call":
+                yield ("response.tool_call.delta", {"id": item.id, "name": item.name, "arguments": '{"city": "Oslo"}'})
+            else:
+                yield ("response.text.delta", item.content)
+        yield ("response.done", {})
+
+
+def _call(call_id, name="weather", **arguments):
+    if name == "weather" and not arguments:
+        arguments = {"city": "Oslo"}
+    return ToolCallItem(id=call_id, name=name, arguments=arguments)
+
+
+def _registry():
+    tools = ToolRegistry()
+    calls = []
+
+    @tools.register(pure=True)
+    def weather(city: str, unit: str = "C") -> dict:
+        """Current weather."""
+        calls.append(city)
+        return {"city": city, "temp": 3, "unit": unit}
+
+    @tools.register(name="fail")
+    async def failing():
+        raise RuntimeError("no service")
+
+    return tools, calls
+
+
+def test_definitions_come_from_signatures():
+    tools, _ = _registry()
+    weather, failing = tools.definitions()
+    assert weather["function"]["name"] == "weather"
+    assert weather["function"]["description"] == "Current weather."
+    parameters = weather["function"]["parameters"]
+    assert parameters["required"] == ["city"] and parameters["properties"]["unit"]["default"] == "C"
+    assert failing["function"]["name"] == "fail" and "weather" in tools and len(tools) == 2
+
+
+def test_run_returns_results_in_call_order_and_reports_failures():
+    tools, calls = _registry()
+    results = asyncio.run(tools.run([
+        _call("1"), _call("2", "fail"), _call("3", "missing"), _call("4"), _call("5", city="Rome"),
+    ]))
+    assert [result.call_id for result in results] == ["1", "2", "3", "4", "5"]
+    assert results[0].output == results[3].output == '{"city": "Oslo", "temp": 3, "unit": "C"}'
+    assert results[1].output == "Error: RuntimeError: no service"
+    assert results[2].output == "Error: unknown tool 'missing'"
+    # Identical pure calls run once, and later turns are answered from the cache.
+    assert sorted(calls) == ["Oslo", "Rome"]
+    asyncio.run(tools.run([_call("6")]))
+    assert calls.count("Oslo") == 1 and tools.cache_hits == 1
+
+
+def test_independent_calls_run_concurrently_and_time_out():
+    tools = ToolRegistry()
+    barrier = threading.Barrier(2, timeout=5)
+    tools.register(lambda: barrier.wait(), name="meet")
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    tools.register(slow, timeout=0.01)
+    results = asyncio.run(tools.run([_call("a", "meet"), _call("b", "meet"), _call("c", "slow")]))
+    assert [result.output for result in results[:2]] in (["0", "1"], ["1", "0"])
+    assert results[2].output == "Error: tool 'slow' timed out after 0.01s"
+
+
+def test_loop_runs_tools_until_the_model_answers():
+    tools, _ = _registry()
+    backend = Scripted([_call("1")], [MessageItem(role="assistant", content="3 degrees")])
+    output = asyncio.run(ToolLoopBackend(backend, tools).create(OpenResponsesRequest(model="m", input="hi"), [
+        {"role": "user", "content": "weather?"},
+    ]))
+    assert [item.type for item in output.output] == ["tool_call", "tool_result", "message"]
+    messages, definitions = backend.sent[1]
+    assert [m["role"] for m in messages] == ["user", "assistant", "tool"]
+    assert messages[2]["tool_call_id"] == "1"
+    assert definitions == tools.definitions()
+
+
+def test_loop_returns_calls_it_cannot_run():
+    tools, calls = _registry()
+    request = OpenResponsesRequest(model="m", input="hi", max_tool_calls=1)
+    backend = Scripted([_call("1"), _call("2", city="Rome")])
+    output = asyncio.run(ToolLoopBackend(backend, tools).create(request, []))
+    assert output.output == [_call("1"), _call("2", city="Rome")] and calls == []
+    backend = Scripted([_call("1", "client_side")])
+    output = asyncio.run(ToolLoopBackend(backend, tools).create(OpenResponsesRequest(model="m", input="hi"), []))
+    assert output.output == [_call("1", "client_side")]
+
+
+def test_streamed_loop_adds_tool_results():
+    tools, _ = _registry()
+    backend = Scripted([_call("1")], [MessageItem(role="assistant", content="3 degrees")])
+
+    async def main():
+        loop = ToolLoopBackend(backend, tools)
+        return [event async for event in loop.stream(OpenResponsesRequest(model="m", input="hi"), [])]
+
+    events = asyncio.run(main())
+    assert [event_type for event_type, _ in events] == [
+        "response.tool_call.delta", "response.tool_result", "response.text.delta", "response.done",
+    ]
+    assert events[1][1] == {"call_id": "1", "output": '{"city": "Oslo", "temp": 3, "unit": "C"}'}
+
+
+def test_backends_without_tool_support_are_rejected():
+    class Plain(Backend):
+        async def create(self, request, messages):
+            raise NotImplementedError
+
+        async def stream(self, request, messages):
+            yield ("response.done", {})
+
+    with pytest.raises(TypeError):
+        ToolLoopBackend(Plain(), ToolRegistry())